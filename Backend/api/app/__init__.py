@@ -1 +1,14 @@
-# ZKredit API package 
\ No newline at end of file
+# ZKredit API package
+import sys
+from pathlib import Path
+
+# The ML code lives in Backend/cScoring and Backend/flagger as flat script
+# folders whose modules import each other by bare name, so both folders are
+# put on sys.path before any router imports them.
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+CSCORING_DIR = BACKEND_DIR / "cScoring"
+FLAGGER_DIR = BACKEND_DIR / "flagger"
+
+for _ml_dir in (CSCORING_DIR, FLAGGER_DIR):
+    if str(_ml_dir) not in sys.path:
+        sys.path.append(str(_ml_dir))
@@ -0,0 +1,66 @@
+"""
+Export and check the pickle-free serving artifacts of both models.
+
+The format, exporters and loaders live next to the models they serialize:
+cScoring/model_artifacts.py (credit pipeline) and flagger/fraud_artifacts.py
+(fraud model); they are re-exported here for the API. The training scripts
+re-export after writing their pickles. Run ``python -m app.artifacts`` to
+export the current pickles, check that the exported models score
+identically, and compare the load times.
+"""
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import CSCORING_DIR, FLAGGER_DIR
+from credit_pipeline import CreditScoringPipeline
+from fraud_scoring import FEATURE_COLUMNS
+from model_artifacts import (CREDIT_PIPELINE_DIR, CREDIT_PIPELINE_SOURCES, FORMAT_VERSION, check_source,
+                             export_credit_pipeline, load_credit_pipeline, source_digest)
+from fraud_artifacts import (FRAUD_MODEL_DIR, FRAUD_MODEL_SOURCES, export_fraud_model, fraud_model_version,
+                             load_fraud_model)
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    def load_pickle(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    # Export from the pickled artifacts
+    pipeline, pickle_credit_ms = _timed(CreditScoringPipeline.load, CSCORING_DIR / "credit_pipeline.joblib")
+    (fraud_model, fraud_scaler), pickle_fraud_ms = _timed(
+        lambda: (load_pickle(FLAGGER_DIR / "isolation_fraud_model.pkl"), load_pickle(FLAGGER_DIR / "scaler.pkl"))
+    )
+    export_credit_pipeline(pipeline)
+    export_fraud_model(fraud_model, fraud_scaler)
+
+    # The exported models must score exactly like the pickled ones
+    exported_pipeline, array_credit_ms = _timed(load_credit_pipeline)
+    (exported_model, exported_scaler), array_fraud_ms = _timed(load_fraud_model)
+
+    credit_data = pd.read_csv(CSCORING_DIR / "synthetic_credit_data.csv")
+    credit_same = np.array_equal(pipeline.predict(credit_data), exported_pipeline.predict(credit_data))
+    fraud_data = pd.read_csv(FLAGGER_DIR / "fraud_detection_data.csv")[FEATURE_COLUMNS].to_numpy()
+    fraud_same = np.array_equal(
+        fraud_model.decision_function(fraud_scaler.transform(fraud_data)),
+        exported_model.decision_function(exported_scaler.transform(fraud_data))
+    )
+
+    print(f"{'artifact':<18}{'pickle ms':>12}{'arrays ms':>12}  identical")
+    print(f"{'credit pipeline':<18}{pickle_credit_ms:>12.1f}{array_credit_ms:>12.1f}  {credit_same}")
+    print(f"{'fraud model':<18}{pickle_fraud_ms:>12.1f}{array_fraud_ms:>12.1f}  {fraud_same}")
+    if not (credit_same and fraud_same):
+        raise SystemExit("❌ Exported models differ from the pickled ones")
+    print(f"✅ Exported to {CREDIT_PIPELINE_DIR} and {FRAUD_MODEL_DIR}")
+
+
+if __name__ == "__main__":
+    main()
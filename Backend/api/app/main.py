@@ -1,12 +1,65 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from .metrics import MetricsMiddleware, metrics
+from .model_registry import registry
+from .wallet_cache import wallet_cache
+from threat_intel import get_blacklist_index
+from address_clusters import get_address_clusters
+from transaction_graph import get_transaction_graph
+from threat_intel_client import ThreatIntelClient
 from .routers import credit_score, transaction_risk, transaction_intent, wallet_analysis
 
+_preloaded = False
+
+def preload():
+    """
+    Load and warm everything requests share: the models, the memory-mapped
+    threat-intel blacklist index, the address clusters and the transaction
+    graph. Called by the lifespan, and by run.py's production master before
+    it forks, so the workers inherit all of it copy-on-write and their own
+    lifespan finds nothing left to do.
+    """
+    global _preloaded
+    if _preloaded:
+        return
+    registry.warmup()
+    get_blacklist_index()
+    get_address_clusters()
+    get_transaction_graph()
+    _preloaded = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm every model once, before the first request is accepted.
+    # ZKREDIT_LAZY_MODELS=1 defers this to the first request needing a model,
+    # for replicas that must report ready as early as possible.
+    app.state.models = registry
+    if os.getenv("ZKREDIT_LAZY_MODELS") != "1":
+        preload()
+    # Live threat intel providers are used when THREAT_INTEL_URL is set,
+    # otherwise transaction risk falls back to the local stubs
+    app.state.threat_client = None
+    if os.getenv("THREAT_INTEL_URL"):
+        app.state.threat_client = ThreatIntelClient(
+            base_url=os.environ["THREAT_INTEL_URL"],
+            api_key=os.getenv("THREAT_INTEL_API_KEY"),
+            timeout=float(os.getenv("THREAT_INTEL_TIMEOUT_SECONDS", "2.0")),
+            cache_max_entries=int(os.getenv("THREAT_INTEL_CACHE_MAX_ENTRIES", "10000"))
+        )
+    yield
+    if app.state.threat_client is not None:
+        await app.state.threat_client.aclose()
+
 # Create FastAPI instance
 app = FastAPI(
     title="ZKredit API",
     description="API for the ZKredit privacy-preserving trust and risk layer for Web3 wallets",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,6 +77,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-endpoint latency for every request, exported at /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(credit_score.router, prefix="/api", tags=["Credit Score"])
 app.include_router(transaction_risk.router, prefix="/api", tags=["Transaction Risk"])
@@ -37,4 +93,29 @@ async def root():
         "message": "Welcome to the ZKredit API",
         "version": "1.0.0",
         "documentation": "/docs"
-    } 
\ No newline at end of file
+    }
+
+# Shared wallet cache counters
+@app.get("/api/wallet-cache/stats")
+async def wallet_cache_stats():
+    return wallet_cache.stats()
+
+# Cache counters and model versions are read at scrape time
+def _scrape_time_metrics():
+    stats = wallet_cache.stats()
+    lines = []
+    for name, kind in [("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                       ("expirations", "counter"), ("size", "gauge")]:
+        metric = f"zkredit_wallet_cache_{name}" + ("_total" if kind == "counter" else "")
+        lines += [f"# TYPE {metric} {kind}", f"{metric} {stats[name]}"]
+    lines.append("# TYPE zkredit_model_info gauge")
+    for model, version in sorted(registry.versions.items()):
+        lines.append(f'zkredit_model_info{{model="{model}",version="{version}"}} 1')
+    return lines
+
+metrics.add_collector(_scrape_time_metrics)
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
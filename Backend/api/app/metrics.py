@@ -0,0 +1,153 @@
+"""
+Latency instrumentation for the ZKredit API, exported in Prometheus text format.
+
+Recording is a bisect and a few integer increments under a lock, so it is
+cheap enough to leave on for every request; the text exposition is only
+built when ``/metrics`` is scraped. Each process keeps its own metrics, so
+with ``run.py --production`` every worker reports its own share.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 8, 32, 128, 512, 2048, 8192, 32768, 131072)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple([str(labels[name]) for name in self.labelnames])
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the wall time of its block."""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        for key, bucket_counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class MetricsRegistry:
+    """Metrics plus callbacks that contribute scrape-time values (caches, model versions)."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUEST_LATENCY = metrics.register(Histogram(
+    "zkredit_request_duration_seconds", "End-to-end request latency per endpoint",
+    ["method", "endpoint", "status"]
+))
+STAGE_LATENCY = metrics.register(Histogram(
+    "zkredit_stage_duration_seconds", "Latency of each scoring pipeline stage",
+    ["pipeline", "stage"]
+))
+BATCH_SIZE = metrics.register(Histogram(
+    "zkredit_batch_size", "Rows scored per model call",
+    ["pipeline"], buckets=BATCH_SIZE_BUCKETS
+))
+
+
+def stage(pipeline: str, name: str):
+    """Context manager timing one stage of a scoring pipeline."""
+    return STAGE_LATENCY.time(pipeline=pipeline, stage=name)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency and status of every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Unmatched paths share one label to keep cardinality bounded
+            endpoint = scope["path"] if scope.get("endpoint") is not None else "unmatched"
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope["method"], endpoint=endpoint, status=status["code"]
+            )
@@ -0,0 +1,300 @@
+"""
+Load-once registry for the ZKredit ML artifacts.
+
+Every model the API serves is loaded exactly once and then shared by all
+request handlers. The pickle-free array artifacts written by
+``python -m app.artifacts`` are preferred when present, the pickles are the
+fallback. Routers get hold of the registry through the ``get_model_registry``
+dependency and never touch the artifact files themselves.
+
+pandas, scikit-learn and xgboost are only imported by ``load``, so
+``import app.main`` stays cheap (see import_report.py). The application
+lifespan pays that cost up front through ``warmup``.
+
+Transactions are scored by the IsolationForest unless
+ZKREDIT_FRAUD_DETECTOR=half_space_trees selects the streaming half-space
+trees (flagger/half_space_trees.py), which learn from every transaction they
+score. Until their first reference window is complete the IsolationForest
+keeps scoring.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+import numpy as np
+from fastapi import HTTPException
+
+from . import CSCORING_DIR, FLAGGER_DIR
+from .metrics import BATCH_SIZE, stage
+from fraud_scoring import probability_from_anomaly_scores
+
+if TYPE_CHECKING:
+    from credit_pipeline import CreditScoringPipeline
+    from token_duration_predictor import TokenHoldingDurationPredictor
+
+logger = logging.getLogger("uvicorn.error")
+
+# Range of the credit score scale reported by the API
+MIN_CREDIT_SCORE = 300
+MAX_CREDIT_SCORE = 850
+
+# Values of ZKREDIT_FRAUD_DETECTOR
+FRAUD_DETECTORS = ("isolation_forest", "half_space_trees")
+
+
+@dataclass
+class ModelLoadStats:
+    """Startup cost of a single artifact."""
+    name: str
+    path: str
+    version: str
+    load_seconds: float
+    memory_bytes: int
+    file_bytes: int
+
+    def describe(self) -> str:
+        return (
+            f"{self.name} v{self.version}: loaded in {self.load_seconds * 1000:.1f} ms, "
+            f"{self.memory_bytes / 1024 ** 2:.2f} MiB in memory "
+            f"({self.file_bytes / 1024 ** 2:.2f} MiB on disk)"
+        )
+
+
+def _load_pickle(path: Path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _file_version(path: Path) -> str:
+    """
+    Short content hash used to tell artifact revisions apart. An array
+    artifact directory is versioned by its manifest, which records the
+    version of the pickles it was exported from.
+    """
+    if path.is_dir():
+        path = path / "manifest.json"
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def _disk_bytes(path: Path) -> int:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size
+
+
+class ModelRegistry:
+    """
+    Holds the warm credit scoring and fraud detection models.
+
+    ``load`` is idempotent: the first call reads every artifact from disk and
+    records how long each one took and how much memory it occupies, later
+    calls return immediately.
+    """
+
+    def __init__(self, cscoring_dir: Path = CSCORING_DIR, flagger_dir: Path = FLAGGER_DIR,
+                 fraud_detector: Optional[str] = None):
+        self.credit_pipeline_dir = Path(cscoring_dir) / "credit_pipeline"
+        self.fraud_model_dir = Path(flagger_dir) / "fraud_model"
+        self.credit_pipeline_path = Path(cscoring_dir) / "credit_pipeline.joblib"
+        self.fraud_model_path = Path(flagger_dir) / "isolation_fraud_model.pkl"
+        self.fraud_scaler_path = Path(flagger_dir) / "scaler.pkl"
+        self.fraud_detector = fraud_detector or os.getenv("ZKREDIT_FRAUD_DETECTOR", "isolation_forest")
+        if self.fraud_detector not in FRAUD_DETECTORS:
+            raise ValueError(f"Unknown fraud detector {self.fraud_detector!r}, expected one of {FRAUD_DETECTORS}")
+
+        self.credit_pipeline: Optional["CreditScoringPipeline"] = None
+        self.credit_model = None
+        self.credit_scaler = None
+        self.credit_feature_names: List[str] = []
+        self.duration_predictor: Optional["TokenHoldingDurationPredictor"] = None
+        self.fraud_model = None
+        self.fraud_scaler = None
+        self.half_space_trees = None
+        self._half_space_lock = threading.Lock()
+        self.load_stats: Dict[str, ModelLoadStats] = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def versions(self) -> Dict[str, str]:
+        return {name: stats.version for name, stats in self.load_stats.items()}
+
+    @property
+    def credit_version(self) -> str:
+        """Version of the fused credit pipeline behind a credit score."""
+        return self.credit_pipeline.version
+
+    def _timed_load(self, name: str, path: Path, loader: Callable):
+        """Run ``loader(path)`` and record its wall time and traced allocations."""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            artifact = loader(path)
+        finally:
+            elapsed = time.perf_counter() - start
+            memory_after = tracemalloc.get_traced_memory()[0]
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.load_stats[name] = ModelLoadStats(
+            name=name,
+            path=str(path),
+            version=_file_version(path),
+            load_seconds=elapsed,
+            memory_bytes=max(memory_after - memory_before, 0),
+            file_bytes=_disk_bytes(path),
+        )
+        return artifact
+
+    def load(self) -> "ModelRegistry":
+        """Load every artifact once and log what it cost."""
+        if self.loaded:
+            return self
+        with self._load_lock:
+            if not self.loaded:
+                self._load()
+        return self
+
+    def _load(self):
+        # The model libraries are imported here rather than at module level
+        from model_artifacts import check_source, load_credit_pipeline
+        from fraud_artifacts import load_fraud_model
+        from credit_pipeline import CreditScoringPipeline
+
+        # Array artifacts left behind by a retrain are refused, not served stale
+        if (self.credit_pipeline_dir / "manifest.json").exists():
+            check_source(self.credit_pipeline_dir, [self.credit_pipeline_path])
+            self.credit_pipeline = self._timed_load("credit_pipeline", self.credit_pipeline_dir, load_credit_pipeline)
+        else:
+            self.credit_pipeline = self._timed_load(
+                "credit_pipeline", self.credit_pipeline_path,
+                lambda path: CreditScoringPipeline.load(path, compiled=True)
+            )
+        self.credit_model = self.credit_pipeline.credit_model
+        self.credit_scaler = self.credit_pipeline.credit_scaler
+        self.credit_feature_names = self.credit_pipeline.feature_names
+        self.duration_predictor = self.credit_pipeline.duration_predictor
+        if (self.fraud_model_dir / "manifest.json").exists():
+            check_source(self.fraud_model_dir, [self.fraud_model_path, self.fraud_scaler_path])
+            # Compiled IsolationForest and its scaler, in one directory
+            self.fraud_model, self.fraud_scaler = self._timed_load("fraud_model", self.fraud_model_dir, load_fraud_model)
+        else:
+            self.fraud_model = self._timed_load("fraud_model", self.fraud_model_path, _load_pickle)
+            self.fraud_scaler = self._timed_load("fraud_scaler", self.fraud_scaler_path, _load_pickle)
+        if self.fraud_detector == "half_space_trees":
+            from half_space_trees import DEFAULT_DATA_PATH, DEFAULT_SNAPSHOT_PATH, load_or_bootstrap
+            # Versioned by the snapshot, or by the dataset a first start bootstraps from
+            snapshot_path = Path(DEFAULT_SNAPSHOT_PATH)
+            self.half_space_trees = self._timed_load(
+                "half_space_trees", snapshot_path if snapshot_path.exists() else Path(DEFAULT_DATA_PATH),
+                lambda path: load_or_bootstrap(snapshot_path)
+            )
+
+        for stats in self.load_stats.values():
+            logger.info("Model registry: %s", stats.describe())
+        self._loaded = True
+
+    def warmup(self) -> "ModelRegistry":
+        """
+        Load every artifact and push one row through each pipeline, so the
+        first real request pays neither the imports nor first-call setup.
+        """
+        start = time.perf_counter()
+        self.load()
+        # Straight through the models, so the request metrics stay untouched
+        row = dict.fromkeys(self.credit_pipeline.input_columns, 0.0)
+        row["eth_ratio"] = 1.0
+        self.credit_pipeline.predict([row])
+        self.fraud_model.decision_function(self.fraud_scaler.transform(np.zeros((1, self.fraud_scaler.n_features_in_))))
+        if self.half_space_trees is not None:
+            self.half_space_trees.score_samples(np.zeros((1, self.fraud_scaler.n_features_in_)))
+        logger.info("Model registry: warmed up in %.1f ms", (time.perf_counter() - start) * 1000)
+        return self
+
+    def predict_credit_scores(self, wallet_features, return_durations: bool = False):
+        """
+        Score wallets with the fused two-stage credit pipeline.
+
+        ``wallet_features`` is a float array in ``credit_pipeline.input_columns``
+        order, a list of feature dicts or a DataFrame. The rows are copied
+        once into the model matrix, the duration predictor fills in
+        ``predicted_holding_duration``, and the scaled matrix goes through
+        the XGBoost regressor in a single call. Scores are clipped to the
+        300-850 scale. With ``return_durations`` the predicted holding
+        durations are returned alongside the scores.
+        """
+        pipeline = self.credit_pipeline
+        with stage("credit", "vector_assembly"):
+            matrix = pipeline.assemble(wallet_features)
+        BATCH_SIZE.observe(len(matrix), pipeline="credit")
+        with stage("credit", "duration_prediction"):
+            durations = pipeline.predict_durations(matrix)
+        with stage("credit", "scaling"):
+            pipeline.scale(matrix)
+        with stage("credit", "model_predict"):
+            scores = pipeline.predict_scaled(matrix)
+        scores = np.clip(scores, MIN_CREDIT_SCORE, MAX_CREDIT_SCORE)
+        if return_durations:
+            return scores, durations
+        return scores
+
+    def predict_fraud_probability(self, X: np.ndarray) -> np.ndarray:
+        """
+        Fraud probability for an (N, 11) transaction feature matrix, using the
+        same normalisation of ``decision_function`` as test_fraud_predictor.py.
+        With the half-space trees selected, they score the rows once their
+        first window is complete and then learn from them.
+        """
+        BATCH_SIZE.observe(len(X), pipeline="fraud")
+        if self.half_space_trees is not None:
+            trees = self.half_space_trees
+            # Scoring reads the reference window that learning may rotate
+            with self._half_space_lock, stage("fraud", "half_space_trees"):
+                probability = trees.fraud_probability(X) if trees.ready else None
+                trees.learn_many(X)
+            if probability is not None:
+                return probability
+        with stage("fraud", "scaling"):
+            X_scaled = self.fraud_scaler.transform(X)
+        with stage("fraud", "decision_function"):
+            anomaly_scores = self.fraud_model.decision_function(X_scaled)
+        return probability_from_anomaly_scores(anomaly_scores)
+
+
+# Shared instance, loaded by the application lifespan in main.py
+registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    FastAPI dependency returning the warm model registry.
+
+    Requests do not load models: until the lifespan (or run.py's production
+    master) has loaded them, this answers 503. The one exception is
+    ZKREDIT_LAZY_MODELS=1, which explicitly moves the load to the first
+    request that needs a model; FastAPI runs this sync dependency in its
+    threadpool, so that load stays off the event loop.
+    """
+    if registry.loaded:
+        return registry
+    if os.getenv("ZKREDIT_LAZY_MODELS") == "1":
+        return registry.load()
+    raise HTTPException(status_code=503, detail="Models are not loaded yet")
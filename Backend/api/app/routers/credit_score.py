@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import sys
-import os
-import json
-from pathlib import Path
+from typing import List, Optional
+
+from ..model_registry import MAX_CREDIT_SCORE, ModelRegistry, get_model_registry
+from ..wallet_cache import get_credit_score as get_cached_credit_score
+from ..wallet_features import credit_factors
 
 # Credit score response model
 class CreditScoreResponse(BaseModel):
@@ -12,65 +14,106 @@ class CreditScoreResponse(BaseModel):
     factors: dict
     lastUpdated: str
 
+# One wallet's precomputed features, as laid out in synthetic_credit_data.csv
+class WalletFeatures(BaseModel):
+    wallet: Optional[str] = None
+    wallet_age: float
+    transaction_volume_total: float
+    transaction_count: float
+    active_days: float
+    average_tx_value: float
+    gas_spent_total: float
+    tokens_held: float
+    DEX_activity_count: float
+    contract_interactions: float
+    NFT_activity: float
+    liquidation_events: float
+    scam_interaction_count: float
+    failed_transaction_count: float
+    eth_ratio: float
+    btc_ratio: float
+    nft_ratio: float
+    nft_collection_diversity: float
+    average_eth_holding_age: float
+    average_btc_holding_age: float
+
+class BatchCreditScoreRequest(BaseModel):
+    wallets: List[WalletFeatures]
+
+class BatchCreditScore(BaseModel):
+    wallet: Optional[str] = None
+    score: int
+    predictedHoldingDuration: float
+
+class BatchCreditScoreResponse(BaseModel):
+    count: int
+    maxScore: int
+    scores: List[BatchCreditScore]
+
+# Upper bound on rows per batch request, to keep one request's memory bounded
+MAX_BATCH_SIZE = 50000
+
 # Router
 router = APIRouter()
 
 @router.get("/credit-score", response_model=CreditScoreResponse)
-async def get_credit_score(wallet: str = Query(..., description="The wallet address to check")):
+async def get_credit_score(
+    wallet: str = Query(..., description="The wallet address to check"),
+    models: ModelRegistry = Depends(get_model_registry)
+):
     """
     Calculate and return a credit score for the provided wallet address.
     """
     if not wallet or len(wallet) < 10:
         raise HTTPException(status_code=400, detail="Invalid wallet address")
-    
+
     try:
-        # Mock implementation - no ML model needed
-        # Calculate a deterministic score based on wallet address
-        address_hash = hash(wallet) % 350
-        score = 500 + address_hash
-        
-        # Features for this wallet (mock data)
-        features = {
-            'wallet_address': wallet,
-            'wallet_age': 250,
-            'transaction_volume_total': 40000,
-            'transaction_count': 300,
-            'active_days': 200,
-            'average_tx_value': 800,
-            'gas_spent_total': 25000,
-            'tokens_held': 22,
-            'DEX_activity_count': 70,
-            'contract_interactions': 50,
-            'NFT_activity': 15,
-            'liquidation_events': 0,
-            'scam_interaction_count': 1,
-            'failed_transaction_count': 4
-        }
-        
-        # Generate response factors
-        positive_factors = []
-        negative_factors = []
-        
-        # Positive factors
-        positive_factors.append("Wallet has significant age (250 days)")
-        positive_factors.append("Active transaction history (300 transactions)")
-        positive_factors.append("Diverse token portfolio (22 tokens)")
-        positive_factors.append("Significant DEX activity (70 interactions)")
-        
-        # Negative factors
-        if score < 700:
-            negative_factors.append("Interaction with suspicious addresses detected")
-            negative_factors.append("Higher than average failed transactions")
-        
+        # Features and score for this wallet, shared with the other routers
+        # Inference runs in the threadpool, off the event loop
+        score, features = await run_in_threadpool(get_cached_credit_score, wallet, models)
+
         return CreditScoreResponse(
             score=score,
-            maxScore=850,
-            factors={
-                "positive": positive_factors,
-                "negative": negative_factors
-            },
+            maxScore=MAX_CREDIT_SCORE,
+            factors=credit_factors(features),
             lastUpdated=f"{features['wallet_age']} days ago"
         )
-    
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculating credit score: {str(e)}")
+
+@router.post("/credit-score/batch", response_model=BatchCreditScoreResponse)
+async def get_credit_scores_batch(
+    request: BatchCreditScoreRequest,
+    models: ModelRegistry = Depends(get_model_registry)
+):
+    """
+    Score a whole portfolio of wallets from their precomputed features.
+
+    All rows go through the duration predictor, the scaler and the XGBoost
+    model in one vectorized pass, off the event loop.
+    """
+    if not request.wallets:
+        raise HTTPException(status_code=400, detail="No wallets to score")
+    if len(request.wallets) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(request.wallets)} wallets exceeds the limit of {MAX_BATCH_SIZE}"
+        )
+
+    try:
+        rows = [row.dict(exclude={"wallet"}) for row in request.wallets]
+        scores, durations = await run_in_threadpool(models.predict_credit_scores, rows, return_durations=True)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating credit score: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error calculating credit scores: {str(e)}")
+
+    return BatchCreditScoreResponse(
+        count=len(request.wallets),
+        maxScore=MAX_CREDIT_SCORE,
+        scores=[
+            BatchCreditScore(wallet=row.wallet, score=int(round(score)), predictedHoldingDuration=round(float(duration), 2))
+            for row, score, duration in zip(request.wallets, scores, durations)
+        ]
+    )
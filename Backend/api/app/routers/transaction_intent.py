@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
 
+from address_clusters import get_address_clusters
+
 class TransactionIntentRequest(BaseModel):
     sender: str
     recipient: str
@@ -52,8 +54,8 @@ async def predict_transaction_intent(request: TransactionIntentRequest):
             reasons.append("Transaction characteristics suggest a transfer between owned wallets")
         
         # Add a second reason
-        if len(sender) > 4 and len(recipient) > 4 and sender[:4] == recipient[:4]:
-            reasons.append("Sender and recipient have similar wallet patterns")
+        if get_address_clusters().same_cluster(sender, recipient):
+            reasons.append("Sender and recipient are linked in the same address cluster")
             if intent == "transfer_between_wallets":
                 confidence += 0.15
         
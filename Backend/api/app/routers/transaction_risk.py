@@ -1,6 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from starlette.requests import ClientDisconnect
+from typing import List, Optional, Union
+import json
+import numpy as np
+
+from ..metrics import stage
+from ..model_registry import ModelRegistry, get_model_registry
+from ..wallet_cache import get_bulk_wallet_features, get_wallet_features
+from feature_extract import extract_features
+from fraud_scoring import build_feature_matrix
+from threat_intel import query_threat_intel
+from threat_intel_client import ThreatIntelClient
+from intent import infer_transaction_intent, infer_transaction_intents
+from address_clusters import get_address_clusters
+from transaction_graph import get_transaction_graph
 
 class TransactionRiskRequest(BaseModel):
     sender: str
@@ -19,59 +35,311 @@ class TransactionRiskResponse(BaseModel):
     explanation: List[str]
     flaggedFeatures: Optional[List[RiskFeature]] = None
 
+class BatchTransactionRiskRequest(BaseModel):
+    transactions: List[TransactionRiskRequest]
+
+class BatchTransactionRisk(BaseModel):
+    fraudProbability: float
+    riskScore: float
+    riskLevel: str
+
+class BatchTransactionRiskResponse(BaseModel):
+    count: int
+    results: List[BatchTransactionRisk]
+
+# Risk score cut-offs between low / medium / high / critical
+RISK_LEVEL_THRESHOLDS = [25, 50, 75]
+RISK_LEVELS = np.array(["low", "medium", "high", "critical"])
+
+# Upper bound on transactions per batch request
+MAX_BATCH_SIZE = 50000
+
+# Transactions scored together per micro-batch of a streamed request
+STREAM_BATCH_SIZE = 256
+# Longest accepted NDJSON line, which bounds a stream's read buffer
+MAX_STREAM_LINE_BYTES = 16 * 1024
+
+# Propagated blacklist risk above which the recipient's counterparties are flagged
+COUNTERPARTY_RISK_THRESHOLD = 0.25
+
+# One generator for the intent heuristics' random choices, not one per request
+_intent_rng = np.random.default_rng()
+
 router = APIRouter()
 
+def get_threat_client(request: Request) -> Optional[ThreatIntelClient]:
+    """Live threat intel client, if the app was started with THREAT_INTEL_URL."""
+    return getattr(request.app.state, "threat_client", None)
+
+async def _fetch_threats(requests: List[TransactionRiskRequest], client: Optional[ThreatIntelClient]):
+    """Concurrent provider lookups when a live client is configured, else None."""
+    if client is None:
+        return None
+    with stage("fraud", "threat_intel"):
+        return await client.query_many([(request.recipient, request.token) for request in requests])
+
+def _gather_signals(requests: List[TransactionRiskRequest], threats: Optional[list] = None):
+    """
+    Run the per-transaction steps of flagger/test_fraud_predictor.py
+    (feature extraction, threat intel, intent) and assemble the feature matrix.
+    Threat intel already fetched by the async client can be passed in.
+    Cluster risk and the self-transfer heuristic use the address clusters,
+    interaction frequency, recipient age and counterparty risk the
+    transaction graph. Batches look each sender's wallet features up once
+    and leave the shared wallet cache to interactive requests.
+    """
+    clusters = get_address_clusters()
+    graph = get_transaction_graph()
+    with stage("fraud", "feature_extraction"):
+        if len(requests) == 1:
+            sender_features = {requests[0].sender.lower(): get_wallet_features(requests[0].sender)}
+        else:
+            sender_features = get_bulk_wallet_features(request.sender for request in requests)
+        features = []
+        for request in requests:
+            transaction_features = extract_features({
+                "sender": request.sender,
+                "recipient": request.recipient,
+                "value": request.value,
+                "gas": 21000
+            }, clusters=clusters, graph=graph)
+            # The sender's age is known from its wallet features
+            transaction_features["wallet_age_days"] = sender_features[request.sender.lower()]["wallet_age"]
+            features.append(transaction_features)
+
+    if threats is None:
+        with stage("fraud", "threat_intel"):
+            threats = [query_threat_intel(request.recipient, request.token) for request in requests]
+
+    with stage("fraud", "intent_inference"):
+        if len(requests) == 1:
+            # One row is cheaper through the scalar rules than through array setup
+            intent_confidences = [infer_transaction_intent(requests[0].sender, requests[0].recipient,
+                                                           requests[0].value, clusters=clusters)["confidence"]]
+        else:
+            intent_confidences = infer_transaction_intents(
+                [request.sender for request in requests], [request.recipient for request in requests],
+                [request.value for request in requests], seed=_intent_rng, clusters=clusters
+            ).confidences
+
+    with stage("fraud", "vector_assembly"):
+        X = build_feature_matrix(
+            features,
+            [threat["threat_score"] for threat in threats],
+            intent_confidences
+        )
+    return X, features, threats
+
+def _risk_scores(fraud_probability: np.ndarray):
+    """Map fraud probabilities onto the 0-100 risk score and its level."""
+    risk_scores = np.round(np.clip(fraud_probability, 0.0, 1.0) * 100, 2)
+    return risk_scores, RISK_LEVELS[np.digitize(risk_scores, RISK_LEVEL_THRESHOLDS)]
+
+def _explain_risk(request: TransactionRiskRequest, features: dict, threat: dict,
+                  riskScore: float, riskLevel: str) -> TransactionRiskResponse:
+    """Explanation and flagged features behind one transaction's risk score."""
+    explanation = []
+    flaggedFeatures = []
+
+    if request.value > 1000:
+        explanation.append("The transaction amount is unusually large")
+        flaggedFeatures.append(RiskFeature(
+            feature="transaction_value",
+            value=request.value,
+            threshold=1000
+        ))
+
+    if threat["is_blacklisted_wallet"]:
+        explanation.append(f"The recipient address is blacklisted: {threat['blacklist_reason']}")
+
+    if threat["threat_score"] > 0.5:
+        flaggedFeatures.append(RiskFeature(
+            feature="threat_score",
+            value=threat["threat_score"],
+            threshold=0.5
+        ))
+
+    if threat["contract_flag"]:
+        explanation.append(f"The recipient contract is flagged as {threat['contract_flag']}")
+
+    if features["recipient_cluster_risk"] > 0.7:
+        explanation.append("The recipient belongs to a high-risk address cluster")
+        flaggedFeatures.append(RiskFeature(
+            feature="recipient_cluster_risk",
+            value=features["recipient_cluster_risk"],
+            threshold=0.7
+        ))
+
+    if features.get("recipient_counterparty_risk", 0.0) > COUNTERPARTY_RISK_THRESHOLD:
+        explanation.append("The recipient transacts with blacklisted addresses or their counterparties")
+        flaggedFeatures.append(RiskFeature(
+            feature="recipient_counterparty_risk",
+            value=features["recipient_counterparty_risk"],
+            threshold=COUNTERPARTY_RISK_THRESHOLD
+        ))
+
+    if riskLevel == "low":
+        explanation.append("No significant risk factors detected")
+
+    return TransactionRiskResponse(
+        riskScore=riskScore,
+        riskLevel=riskLevel,
+        explanation=explanation,
+        flaggedFeatures=flaggedFeatures if flaggedFeatures else None
+    )
+
+def _score_transactions(models: ModelRegistry, requests: List[TransactionRiskRequest],
+                        threats: Optional[list] = None) -> List[TransactionRiskResponse]:
+    """Full risk responses for a batch, from one stacked model call."""
+    X, features, threats = _gather_signals(requests, threats)
+    risk_scores, risk_levels = _risk_scores(models.predict_fraud_probability(X))
+    return [
+        _explain_risk(request, transaction_features, threat, float(score), str(level))
+        for request, transaction_features, threat, score, level
+        in zip(requests, features, threats, risk_scores, risk_levels)
+    ]
+
 @router.post("/transaction-risk", response_model=TransactionRiskResponse)
-async def analyze_transaction_risk(request: TransactionRiskRequest):
+async def analyze_transaction_risk(
+    request: TransactionRiskRequest,
+    models: ModelRegistry = Depends(get_model_registry),
+    threat_client: Optional[ThreatIntelClient] = Depends(get_threat_client)
+):
     """
     Analyze the risk level of a cryptocurrency transaction.
     """
     try:
-        # Mock implementation - no ML model needed
-        # Base risk score on transaction amount and recipient
-        recipientRisk = int(request.recipient[-2:], 16) % 100 / 100 if len(request.recipient) >= 2 else 0.5
-        amountRisk = min(request.value / 10000, 1)
-        riskScore = min((recipientRisk * 0.7 + amountRisk * 0.3) * 100, 100)
-        
-        # Determine risk level
-        if riskScore < 25:
-            riskLevel = "low"
-        elif riskScore < 50:
-            riskLevel = "medium"
-        elif riskScore < 75:
-            riskLevel = "high"
-        else:
-            riskLevel = "critical"
-        
-        # Generate explanation and features
-        explanation = []
-        flaggedFeatures = []
-        
-        if request.value > 1000:
-            explanation.append("The transaction amount is unusually large")
-            flaggedFeatures.append(RiskFeature(
-                feature="transaction_value",
-                value=request.value,
-                threshold=1000
-            ))
-        
-        if recipientRisk > 0.5:
-            explanation.append("The recipient address has limited transaction history")
-            flaggedFeatures.append(RiskFeature(
-                feature="recipient_reputation",
-                value=recipientRisk * 100,
-                threshold=50
-            ))
-        
-        if riskLevel == "low":
-            explanation.append("No significant risk factors detected")
-        
-        return TransactionRiskResponse(
-            riskScore=riskScore,
-            riskLevel=riskLevel,
-            explanation=explanation,
-            flaggedFeatures=flaggedFeatures if flaggedFeatures else None
+        threats = await _fetch_threats([request], threat_client)
+        (response,) = await run_in_threadpool(_score_transactions, models, [request], threats)
+        return response
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing transaction risk: {str(e)}")
+
+@router.post("/transaction-risk/batch", response_model=BatchTransactionRiskResponse)
+async def analyze_transaction_risk_batch(
+    request: BatchTransactionRiskRequest,
+    models: ModelRegistry = Depends(get_model_registry),
+    threat_client: Optional[ThreatIntelClient] = Depends(get_threat_client)
+):
+    """
+    Score many transactions with a single scaler.transform and
+    decision_function call over the stacked feature matrix.
+    """
+    if not request.transactions:
+        raise HTTPException(status_code=400, detail="No transactions to score")
+    if len(request.transactions) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(request.transactions)} transactions exceeds the limit of {MAX_BATCH_SIZE}"
         )
-        
+
+    try:
+        threats = await _fetch_threats(request.transactions, threat_client)
+        X, _, _ = await run_in_threadpool(_gather_signals, request.transactions, threats)
+        fraud_probability = await run_in_threadpool(models.predict_fraud_probability, X)
+        risk_scores, risk_levels = _risk_scores(fraud_probability)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing transaction risk: {str(e)}")
+
+    return BatchTransactionRiskResponse(
+        count=len(request.transactions),
+        results=[
+            BatchTransactionRisk(fraudProbability=round(float(p), 4), riskScore=float(score), riskLevel=str(level))
+            for p, score, level in zip(fraud_probability, risk_scores, risk_levels)
+        ]
+    )
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body itself.
+    The stock class listens for disconnects with a concurrent receive(),
+    which would swallow request chunks; here a disconnect surfaces as
+    ClientDisconnect from request.stream() instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+async def _score_stream_lines(entries: List[tuple], models: ModelRegistry,
+                              threat_client: Optional[ThreatIntelClient]) -> bytes:
+    """
+    NDJSON output for one micro-batch of (line number, parsed transaction or
+    error message) entries: one line per entry, in input order.
+    """
+    transactions = [entry for _, entry in entries if isinstance(entry, TransactionRiskRequest)]
+    results = iter(())
+    if transactions:
+        threats = await _fetch_threats(transactions, threat_client)
+        results = iter(await run_in_threadpool(_score_transactions, models, transactions, threats))
+    lines = [
+        next(results).json() if isinstance(entry, TransactionRiskRequest)
+        else json.dumps({"line": line_number, "error": entry})
+        for line_number, entry in entries
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+async def _stream_transaction_risk(request: Request, models: ModelRegistry,
+                                   threat_client: Optional[ThreatIntelClient]):
+    """
+    Read the body chunk by chunk and yield the scored lines of each
+    micro-batch. The next chunk is only read once the previous output has
+    been sent, so a slow reader throttles the upload (and uvicorn in turn
+    stops reading the socket): memory stays at one chunk plus one batch.
+    """
+    buffer = b""
+    line_number = 0
+    pending: List[tuple] = []
+
+    def parse(line: bytes) -> Union[TransactionRiskRequest, str]:
+        try:
+            return TransactionRiskRequest.parse_raw(line)
+        except ValueError as e:
+            return f"Invalid transaction: {str(e)}"
+
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line_number += 1
+                if line.strip():
+                    pending.append((line_number, parse(line)))
+                if len(pending) == STREAM_BATCH_SIZE:
+                    yield await _score_stream_lines(pending, models, threat_client)
+                    pending = []
+            # Whatever this chunk completed goes out before reading on
+            if pending:
+                yield await _score_stream_lines(pending, models, threat_client)
+                pending = []
+            # Everything before an over-long line has been answered; it ends the stream
+            if len(buffer) > MAX_STREAM_LINE_BYTES:
+                yield json.dumps({"line": line_number + 1,
+                                  "error": f"Line exceeds {MAX_STREAM_LINE_BYTES} bytes"}) + "\n"
+                return
+        if buffer.strip():
+            yield await _score_stream_lines([(line_number + 1, parse(buffer))], models, threat_client)
+    except ClientDisconnect:
+        return
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing transaction risk: {str(e)}") 
\ No newline at end of file
+        yield json.dumps({"error": f"Error analyzing transaction risk: {str(e)}"}) + "\n"
+
+@router.post("/transaction-risk/stream", response_class=StreamingResponse)
+async def analyze_transaction_risk_stream(
+    request: Request,
+    models: ModelRegistry = Depends(get_model_registry),
+    threat_client: Optional[ThreatIntelClient] = Depends(get_threat_client)
+):
+    """
+    Score a newline-delimited JSON body of transactions (one
+    TransactionRiskRequest per line) as it arrives, streaming back one
+    TransactionRiskResponse line per transaction in input order. Lines that
+    fail to parse come back as {"line": n, "error": ...} in their place. A
+    line longer than MAX_STREAM_LINE_BYTES gets such an error entry too, after
+    every line before it has been answered, and ends the stream.
+    """
+    return _DuplexStreamingResponse(
+        _stream_transaction_risk(request, models, threat_client),
+        media_type="application/x-ndjson"
+    )
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict
 
+from ..model_registry import MAX_CREDIT_SCORE, ModelRegistry, get_model_registry
+from ..wallet_cache import get_credit_score
+from ..wallet_features import credit_factors
+
 class CreditScoreResponse(BaseModel):
     score: int
     maxScore: int
@@ -26,7 +31,10 @@ class WalletAnalysisResponse(BaseModel):
 router = APIRouter()
 
 @router.get("/wallet-analysis", response_model=WalletAnalysisResponse)
-async def get_wallet_analysis(wallet: str = Query(..., description="The wallet address to analyze")):
+async def get_wallet_analysis(
+    wallet: str = Query(..., description="The wallet address to analyze"),
+    models: ModelRegistry = Depends(get_model_registry)
+):
     """
     Provide a comprehensive analysis of a wallet address.
     """
@@ -34,24 +42,9 @@ async def get_wallet_analysis(wallet: str = Query(..., description="The wallet a
         raise HTTPException(status_code=400, detail="Invalid wallet address")
     
     try:
-        # Mock implementation - create mock data for wallet analysis
-        # Credit score
-        address_hash = hash(wallet) % 350
-        score = 500 + address_hash
-        
-        # Determine credit score factors
-        positive_factors = [
-            "Long history of responsible transactions",
-            "No interactions with known suspicious addresses",
-            "Consistent transaction patterns"
-        ]
-        
-        negative_factors = []
-        if score < 750:
-            negative_factors = [
-                "Some interactions with newer protocols",
-                "Occasional high-value transactions"
-            ]
+        # Credit score, reused from /credit-score when it already ran for this wallet
+        score, features = await run_in_threadpool(get_credit_score, wallet, models)
+        factors = credit_factors(features)
         
         # Risk profile based on score
         if score > 750:
@@ -76,21 +69,17 @@ async def get_wallet_analysis(wallet: str = Query(..., description="The wallet a
                 "Unusual transaction patterns"
             ]
         
-        # Wallet stats based on address
-        address_num = int(wallet[-4:], 16) if wallet[-4:].isalnum() else 500
-        age = 30 + (address_num % 1000)
-        transaction_count = 10 + (address_num % 500)
-        average_value = 50 + (address_num % 1000)
-        total_volume = average_value * transaction_count
+        # Wallet stats from the same features the score was computed on
+        age = features['wallet_age']
+        transaction_count = features['transaction_count']
+        average_value = features['average_tx_value']
+        total_volume = features['transaction_volume_total']
         
         return WalletAnalysisResponse(
             creditScore=CreditScoreResponse(
                 score=score,
-                maxScore=850,
-                factors={
-                    "positive": positive_factors,
-                    "negative": negative_factors
-                },
+                maxScore=MAX_CREDIT_SCORE,
+                factors=factors,
                 lastUpdated=f"{age} days ago"
             ),
             riskProfile=RiskProfile(
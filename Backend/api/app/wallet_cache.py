@@ -0,0 +1,140 @@
+"""
+Bounded in-process cache of per-wallet features and scores.
+
+The frontend asks for the credit score and the wallet analysis of the same
+wallet as soon as it connects, and both need the same derived features and
+the same model inference. Every router goes through the shared
+``wallet_cache`` so the second lookup is a dictionary hit. Entries are keyed
+by wallet and model version, so reloading a model never serves stale scores.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+from .metrics import stage
+from .model_registry import ModelRegistry
+from .wallet_features import derive_wallet_features
+
+# Bump when derive_wallet_features changes what it returns
+FEATURES_VERSION = "features-1"
+
+
+class WalletCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live.
+
+    When the cache is full the least recently used entry is evicted; entries
+    older than ``ttl_seconds`` are dropped on access.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        found, value = self._lookup(key)
+        return value if found else default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        found, value = self._lookup(key)
+        if not found:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Shared by every router
+wallet_cache = WalletCache(
+    max_entries=int(os.getenv("WALLET_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("WALLET_CACHE_TTL_SECONDS", "300"))
+)
+
+
+def _derive_timed(wallet: str) -> Dict[str, float]:
+    with stage("credit", "feature_derivation"):
+        return derive_wallet_features(wallet)
+
+
+def get_wallet_features(wallet: str) -> Dict[str, float]:
+    """Derived credit features for a wallet, shared across routers."""
+    key = (wallet.lower(), FEATURES_VERSION, "features")
+    return wallet_cache.get_or_compute(key, lambda: _derive_timed(wallet))
+
+
+def get_bulk_wallet_features(wallets: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Derived features for every unique wallet of a bulk request, keyed by
+    lower-cased wallet. Each wallet is looked up once; cached entries are
+    used, but misses are derived without being stored, so one large batch
+    cannot flush the wallets interactive requests keep warm.
+    """
+    features = {}
+    for wallet in wallets:
+        wallet_key = wallet.lower()
+        if wallet_key not in features:
+            cached = wallet_cache.get((wallet_key, FEATURES_VERSION, "features"))
+            features[wallet_key] = cached if cached is not None else _derive_timed(wallet)
+    return features
+
+
+def get_credit_score(wallet: str, models: ModelRegistry) -> Tuple[int, Dict[str, float]]:
+    """Credit score and features for a wallet, computed once per model version."""
+    features = get_wallet_features(wallet)
+    key = (wallet.lower(), models.credit_version, "credit_score")
+    score = wallet_cache.get_or_compute(
+        key, lambda: int(round(models.predict_credit_scores([features])[0]))
+    )
+    return score, features
@@ -0,0 +1,76 @@
+"""
+Wallet feature derivation for the credit scoring endpoints.
+"""
+import hashlib
+from typing import Dict, List
+
+import numpy as np
+
+
+def derive_wallet_features(wallet: str) -> Dict[str, float]:
+    """
+    Derive the credit model inputs for a wallet address.
+
+    No on-chain indexer is wired in yet, so features are drawn from a
+    generator seeded by the address, inside the ranges found in
+    synthetic_credit_data.csv. The same wallet always gets the same features.
+    """
+    seed = int.from_bytes(hashlib.sha256(wallet.lower().encode()).digest()[:8], "little")
+    rng = np.random.default_rng(seed)
+
+    eth_ratio, btc_ratio, nft_ratio = rng.dirichlet([8.0, 7.0, 5.0])
+
+    return {
+        'wallet_age': int(rng.integers(30, 1000)),
+        'transaction_volume_total': int(rng.integers(1000, 100000)),
+        'transaction_count': int(rng.integers(10, 1000)),
+        'active_days': int(rng.integers(10, 500)),
+        'average_tx_value': int(rng.integers(100, 2000)),
+        'gas_spent_total': int(rng.integers(1000, 50000)),
+        'tokens_held': int(rng.integers(1, 50)),
+        'DEX_activity_count': int(rng.integers(0, 200)),
+        'contract_interactions': int(rng.integers(0, 200)),
+        'NFT_activity': int(rng.integers(0, 50)),
+        'liquidation_events': int(rng.choice(3, p=[0.7, 0.2, 0.1])),
+        'scam_interaction_count': int(rng.choice(5, p=[0.5, 0.2, 0.15, 0.1, 0.05])),
+        'failed_transaction_count': int(rng.integers(0, 20)),
+        'eth_ratio': float(eth_ratio),
+        'btc_ratio': float(btc_ratio),
+        'nft_ratio': float(nft_ratio),
+        'nft_collection_diversity': int(rng.integers(1, 20)),
+        'average_eth_holding_age': float(rng.uniform(30, 365)),
+        'average_btc_holding_age': float(rng.uniform(30, 365)),
+    }
+
+
+def credit_factors(features: Dict[str, float]) -> Dict[str, List[str]]:
+    """Human readable reasons behind a credit score."""
+    positive_factors = []
+    negative_factors = []
+
+    if features['wallet_age'] >= 365:
+        positive_factors.append(f"Wallet has significant age ({features['wallet_age']} days)")
+    elif features['wallet_age'] < 90:
+        negative_factors.append(f"Limited wallet history ({features['wallet_age']} days)")
+
+    if features['transaction_count'] >= 200:
+        positive_factors.append(f"Active transaction history ({features['transaction_count']} transactions)")
+    if features['tokens_held'] >= 20:
+        positive_factors.append(f"Diverse token portfolio ({features['tokens_held']} tokens)")
+    if features['DEX_activity_count'] >= 50:
+        positive_factors.append(f"Significant DEX activity ({features['DEX_activity_count']} interactions)")
+
+    if features['liquidation_events'] == 0:
+        positive_factors.append("No liquidation events")
+    else:
+        negative_factors.append(f"Liquidated {features['liquidation_events']} time(s)")
+
+    if features['scam_interaction_count'] > 0:
+        negative_factors.append("Interaction with suspicious addresses detected")
+    if features['failed_transaction_count'] > 10:
+        negative_factors.append("Higher than average failed transactions")
+
+    return {
+        "positive": positive_factors,
+        "negative": negative_factors
+    }
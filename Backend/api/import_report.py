@@ -0,0 +1,111 @@
+"""
+Import-time report for the API, to keep cold starts fast.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+summarizes the trace: total import time, the slowest top-level packages
+(self time summed over all their submodules) and the slowest imports by
+cumulative time. Exits non-zero when the total exceeds the budget or when a
+deferred heavy library (pandas, scikit-learn, xgboost, ...) is imported.
+
+    python import_report.py
+    python import_report.py --budget-ms 800 --json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent
+
+# Cold-start budget for `import app.main`, in milliseconds
+DEFAULT_BUDGET_MS = 1000
+
+# Loaded by ModelRegistry.load / warmup or on first use, never at import time
+DEFERRED_PACKAGES = ["pandas", "sklearn", "xgboost", "scipy", "joblib", "matplotlib", "seaborn", "httpx"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def trace_imports(module):
+    """[(name, depth, self_us, cumulative_us)] from one fresh interpreter, in import order."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(API_DIR), os.getenv("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        cwd=API_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"❌ import {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def summarize(rows, top):
+    by_package = defaultdict(int)
+    for name, _, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    slowest = sorted(rows, key=lambda row: row[3], reverse=True)[:top]
+    return {
+        "totalMs": round(sum(row[2] for row in rows) / 1000, 1),
+        "modules": len(rows),
+        "packages": [{"package": name, "selfMs": round(us / 1000, 1)} for name, us in packages],
+        "slowest": [
+            {"module": name, "depth": depth, "cumulativeMs": round(cumulative_us / 1000, 1)}
+            for name, depth, _, cumulative_us in slowest
+        ],
+        "deferredImported": sorted({name.split(".")[0] for name, *_ in rows} & set(DEFERRED_PACKAGES)),
+    }
+
+
+def print_report(report, module, budget_ms):
+    print(f"import {module}: {report['totalMs']:.1f} ms over {report['modules']} modules "
+          f"(budget {budget_ms} ms)\n")
+    print(f"{'package':<32}{'self ms':>10}")
+    for row in report["packages"]:
+        print(f"{row['package']:<32}{row['selfMs']:>10.1f}")
+    print(f"\n{'module':<48}{'cumulative ms':>14}")
+    for row in report["slowest"]:
+        print(f"{'  ' * row['depth'] + row['module']:<48}{row['cumulativeMs']:>14.1f}")
+    print()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Summarize and budget the API's import time")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters; the fastest run is reported")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON instead of tables")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # The fastest run is the least disturbed by the rest of the machine
+    runs = [summarize(trace_imports(args.module), args.top) for _ in range(args.runs)]
+    report = min(runs, key=lambda run: run["totalMs"])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.module, args.budget_ms)
+
+    failures = []
+    if report["totalMs"] > args.budget_ms:
+        failures.append(f"import {args.module} took {report['totalMs']:.1f} ms, over the {args.budget_ms} ms budget")
+    if report["deferredImported"]:
+        failures.append(f"heavy libraries imported eagerly: {', '.join(report['deferredImported'])}")
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print(f"✅ import {args.module} is within budget", file=sys.stderr)
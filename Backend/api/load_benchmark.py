@@ -0,0 +1,204 @@
+"""
+Load benchmark for the ZKredit API.
+
+Drives the credit score, transaction risk, transaction intent and wallet
+analysis routers with a seeded, realistic request mix at a fixed
+concurrency, either in-process through the ASGI app or against a running
+server (--url). Prints throughput and p50/p95/p99 latency per endpoint as
+JSON, and exits non-zero when the run regresses past a stored baseline.
+
+    python load_benchmark.py --requests 5000 --concurrency 32
+    python load_benchmark.py --save-baseline            # record a baseline
+    python load_benchmark.py --baseline load_benchmark_baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+import app  # puts Backend/cScoring and Backend/flagger on sys.path
+from threat_intel import DEFAULT_BLACKLIST
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "load_benchmark_baseline.json")
+DEFAULT_MIX = "credit-score=3,wallet-analysis=2,transaction-risk=3,transaction-intent=2"
+ENDPOINTS = ["credit-score", "wallet-analysis", "transaction-risk", "transaction-intent"]
+
+# Addresses on the threat intel stub blacklist, so some risk requests hit it
+BLACKLISTED = list(DEFAULT_BLACKLIST)
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r} in --mix (expected one of {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def build_requests(n: int, mix: dict, wallets: int, seed: int) -> list:
+    """
+    Seeded list of (endpoint, method, path, params, json body). Wallets are
+    drawn Zipf-style from a fixed pool, like real traffic where a few wallets
+    are looked up over and over, and transfer values are log-normal.
+    """
+    rng = np.random.default_rng(seed)
+    pool = ["0x" + rng.bytes(20).hex() for _ in range(wallets)]
+    names = list(mix)
+    probabilities = np.array([mix[name] for name in names]) / sum(mix.values())
+
+    endpoints = rng.choice(len(names), size=n, p=probabilities)
+    senders = (rng.zipf(1.3, size=n) - 1) % wallets
+    recipients = rng.integers(0, wallets, size=n)
+    blacklisted = rng.random(n) < 0.02
+    values = np.round(rng.lognormal(mean=0.0, sigma=2.0, size=n), 4)
+
+    requests = []
+    for i in range(n):
+        endpoint = names[endpoints[i]]
+        sender = pool[senders[i]]
+        recipient = BLACKLISTED[i % len(BLACKLISTED)] if blacklisted[i] else pool[recipients[i]]
+        if endpoint in ("credit-score", "wallet-analysis"):
+            requests.append((endpoint, "GET", f"/api/{endpoint}", {"wallet": sender}, None))
+        else:
+            body = {"sender": sender, "recipient": recipient, "value": float(values[i])}
+            if endpoint == "transaction-risk":
+                body["token"] = "ETH"
+            requests.append((endpoint, "POST", f"/api/{endpoint}", None, body))
+    return requests
+
+
+async def run_load(client: httpx.AsyncClient, requests: list, concurrency: int) -> dict:
+    """Closed-loop load: `concurrency` workers each send their next request as soon as the last one returns."""
+    latencies = {name: [] for name in ENDPOINTS}
+    errors = {name: 0 for name in ENDPOINTS}
+    queue = iter(requests)
+
+    async def worker():
+        for endpoint, method, path, params, body in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies[endpoint].append(time.perf_counter() - start)
+            if not ok:
+                errors[endpoint] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    def summarize(samples, error_count):
+        samples = np.asarray(samples) * 1000
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if len(samples) else (0.0, 0.0, 0.0)
+        return {
+            "requests": int(len(samples)),
+            "errors": int(error_count),
+            "throughput": round(len(samples) / elapsed, 2),
+            "p50Ms": round(float(p50), 3),
+            "p95Ms": round(float(p95), 3),
+            "p99Ms": round(float(p99), 3)
+        }
+
+    return {
+        "concurrency": concurrency,
+        "elapsedSeconds": round(elapsed, 3),
+        "overall": summarize(sum(latencies.values(), []), sum(errors.values())),
+        "endpoints": {name: summarize(latencies[name], errors[name]) for name in ENDPOINTS if latencies[name]}
+    }
+
+
+async def benchmark(args) -> dict:
+    requests = build_requests(args.warmup + args.requests, parse_mix(args.mix), args.wallets, args.seed)
+    warmup, measured = requests[:args.warmup], requests[args.warmup:]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+            await run_load(client, warmup, args.concurrency)
+            report = await run_load(client, measured, args.concurrency)
+        report["target"] = args.url
+        return report
+
+    from app.main import app
+    # Run the app's own startup (model and blacklist loading) outside the timings
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", limits=limits) as client:
+            await run_load(client, warmup, args.concurrency)
+            report = await run_load(client, measured, args.concurrency)
+    report["target"] = "in-process"
+    return report
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions beyond `tolerance` (a fraction) in throughput or tail latency."""
+    regressions = []
+    for name, current in [("overall", report["overall"])] + list(report["endpoints"].items()):
+        reference = baseline["overall"] if name == "overall" else baseline["endpoints"].get(name)
+        if reference is None:
+            continue
+        if current["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']} req/s < baseline {reference['throughput']}")
+        for key in ("p50Ms", "p95Ms", "p99Ms"):
+            if current[key] > reference[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {current[key]} > baseline {reference[key]}")
+        if current["errors"] > reference["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors > baseline {reference['errors']}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load benchmark for the ZKredit API")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs")
+    parser.add_argument("--wallets", type=int, default=1000, help="size of the wallet pool requests draw from")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline report to compare against, if it exists")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed fractional regression in throughput and latency percentiles")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(benchmark(args))
+    report["config"] = {"mix": args.mix, "wallets": args.wallets, "seed": args.seed}
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Saved baseline to {args.baseline}", file=sys.stderr)
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"❌ Regressed past the baseline (tolerance {args.tolerance:.0%}):", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ Within {args.tolerance:.0%} of the baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
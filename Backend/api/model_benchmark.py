@@ -0,0 +1,160 @@
+"""
+Microbenchmarks for the model hot paths behind the API.
+
+Times the duration predictor, the credit MinMaxScaler and XGBoost model,
+the duration StandardScaler, and the fraud StandardScaler and
+IsolationForest at 1, 32, 1k and 100k rows, on inputs generated from the
+schemas of synthetic_credit_data.csv and fraud_detection_data.csv. Each
+case also reports the peak memory it allocates, measured in a separate
+untimed run under tracemalloc.
+
+    python model_benchmark.py
+    python model_benchmark.py --sizes 1 32 --cases fraud_decision_function --json
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from app import CSCORING_DIR, FLAGGER_DIR
+from app.model_registry import registry
+from fraud_scoring import FEATURE_COLUMNS
+
+DEFAULT_SIZES = [1, 32, 1000, 100000]
+RATIO_COLUMNS = ["eth_ratio", "btc_ratio", "nft_ratio"]
+
+
+def schema_sampler(csv_path, columns, seed):
+    """
+    Returns sample(n) -> DataFrame drawing each column uniformly within the
+    range seen in the CSV, keeping integer columns integral. Portfolio
+    ratios are redrawn together so they sum to 1, as the predictor requires.
+    """
+    data = pd.read_csv(csv_path)[columns]
+    rng = np.random.default_rng(seed)
+
+    def sample(n):
+        frame = {}
+        for column in columns:
+            low, high = data[column].min(), data[column].max()
+            if pd.api.types.is_integer_dtype(data[column]):
+                frame[column] = rng.integers(low, high + 1, size=n).astype(np.float64)
+            else:
+                frame[column] = rng.uniform(low, high, size=n)
+        if set(RATIO_COLUMNS) <= set(columns):
+            ratios = rng.dirichlet([8.0, 7.0, 5.0], size=n)
+            for j, column in enumerate(RATIO_COLUMNS):
+                frame[column] = ratios[:, j]
+        return pd.DataFrame(frame, columns=columns)
+
+    return sample
+
+
+def build_cases(models, seed):
+    """name -> (prepare(n) -> input, run(input)) for every hot path."""
+    credit_sample = schema_sampler(
+        CSCORING_DIR / "synthetic_credit_data.csv",
+        [c for c in models.credit_feature_names if c != "predicted_holding_duration"], seed
+    )
+    fraud_sample = schema_sampler(FLAGGER_DIR / "fraud_detection_data.csv", FEATURE_COLUMNS, seed)
+    predictor = models.duration_predictor
+
+    def credit_matrix(n):
+        frame = credit_sample(n)
+        frame["predicted_holding_duration"] = predictor.predict(frame)
+        return frame[models.credit_feature_names]
+
+    return {
+        "duration_predict": (credit_sample, predictor.predict),
+        "duration_standard_scaler": (
+            lambda n: credit_sample(n)[predictor.feature_columns], predictor.scaler.transform
+        ),
+        "credit_minmax_scaler": (credit_matrix, models.credit_scaler.transform),
+        "credit_xgboost_predict": (
+            lambda n: models.credit_scaler.transform(credit_matrix(n)), models.credit_model.predict
+        ),
+        "credit_pipeline": (credit_sample, models.predict_credit_scores),
+        "fraud_standard_scaler": (lambda n: fraud_sample(n).to_numpy(), models.fraud_scaler.transform),
+        "fraud_decision_function": (
+            lambda n: models.fraud_scaler.transform(fraud_sample(n).to_numpy()), models.fraud_model.decision_function
+        ),
+    }
+
+
+def measure(run, data, budget, max_runs):
+    """Latencies (seconds) of repeated run(data) calls within roughly `budget` seconds."""
+    run(data)  # warm-up
+    latencies = []
+    deadline = time.perf_counter() + budget
+    while len(latencies) < max_runs and (len(latencies) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        run(data)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+
+def peak_memory(run, data):
+    """Peak bytes traced by tracemalloc during a single run(data)."""
+    tracemalloc.start()
+    try:
+        run(data)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(case_names, sizes, budget, max_runs, seed):
+    models = registry.load()
+    cases = build_cases(models, seed)
+    results = []
+    for name in case_names:
+        prepare, run = cases[name]
+        for n in sizes:
+            data = prepare(n)
+            latencies = measure(run, data, budget, max_runs)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            results.append({
+                "case": name,
+                "rows": n,
+                "runs": len(latencies),
+                "p50Ms": round(p50 * 1000, 4),
+                "p99Ms": round(p99 * 1000, 4),
+                "perRowUs": round(p50 / n * 1e6, 3),
+                "rowsPerSecond": round(n / p50, 1),
+                "peakMemoryMiB": round(peak_memory(run, data) / 1024 ** 2, 3)
+            })
+    return results
+
+
+def print_table(results):
+    print(f"{'case':<26}{'rows':>8}{'runs':>6}{'p50 ms':>12}{'p99 ms':>12}{'µs/row':>11}{'rows/s':>14}{'peak MiB':>10}")
+    for r in results:
+        print(f"{r['case']:<26}{r['rows']:>8}{r['runs']:>6}{r['p50Ms']:>12.3f}{r['p99Ms']:>12.3f}"
+              f"{r['perRowUs']:>11.2f}{r['rowsPerSecond']:>14.0f}{r['peakMemoryMiB']:>10.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the ZKredit model hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="batch sizes in rows")
+    parser.add_argument("--cases", nargs="+", help="subset of cases to run (default: all)")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds of timed calls per case and size")
+    parser.add_argument("--max-runs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print results as JSON instead of a table")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    all_cases = list(build_cases(registry.load(), args.seed))
+    unknown = set(args.cases or []) - set(all_cases)
+    if unknown:
+        raise SystemExit(f"Unknown cases {sorted(unknown)}; available: {', '.join(all_cases)}")
+    results = benchmark(args.cases or all_cases, args.sizes, args.budget, args.max_runs, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
@@ -1,10 +1,186 @@
+import argparse
+import bisect
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
 import uvicorn
 
-if __name__ == "__main__":
+logger = logging.getLogger("uvicorn.error")
+
+# Longest wait before replacing a crashed worker
+MAX_RESTART_DELAY = 30.0
+
+# Exit code of a worker whose app failed to start (uvicorn's own STARTUP_FAILURE)
+STARTUP_FAILURE = 3
+
+
+def serve_development(args):
+    """Single auto-reloading worker for local development."""
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=args.host,
+        port=args.port,
         reload=True,
         log_level="info"
-    ) 
\ No newline at end of file
+    )
+
+
+def _bind_socket(host, port, backlog):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, args):
+    """Body of a forked worker: serve the inherited socket until told to stop."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(
+        app,
+        log_level="info",
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_concurrency=args.limit_concurrency
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    os._exit(0 if server.started else STARTUP_FAILURE)
+
+
+def serve_production(args):
+    """
+    Pre-fork server: load every model and lookup structure once in this
+    master process (app.main.preload), then fork the workers so the XGBoost,
+    RandomForest and IsolationForest memory, the blacklist index, the address
+    clusters and the transaction graph are shared copy-on-write between them.
+
+    SIGTERM / SIGINT stop the workers gracefully (in-flight requests get up to
+    --graceful-timeout seconds). Workers that die on their own are replaced
+    after a delay that doubles with every recent crash; when more than
+    --max-restarts crashes fall within --restart-window seconds the master
+    stops the rest and exits with status 1 instead of fork-looping.
+    """
+    # One native thread per worker: the workers already cover every core
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+    from app.main import app, preload
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    preload()
+
+    # Move everything loaded so far out of the GC's reach, so collections in
+    # the workers do not write to (and un-share) the preloaded pages
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind_socket(args.host, args.port, args.backlog)
+    logger.info("Master %d listening on http://%s:%d with %d workers", os.getpid(), args.host, args.port, args.workers)
+
+    workers = set()
+    stopping = False
+    stop_deadline = None
+    failed = False
+    crashes = []          # monotonic times of recent unexpected worker exits
+    restarts_due = []     # sorted monotonic times at which replacements are forked
+
+    def spawn_worker():
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(app, sock, args)
+        workers.add(pid)
+        logger.info("Started worker %d", pid)
+
+    def stop_workers():
+        nonlocal stopping, stop_deadline
+        stopping = True
+        stop_deadline = time.monotonic() + args.graceful_timeout + 5
+        for pid in workers:
+            os.kill(pid, signal.SIGTERM)
+
+    def stop(signum, frame):
+        if stopping:
+            return
+        logger.info("Received %s, shutting down %d workers", signal.Signals(signum).name, len(workers))
+        stop_workers()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.workers):
+        spawn_worker()
+
+    while workers or (restarts_due and not stopping):
+        while restarts_due and not stopping and restarts_due[0] <= time.monotonic():
+            restarts_due.pop(0)
+            spawn_worker()
+        pid, status = os.waitpid(-1, os.WNOHANG) if workers else (0, 0)
+        if pid == 0:
+            if stopping and time.monotonic() > stop_deadline:
+                for pid in workers:
+                    os.kill(pid, signal.SIGKILL)
+                stop_deadline = float("inf")
+            time.sleep(0.1)
+            continue
+        workers.discard(pid)
+        if stopping:
+            continue
+
+        # Negative for a worker killed by a signal
+        exit_code = os.waitstatus_to_exitcode(status)
+        now = time.monotonic()
+        crashes = [t for t in crashes if t > now - args.restart_window] + [now]
+        if len(crashes) > args.max_restarts:
+            logger.error("Worker %d exited with code %d, %d crashes within %ds; stopping the %d other workers",
+                         pid, exit_code, len(crashes), args.restart_window, len(workers))
+            failed = True
+            stop_workers()
+            continue
+        delay = min(args.restart_delay * 2 ** (len(crashes) - 1), MAX_RESTART_DELAY)
+        logger.warning("Worker %d exited with code %d, restarting in %.1fs", pid, exit_code, delay)
+        bisect.insort(restarts_due, now + delay)
+
+    sock.close()
+    if failed:
+        logger.error("Workers keep crashing, master exiting")
+        raise SystemExit(1)
+    logger.info("All workers stopped")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the ZKredit API")
+    parser.add_argument("--production", action="store_true",
+                        help="pre-fork workers sharing preloaded models instead of the reloading dev server")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("BACKLOG", "2048")))
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("KEEP_ALIVE", "5")),
+                        help="seconds to hold idle keep-alive connections open")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds workers get to finish in-flight requests on shutdown")
+    parser.add_argument("--limit-concurrency", type=int, default=None,
+                        help="per-worker cap on concurrent connections before answering 503")
+    parser.add_argument("--restart-delay", type=float, default=float(os.getenv("RESTART_DELAY", "1.0")),
+                        help="seconds before replacing a crashed worker, doubled for every recent crash")
+    parser.add_argument("--max-restarts", type=int, default=int(os.getenv("MAX_RESTARTS", "5")),
+                        help="worker crashes tolerated within --restart-window before the master exits")
+    parser.add_argument("--restart-window", type=int, default=int(os.getenv("RESTART_WINDOW", "60")),
+                        help="seconds over which worker crashes are counted")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.production:
+        serve_production(args)
+    else:
+        serve_development(args)
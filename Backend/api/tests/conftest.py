@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The app package is imported from Backend/api, as when run.py serves it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # Entering the client runs the lifespan, which loads the models
+    with TestClient(app) as client:
+        yield client
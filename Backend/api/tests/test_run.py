@@ -0,0 +1,52 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import time
+
+import pytest
+
+import run
+import app.main
+
+
+def production_args(**overrides):
+    args = dict(host="127.0.0.1", port=0, workers=2, backlog=16, keep_alive=5, graceful_timeout=1,
+                limit_concurrency=None, restart_delay=0.2, max_restarts=3, restart_window=60)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+@pytest.fixture
+def master(monkeypatch):
+    """serve_production without model loading, restoring what it changes in this process."""
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+    monkeypatch.setattr(app.main, "preload", lambda: None)
+    yield
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+    gc.unfreeze()
+
+
+def test_crash_looping_workers_are_backed_off_then_stop_the_master(master, monkeypatch, caplog):
+    monkeypatch.setattr(run, "_run_worker", lambda app, sock, args: os._exit(run.STARTUP_FAILURE))
+    start = time.monotonic()
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"), pytest.raises(SystemExit) as exit_info:
+        run.serve_production(production_args())
+    assert exit_info.value.code == 1
+
+    messages = [record.getMessage() for record in caplog.records]
+    restarts = [message for message in messages if "restarting in" in message]
+    assert all("exited with code 3," in message for message in restarts)
+    # Three crashes are tolerated, each restart waiting twice as long as the last
+    assert [message.rsplit(" ", 1)[1] for message in restarts] == ["0.2s", "0.4s", "0.8s"]
+    assert any("4 crashes within 60s" in message for message in messages)
+    assert time.monotonic() - start < 10
+
+
+def test_signalled_workers_report_negative_exit_codes(master, monkeypatch, caplog):
+    monkeypatch.setattr(run, "_run_worker", lambda app, sock, args: os.kill(os.getpid(), signal.SIGKILL))
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"), pytest.raises(SystemExit):
+        run.serve_production(production_args(workers=1, max_restarts=1))
+    assert any("exited with code -9," in record.getMessage() for record in caplog.records)
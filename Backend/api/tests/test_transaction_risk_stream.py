@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from app.model_registry import registry
+from app.routers import transaction_risk
+
+
+class ChunkedRequest:
+    """Stands in for the Request, delivering the body in the given chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def transaction(i):
+    return json.dumps({"sender": f"0x{i:040x}", "recipient": "0xrecipient", "value": float(i + 1)}).encode()
+
+
+def stream_chunks(chunks):
+    """Output lines of the streaming generator for a body arriving in these chunks."""
+    async def collect():
+        output = []
+        async for part in transaction_risk._stream_transaction_risk(ChunkedRequest(chunks), registry, None):
+            output.append(part.encode() if isinstance(part, str) else part)
+        return b"".join(output)
+
+    output = asyncio.run(collect())
+    assert output.endswith(b"\n")
+    return [json.loads(line) for line in output.splitlines()]
+
+
+@pytest.fixture(autouse=True)
+def small_batches(client, monkeypatch):
+    # client: the models are loaded by the app lifespan
+    monkeypatch.setattr(transaction_risk, "STREAM_BATCH_SIZE", 4)
+
+
+def test_endpoint_streams_one_result_per_line(client):
+    body = b"\n".join(transaction(i) for i in range(6)) + b"\n"
+    response = client.post("/api/transaction-risk/stream", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert len(results) == 6
+    assert all("riskScore" in result for result in results)
+
+
+def test_results_keep_input_order_across_batches_and_chunks():
+    lines = [transaction(i) if i % 5 else b"not json" for i in range(23)]
+    body = b"\n".join(lines) + b"\n"
+    # Chunk boundaries fall inside lines and across micro-batches
+    results = stream_chunks([body[i:i + 97] for i in range(0, len(body), 97)])
+    assert len(results) == 23
+    for i, result in enumerate(results):
+        if i % 5:
+            assert "riskScore" in result
+        else:
+            assert result["line"] == i + 1
+
+
+def test_invalid_lines_get_error_entries_in_their_place():
+    lines = [transaction(0), b"not json", transaction(1), b"", transaction(2),
+             b'{"sender": "0xa"}', transaction(3)]
+    results = stream_chunks([b"\n".join(lines) + b"\n"])
+    # The blank line 4 gets no entry but still counts towards line numbers
+    assert [result.get("line") for result in results] == [None, 2, None, None, 6, None]
+    assert results[1]["error"].startswith("Invalid transaction")
+    assert results[4]["error"].startswith("Invalid transaction")
+    assert all("riskScore" in results[i] for i in (0, 2, 3, 5))
+
+
+def test_final_line_without_trailing_newline_is_scored():
+    results = stream_chunks([transaction(0) + b"\n" + transaction(1)[:20], transaction(1)[20:]])
+    assert len(results) == 2
+    assert all("riskScore" in result for result in results)
+
+
+def test_over_long_line_is_reported_after_the_lines_before_it(monkeypatch):
+    monkeypatch.setattr(transaction_risk, "MAX_STREAM_LINE_BYTES", 200)
+    before = b"\n".join(transaction(i) for i in range(6)) + b"\n"
+    # One chunk completes six lines (a full batch plus pending ones) and starts the long one
+    results = stream_chunks([before + b"x" * 300, b"\n" + transaction(6) + b"\n"])
+    assert len(results) == 7
+    assert all("riskScore" in result for result in results[:6])
+    assert results[6] == {"line": 7, "error": "Line exceeds 200 bytes"}
@@ -0,0 +1,65 @@
+import time
+import numpy as np
+import pandas as pd
+from token_duration_predictor import TokenHoldingDurationPredictor
+
+SINGLE_ROW_RUNS = 500
+BATCH_SIZES = [32, 256, 1000, 100000]
+
+
+def time_calls(fn, runs):
+    """Run fn() `runs` times and return the per-call latencies in microseconds."""
+    latencies = np.empty(runs)
+    for i in range(runs):
+        start = time.perf_counter()
+        fn()
+        latencies[i] = (time.perf_counter() - start) * 1e6
+    return latencies
+
+
+def benchmark():
+    predictor = TokenHoldingDurationPredictor.load_model('trained_token_duration_model.joblib')
+    compiled = predictor.compile().compiled_model
+    forest = predictor.model
+    print(f"Compiled {compiled.n_trees} trees into {compiled.n_nodes} nodes (max depth {compiled.max_depth})")
+
+    # Realistic inputs: the duration features of the credit dataset, scaled
+    data = pd.read_csv('synthetic_credit_data.csv')[predictor.feature_columns]
+    X = predictor.scaler.transform(data)
+    rng = np.random.default_rng(42)
+
+    # 1. Outputs must be bit-identical to RandomForestRegressor.predict
+    expected = forest.predict(X)
+    actual = compiled.predict(X)
+    identical = np.array_equal(expected.view(np.uint64), actual.view(np.uint64))
+    print(f"Bit-identical on {len(X)} rows: {identical}")
+    if not identical:
+        raise SystemExit("❌ Compiled forest output differs from model.predict")
+
+    # 2. Single-wallet lookups
+    print(f"\nSingle-row latency over {SINGLE_ROW_RUNS} calls (µs):")
+    rows = X[rng.integers(0, len(X), SINGLE_ROW_RUNS)]
+    row_iter = iter(range(SINGLE_ROW_RUNS))
+    sklearn_latency = time_calls(lambda: forest.predict(rows[next(row_iter)][None, :]), SINGLE_ROW_RUNS)
+    row_iter = iter(range(SINGLE_ROW_RUNS))
+    compiled_latency = time_calls(lambda: compiled.predict(rows[next(row_iter)][None, :]), SINGLE_ROW_RUNS)
+    for name, latency in [("model.predict", sklearn_latency), ("compiled", compiled_latency)]:
+        print(f"  {name:<14} p50={np.percentile(latency, 50):9.1f}  p99={np.percentile(latency, 99):9.1f}")
+    print(f"  p50 speedup: {np.percentile(sklearn_latency, 50) / np.percentile(compiled_latency, 50):.1f}x")
+
+    # 3. Batches
+    print("\nBatch latency (ms):")
+    for batch_size in BATCH_SIZES:
+        batch = X[rng.integers(0, len(X), batch_size)]
+        runs = 20 if batch_size < 10000 else 3
+        sklearn_ms = np.median(time_calls(lambda: forest.predict(batch), runs)) / 1000
+        compiled_ms = np.median(time_calls(lambda: compiled.predict(batch), runs)) / 1000
+        assert np.array_equal(forest.predict(batch), compiled.predict(batch))
+        print(f"  {batch_size:>7} rows: model.predict={sklearn_ms:9.2f}  compiled={compiled_ms:9.2f}  "
+              f"({sklearn_ms / compiled_ms:.1f}x)")
+    print(f"\npredictor.predict() uses the compiled walk up to {predictor.COMPILED_MAX_ROWS} rows "
+          f"and model.predict above that")
+
+
+if __name__ == "__main__":
+    benchmark()
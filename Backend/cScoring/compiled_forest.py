@@ -0,0 +1,183 @@
+import os
+import json
+import numpy as np
+
+ARRAY_NAMES = ("feature", "threshold", "children", "value", "roots")
+
+
+class CompiledForest:
+    """
+    Array-backed evaluator for a fitted sklearn RandomForestRegressor.
+
+    All trees are flattened into contiguous node arrays (feature, threshold,
+    children, value) and walked level by level with NumPy, for every row and
+    every tree at once. This skips sklearn's input validation and joblib
+    dispatch, and reproduces ``RandomForestRegressor.predict`` bit for bit.
+    The arrays can be saved as .npy files and memory-mapped back.
+    """
+
+    # Rows walked together; bounds the (rows x trees) index matrix in memory
+    CHUNK_SIZE = 256
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+
+    @classmethod
+    def from_estimator(cls, forest):
+        """Flatten the trees of a fitted RandomForestRegressor."""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        return cls(**_flatten(trees, [tree.value[:, 0, 0] for tree in trees]), n_features=forest.n_features_in_)
+
+    def save(self, directory):
+        """Write the node arrays as .npy files plus forest.json."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "forest.json"), "w") as f:
+            json.dump({"max_depth": int(self.max_depth), "n_features": int(self.n_features)}, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """Read a forest written by save(), memory-mapping the arrays by default."""
+        with open(os.path.join(directory, "forest.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(**arrays, **meta)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.value)
+
+    def _leaf_values(self, X):
+        """Leaf value reached by every (row, tree) pair of a chunk."""
+        n_rows = X.shape[0]
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * self.n_features)[:, None]
+        node = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+        for _ in range(self.max_depth):
+            go_right = flat_X[row_offsets + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+        return self.value[node]
+
+    def _tree_sum(self, X):
+        """Sum of the leaf values over all trees, added one tree at a time in estimator order."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input with {self.n_features} features, got shape {X.shape}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X.astype(np.float32))
+        totals = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], self.CHUNK_SIZE):
+            leaf_values = self._leaf_values(X[start:start + self.CHUNK_SIZE])
+            # cumsum adds trees one by one in estimator order, matching the
+            # accumulation order of the sklearn ensembles
+            totals[start:start + self.CHUNK_SIZE] = np.cumsum(leaf_values, axis=1)[:, -1]
+        return totals
+
+    def predict(self, X):
+        """Predict for a 2D float array shaped (n_rows, n_features)."""
+        predictions = self._tree_sum(X)
+        predictions /= self.n_trees
+        return predictions
+
+
+class CompiledIsolationForest(CompiledForest):
+    """
+    CompiledForest for a fitted sklearn IsolationForest. Each leaf holds its
+    path length (depth plus the average path length of the samples left in
+    it), so the tree sum is IsolationForest's total depth and
+    ``decision_function`` reproduces sklearn's bit for bit.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, n_features,
+                 offset, max_samples):
+        super().__init__(feature, threshold, children, value, roots, max_depth, n_features)
+        self.offset = offset
+        self.max_samples = max_samples
+
+    @classmethod
+    def from_estimator(cls, forest):
+        """Flatten the trees of a fitted IsolationForest."""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        # Same expression as sklearn's per-tree depth increment
+        leaf_depths = [
+            lengths + average - 1.0
+            for lengths, average in zip(forest._decision_path_lengths, forest._average_path_length_per_tree)
+        ]
+        arrays = _flatten(trees, leaf_depths, forest.estimators_features_)
+        return cls(**arrays, n_features=forest.n_features_in_,
+                   offset=float(forest.offset_), max_samples=int(forest._max_samples))
+
+    def save(self, directory):
+        super().save(directory)
+        with open(os.path.join(directory, "forest.json")) as f:
+            meta = json.load(f)
+        meta.update(offset=self.offset, max_samples=self.max_samples)
+        with open(os.path.join(directory, "forest.json"), "w") as f:
+            json.dump(meta, f)
+
+    def score_samples(self, X):
+        depths = self._tree_sum(X)
+        denominator = self.n_trees * _average_path_length(self.max_samples)
+        return -(2 ** (-depths / denominator))
+
+    def decision_function(self, X):
+        """Same as IsolationForest.decision_function: negative for outliers."""
+        return self.score_samples(X) - self.offset
+
+
+def _average_path_length(n):
+    """sklearn's c(n): average path length of an unsuccessful BST search over n samples."""
+    if n <= 1:
+        return 0.0
+    if n == 2:
+        return 1.0
+    return 2.0 * (np.log(n - 1.0) + np.euler_gamma) - 2.0 * (n - 1.0) / n
+
+
+def _flatten(trees, leaf_values, tree_features=None):
+    """
+    Concatenate sklearn trees into flat node arrays. tree_features maps each
+    tree's local feature indices to input columns (for bagged feature subsets).
+    """
+    node_counts = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.intp)
+
+    features, thresholds, children = [], [], []
+    for i, (tree, offset) in enumerate(zip(trees, roots)):
+        node_ids = np.arange(tree.node_count) + offset
+        is_leaf = tree.children_left == -1
+
+        # Leaves point at themselves, so walking past them is a no-op and
+        # every row can take exactly max_depth steps.
+        left = np.where(is_leaf, node_ids, tree.children_left + offset)
+        right = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+        feature = np.where(is_leaf, 0, tree.feature)
+        if tree_features is not None:
+            feature = np.asarray(tree_features[i])[feature]
+        features.append(feature)
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        children.append(np.stack([left, right], axis=1).ravel())
+
+    return dict(
+        feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+        threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+        children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+        value=np.ascontiguousarray(np.concatenate(leaf_values), dtype=np.float64),
+        roots=roots,
+        max_depth=max(tree.max_depth for tree in trees)
+    )
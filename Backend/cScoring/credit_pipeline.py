@@ -0,0 +1,164 @@
+import argparse
+import hashlib
+import pickle
+import numpy as np
+import pandas as pd
+import joblib
+from token_duration_predictor import TokenHoldingDurationPredictor
+
+# Bump when the saved layout changes; load() refuses other formats
+FORMAT_VERSION = 1
+
+DURATION_COLUMN = 'predicted_holding_duration'
+
+
+class CreditScoringPipeline:
+    """
+    The two-stage credit model of xgRegress.py as one object.
+
+    Rows come in with a fixed layout (input_columns: the credit features
+    without predicted_holding_duration) and are copied once into a
+    preallocated matrix in the XGBoost feature order. The duration predictor
+    fills in the predicted_holding_duration column, the MinMaxScaler is
+    applied in place and the regressor scores the matrix, all without
+    DataFrame reshuffling. Saved and loaded as a single versioned artifact.
+    """
+
+    def __init__(self, duration_predictor, credit_model, credit_scaler, feature_names, version=None):
+        self.duration_predictor = duration_predictor
+        self.credit_model = credit_model
+        self.credit_scaler = credit_scaler
+        self.feature_names = list(feature_names)
+        self.input_columns = [name for name in self.feature_names if name != DURATION_COLUMN]
+        self.version = version
+
+        # Where each input column and the duration go in the model matrix
+        self._input_index = np.array([self.feature_names.index(name) for name in self.input_columns])
+        self._duration_index = self.feature_names.index(DURATION_COLUMN)
+        self._duration_input_index = np.array(
+            [self.feature_names.index(name) for name in duration_predictor.feature_columns]
+        )
+
+    def assemble(self, X):
+        """
+        Copy rows into a new (n, len(feature_names)) float matrix. X is a
+        float array in input_columns order (one row may be 1-D), a list of
+        dicts, or a DataFrame holding the input columns.
+        """
+        if isinstance(X, pd.DataFrame):
+            missing_columns = set(self.input_columns) - set(X.columns)
+            if missing_columns:
+                raise ValueError(f"Missing required columns: {missing_columns}")
+            X = X[self.input_columns].to_numpy(dtype=np.float64)
+        elif isinstance(X, (list, tuple)) and X and isinstance(X[0], dict):
+            try:
+                X = [[row[name] for name in self.input_columns] for row in X]
+            except KeyError as e:
+                raise ValueError(f"Missing required columns: {{{e.args[0]!r}}}")
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.ndim != 2 or X.shape[1] != len(self.input_columns):
+            raise ValueError(f"Expected rows of {len(self.input_columns)} features in input_columns order")
+
+        matrix = np.empty((len(X), len(self.feature_names)), dtype=np.float64)
+        matrix[:, self._input_index] = X
+        return matrix
+
+    def predict_durations(self, matrix):
+        """Stage 1: fill the predicted_holding_duration column in place."""
+        durations = self.duration_predictor.predict_array(matrix[:, self._duration_input_index])
+        matrix[:, self._duration_index] = durations
+        return durations
+
+    def scale(self, matrix):
+        """MinMaxScaler.transform, in place (same arithmetic, so same result)."""
+        matrix *= self.credit_scaler.scale_
+        matrix += self.credit_scaler.min_
+        if self.credit_scaler.clip:
+            np.clip(matrix, *self.credit_scaler.feature_range, out=matrix)
+        return matrix
+
+    def predict_scaled(self, matrix):
+        """Stage 2: the XGBoost regressor on a scaled matrix."""
+        return self.credit_model.predict(matrix)
+
+    def predict(self, X, return_durations=False):
+        """Credit scores (unclipped model output) for rows of input features."""
+        matrix = self.assemble(X)
+        durations = self.predict_durations(matrix)
+        scores = self.predict_scaled(self.scale(matrix))
+        if return_durations:
+            return scores, durations
+        return scores
+
+    def save(self, filepath):
+        """Save both stages and their layout to one file."""
+        joblib.dump({
+            'format_version': FORMAT_VERSION,
+            'version': self.version,
+            'feature_names': self.feature_names,
+            'duration_model': self.duration_predictor.model,
+            'duration_scaler': self.duration_predictor.scaler,
+            'duration_feature_columns': self.duration_predictor.feature_columns,
+            'credit_model': self.credit_model,
+            'credit_scaler': self.credit_scaler
+        }, filepath)
+
+    @classmethod
+    def load(cls, filepath, compiled=False):
+        """Load a pipeline saved by save(), optionally with the compiled duration forest."""
+        data = joblib.load(filepath)
+        if data.get('format_version') != FORMAT_VERSION:
+            raise ValueError(
+                f"{filepath} has pipeline format {data.get('format_version')}, expected {FORMAT_VERSION}"
+            )
+        duration_predictor = TokenHoldingDurationPredictor()
+        duration_predictor.model = data['duration_model']
+        duration_predictor.scaler = data['duration_scaler']
+        duration_predictor.feature_columns = data['duration_feature_columns']
+        if compiled:
+            duration_predictor.compile()
+        return cls(duration_predictor, data['credit_model'], data['credit_scaler'],
+                   data['feature_names'], version=data['version'])
+
+    @classmethod
+    def from_artifacts(cls, duration_model_path, credit_model_path):
+        """
+        Fuse the separate artifacts written by training_token_duration.py and
+        xgRegress.py. The version is a hash of both files' contents.
+        """
+        digest = hashlib.sha256()
+        for path in (duration_model_path, credit_model_path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+
+        duration_predictor = TokenHoldingDurationPredictor.load_model(duration_model_path)
+        with open(credit_model_path, 'rb') as f:
+            credit_data = pickle.load(f)
+        return cls(duration_predictor, credit_data['model'], credit_data['scaler'],
+                   credit_data['feature_names'], version=digest.hexdigest()[:12])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuse the duration and XGBoost credit models into one artifact")
+    parser.add_argument("--duration-model", default="trained_token_duration_model.joblib")
+    parser.add_argument("--credit-model", default="xgboost_credit_model.pkl")
+    parser.add_argument("--output", default="credit_pipeline.joblib")
+    args = parser.parse_args()
+
+    pipeline = CreditScoringPipeline.from_artifacts(args.duration_model, args.credit_model)
+
+    # The fused pipeline must agree with the two-stage chain of xgRegress.py
+    df = pd.read_csv("synthetic_credit_data.csv")
+    df['predicted_holding_duration'] = pipeline.duration_predictor.predict(df)
+    expected = pipeline.credit_model.predict(pipeline.credit_scaler.transform(df[pipeline.feature_names]))
+    if not np.array_equal(pipeline.predict(df), expected):
+        raise SystemExit("❌ Fused pipeline output differs from the two-stage chain")
+
+    pipeline.save(args.output)
+    print(f"💾 Credit pipeline v{pipeline.version} saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Pickle-free serving format for the ZKredit models.
+
+Each model is a directory holding a ``manifest.json`` plus:
+
+- the XGBoost booster in its native UBJSON format,
+- scaler parameters and tree ensembles (``CompiledForest`` node arrays) as
+  flat ``.npy`` files, which are memory-mapped on load.
+
+Loading therefore parses no pickles, does not rebuild sklearn trees, and
+leaves the bulk of the arrays in the page cache, shared by every worker.
+This module holds the shared format and the credit pipeline's exporter and
+loader; flagger/fraud_artifacts.py does the same for the fraud model. Each
+manifest records a digest of the pickles it was exported from, and
+``check_source`` refuses a directory that no longer matches them.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from compiled_forest import CompiledForest
+
+if TYPE_CHECKING:
+    from credit_pipeline import CreditScoringPipeline
+
+BASE_DIR = Path(__file__).resolve().parent
+
+FORMAT_VERSION = 1
+
+CREDIT_PIPELINE_DIR = BASE_DIR / "credit_pipeline"
+
+# The pickle the credit pipeline directory is exported from
+CREDIT_PIPELINE_SOURCES = [BASE_DIR / "credit_pipeline.joblib"]
+
+# Fitted state of each supported scaler: arrays go to .npy, the rest to the manifest
+SCALER_ARRAYS = {
+    "StandardScaler": ["mean_", "var_", "scale_"],
+    "MinMaxScaler": ["min_", "scale_", "data_min_", "data_max_", "data_range_"],
+}
+SCALER_PARAMS = {
+    "StandardScaler": ["with_mean", "with_std", "copy"],
+    "MinMaxScaler": ["feature_range", "copy", "clip"],
+}
+SCALER_CLASSES = {"StandardScaler": StandardScaler, "MinMaxScaler": MinMaxScaler}
+
+
+def write_manifest(directory: Path, manifest: dict) -> None:
+    with open(directory / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_manifest(directory: Path) -> dict:
+    with open(directory / "manifest.json") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{directory} has artifact format {manifest.get('format_version')}, expected {FORMAT_VERSION}")
+    return manifest
+
+
+def source_digest(paths) -> str:
+    """Short hash of the contents of the given files, in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def check_source(directory: Path, source_paths) -> None:
+    """
+    Raise ValueError if the pickles an artifact directory was exported from
+    have changed since, i.e. the models were retrained without re-exporting.
+    Nothing to compare against when the pickles are absent.
+    """
+    source_paths = [Path(path) for path in source_paths]
+    if not all(path.exists() for path in source_paths):
+        return
+    recorded = read_manifest(Path(directory)).get("source_digest")
+    current = source_digest(source_paths)
+    if recorded != current:
+        raise ValueError(
+            f"{directory} was exported from {recorded or 'unrecorded pickles'} but "
+            f"{', '.join(path.name for path in source_paths)} are now {current}; "
+            f"re-export with `python -m app.artifacts` (from Backend/api)"
+        )
+
+
+def save_scaler(scaler, directory: Path, name: str) -> dict:
+    """Write a fitted scaler's arrays as {name}.{attribute}.npy; returns its manifest entry."""
+    kind = type(scaler).__name__
+    for attribute in SCALER_ARRAYS[kind]:
+        np.save(directory / f"{name}.{attribute}.npy", getattr(scaler, attribute))
+    params = {param: getattr(scaler, param) for param in SCALER_PARAMS[kind]}
+    return {"class": kind, "name": name, "params": params, "n_samples_seen": int(np.max(scaler.n_samples_seen_))}
+
+
+def load_scaler(entry: dict, directory: Path, mmap_mode="r"):
+    """Rebuild a fitted scaler from save_scaler's files, without feature names."""
+    params = dict(entry["params"])
+    if "feature_range" in params:
+        params["feature_range"] = tuple(params["feature_range"])
+    scaler = SCALER_CLASSES[entry["class"]](**params)
+    for attribute in SCALER_ARRAYS[entry["class"]]:
+        setattr(scaler, attribute, np.load(directory / f"{entry['name']}.{attribute}.npy", mmap_mode=mmap_mode))
+    scaler.n_features_in_ = len(scaler.scale_)
+    scaler.n_samples_seen_ = entry["n_samples_seen"]
+    return scaler
+
+
+def export_credit_pipeline(pipeline: "CreditScoringPipeline", directory: Path = CREDIT_PIPELINE_DIR,
+                           source_paths=CREDIT_PIPELINE_SOURCES) -> None:
+    """Write the array artifacts of a pipeline saved (as source_paths) by CreditScoringPipeline.save."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    predictor = pipeline.duration_predictor
+    forest = predictor.compiled_model or CompiledForest.from_estimator(predictor.model)
+    forest.save(directory / "duration_forest")
+    pipeline.credit_model.save_model(directory / "credit_model.ubj")
+    write_manifest(directory, {
+        "format_version": FORMAT_VERSION,
+        "version": pipeline.version,
+        "source_digest": source_digest(source_paths),
+        "feature_names": pipeline.feature_names,
+        "duration_feature_columns": predictor.feature_columns,
+        "duration_scaler": save_scaler(predictor.scaler, directory, "duration_scaler"),
+        "credit_scaler": save_scaler(pipeline.credit_scaler, directory, "credit_scaler"),
+    })
+
+
+def load_credit_pipeline(directory: Path = CREDIT_PIPELINE_DIR, mmap_mode="r") -> "CreditScoringPipeline":
+    """Credit pipeline served by the compiled duration forest and the native XGBoost booster."""
+    # Imported here, so loading the fraud model does not pull in xgboost
+    import xgboost as xgb
+    from credit_pipeline import CreditScoringPipeline
+    from token_duration_predictor import TokenHoldingDurationPredictor
+
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+
+    predictor = TokenHoldingDurationPredictor()
+    predictor.model = None
+    predictor.scaler = load_scaler(manifest["duration_scaler"], directory, mmap_mode)
+    predictor.feature_columns = manifest["duration_feature_columns"]
+    predictor.compiled_model = CompiledForest.load(directory / "duration_forest", mmap_mode)
+
+    credit_model = xgb.XGBRegressor()
+    credit_model.load_model(directory / "credit_model.ubj")
+    return CreditScoringPipeline(
+        predictor, credit_model, load_scaler(manifest["credit_scaler"], directory, mmap_mode),
+        manifest["feature_names"], version=manifest["version"]
+    )
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestRegressor
+
+from compiled_forest import CompiledForest, CompiledIsolationForest
+
+
+def make_data(seed, n=400, n_features=6):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features)) * [1, 10, 100, 1e-3, 1e4, 1]
+    # Integer-valued columns put many rows right next to the split thresholds
+    X[:, 5] = rng.integers(0, 5, size=n)
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) + X[:, 5] ** 2 + rng.normal(size=n)
+    return X, y
+
+
+def test_random_forest_predictions_are_bit_identical():
+    X, y = make_data(0)
+    forest = RandomForestRegressor(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_estimator(forest)
+    X_test = np.vstack([X, make_data(1)[0], X.astype(np.float32)])
+    for rows in (X_test[:1], X_test[:CompiledForest.CHUNK_SIZE + 3], X_test):
+        np.testing.assert_array_equal(compiled.predict(rows), forest.predict(rows))
+
+
+def test_isolation_forest_decision_function_is_bit_identical():
+    X, _ = make_data(2)
+    # max_features < 1 gives every tree its own feature subset
+    forest = IsolationForest(n_estimators=30, max_samples=128, max_features=0.5, random_state=0).fit(X)
+    compiled = CompiledIsolationForest.from_estimator(forest)
+    X_test = np.vstack([X, make_data(3)[0] * 5])
+    np.testing.assert_array_equal(compiled.score_samples(X_test), forest.score_samples(X_test))
+    np.testing.assert_array_equal(compiled.decision_function(X_test), forest.decision_function(X_test))
+
+
+def test_saved_forests_load_memory_mapped(tmp_path):
+    X, y = make_data(4)
+    forest = IsolationForest(n_estimators=10, random_state=0).fit(X)
+    compiled = CompiledIsolationForest.from_estimator(forest)
+    compiled.save(tmp_path)
+    loaded = CompiledIsolationForest.load(tmp_path)
+    assert isinstance(loaded.value, np.memmap)
+    np.testing.assert_array_equal(loaded.decision_function(X), forest.decision_function(X))
+
+
+def test_rejects_malformed_input():
+    X, y = make_data(5)
+    compiled = CompiledForest.from_estimator(RandomForestRegressor(n_estimators=3, random_state=0).fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict(X[:, :5])
+    X[0, 0] = np.nan
+    with pytest.raises(ValueError):
+        compiled.predict(X)
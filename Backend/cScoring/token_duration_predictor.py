@@ -5,8 +5,13 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
+from compiled_forest import CompiledForest
 
 class TokenHoldingDurationPredictor:
+    # Above this many rows sklearn's Cython tree walk beats the compiled
+    # NumPy walk (see benchmark_compiled_forest.py), so predict() hands over.
+    COMPILED_MAX_ROWS = 512
+    
     def __init__(self, n_estimators=100, max_depth=10, random_state=42):
         """Initialize the predictor with customizable parameters."""
         self.model = RandomForestRegressor(
@@ -23,6 +28,7 @@ class TokenHoldingDurationPredictor:
             'average_eth_holding_age',
             'average_btc_holding_age'
         ]
+        self.compiled_model = None
     
     def prepare_features(self, data):
         """Prepare and validate features for the model."""
@@ -39,6 +45,7 @@ class TokenHoldingDurationPredictor:
     
     def train(self, X, y):
         """Train the model and return performance metrics."""
+        self.compiled_model = None
         X_scaled = self.scaler.fit_transform(X)
         X_train, X_test, y_train, y_test = train_test_split(
             X_scaled, y, test_size=0.2, random_state=42
@@ -70,9 +77,51 @@ class TokenHoldingDurationPredictor:
             raise ValueError("Input must be a pandas DataFrame")
             
         X = self.prepare_features(X)
-        X_scaled = self.scaler.transform(X)
+        return self._predict_matrix(X.to_numpy(dtype=np.float64))
+    
+    def predict_array(self, X):
+        """
+        Make predictions without pandas, for online scoring. X is either a
+        float array with columns in feature_columns order (one row may be
+        1-D) or a list of dicts keyed by feature name.
+        """
+        if isinstance(X, (list, tuple)) and X and isinstance(X[0], dict):
+            try:
+                X = np.array([[row[column] for column in self.feature_columns] for row in X], dtype=np.float64)
+            except KeyError as e:
+                raise ValueError(f"Missing required columns: {{{e.args[0]!r}}}")
+        else:
+            X = np.asarray(X, dtype=np.float64)
+            if X.ndim == 1:
+                X = X[None, :]
+        if X.ndim != 2 or X.shape[1] != len(self.feature_columns):
+            raise ValueError(f"Expected rows of {len(self.feature_columns)} features in feature_columns order")
+        
+        # Same tolerance as np.allclose in prepare_features, in one pass
+        total_ratio = X[:, self._ratio_index].sum(axis=1)
+        if not (np.abs(total_ratio - 1.0) <= 0.01 + 1e-05).all():
+            raise ValueError("Portfolio ratios (eth_ratio + btc_ratio + nft_ratio) must sum to 1.0")
+        
+        return self._predict_matrix(X)
+    
+    @property
+    def _ratio_index(self):
+        return [self.feature_columns.index(column) for column in ('eth_ratio', 'btc_ratio', 'nft_ratio')]
+    
+    def _predict_matrix(self, X):
+        """Scale a validated float matrix and run it through the forest."""
+        # Same arithmetic as StandardScaler.transform, without its validation
+        X_scaled = (X - self.scaler.mean_) / self.scaler.scale_
+        # Array-only artifacts load without the sklearn forest: always compiled
+        if self.compiled_model is not None and (self.model is None or len(X) <= self.COMPILED_MAX_ROWS):
+            return self.compiled_model.predict(X_scaled)
         return self.model.predict(X_scaled)
     
+    def compile(self):
+        """Switch predict() to the array-backed CompiledForest evaluator."""
+        self.compiled_model = CompiledForest.from_estimator(self.model)
+        return self
+    
     def save_model(self, filepath):
         """Save the trained model to a file."""
         model_data = {
@@ -83,11 +132,13 @@ class TokenHoldingDurationPredictor:
         joblib.dump(model_data, filepath)
     
     @classmethod
-    def load_model(cls, filepath):
-        """Load a trained model from a file."""
+    def load_model(cls, filepath, compiled=False):
+        """Load a trained model from a file, optionally in compiled inference mode."""
         model_data = joblib.load(filepath)
         instance = cls()
         instance.model = model_data['model']
         instance.scaler = model_data['scaler']
         instance.feature_columns = model_data['feature_columns']
+        if compiled:
+            instance.compile()
         return instance
\ No newline at end of file
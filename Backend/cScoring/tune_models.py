@@ -0,0 +1,284 @@
+"""
+Cross-validated hyperparameter search for the two credit scoring models.
+
+    python tune_models.py --workers 8
+    python tune_models.py --duration-depths 6 10 --credit-depths 3 5 --folds 3
+
+1. The duration RandomForest (training_token_duration.py) is searched over
+   max_depth with k-fold CV. Each fold fits the largest forest once and
+   reads the CV error of every smaller forest from its tree prefixes;
+   growth stops at the smallest tree count within --tree-tolerance of the
+   best error.
+2. The chosen duration model predicts predicted_holding_duration for the
+   credit data once. The column is cached on disk, keyed by the duration
+   model and the data, and shared with every credit trial.
+3. The XGBoost credit model (xgRegress.py) is searched over max_depth and
+   learning_rate with k-fold CV and early stopping on an inner validation
+   split.
+
+Trials run across a process pool. Every trial's model is then timed, one at
+a time, at single-row and 1k-row prediction through the evaluator the API
+serves with. From
+each model's trials, the fastest one within --tolerance of the best CV
+error is selected, refit on all the data, and written to --output-dir
+together with the fused credit pipeline. A latency-vs-accuracy table
+(tuning_results.json) is written next to them.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from compiled_forest import CompiledForest
+from credit_pipeline import CreditScoringPipeline
+from token_duration_predictor import TokenHoldingDurationPredictor
+
+LATENCY_RUNS = 200
+
+# Set in each worker by _init_worker, so the data is sent once per process
+_DATA = {}
+
+
+def _init_worker(data):
+    _DATA.update(data)
+
+
+def _time_predict(predict, X_row, X_batch):
+    """Median single-row latency (µs) and per-row latency of a 1k batch (µs)."""
+    predict(X_row)
+    single = []
+    for _ in range(LATENCY_RUNS):
+        start = time.perf_counter()
+        predict(X_row)
+        single.append(time.perf_counter() - start)
+    batch = []
+    for _ in range(5):
+        start = time.perf_counter()
+        predict(X_batch)
+        batch.append(time.perf_counter() - start)
+    return float(np.median(single) * 1e6), float(np.median(batch) / len(X_batch) * 1e6)
+
+
+def _rmse(predictions, actual):
+    return np.sqrt(np.mean((predictions - actual) ** 2, axis=-1))
+
+
+def duration_trial(max_depth, max_trees, folds, seed, tree_tolerance):
+    """CV error of a RandomForest of every size up to max_trees; early-stops on tree count."""
+    X, y = _DATA["duration"]
+    curves, variances = [], []
+    for train, test in KFold(folds, shuffle=True, random_state=seed).split(X):
+        scaler = StandardScaler().fit(X[train])
+        forest = RandomForestRegressor(n_estimators=max_trees, max_depth=max_depth, random_state=seed)
+        forest.fit(scaler.transform(X[train]), y[train])
+        # The first n trees of this forest are exactly the forest fitted with
+        # n_estimators=n, so one fit gives the whole error-vs-size curve
+        per_tree = np.stack([tree.predict(scaler.transform(X[test])) for tree in forest.estimators_])
+        running_mean = np.cumsum(per_tree, axis=0) / np.arange(1, max_trees + 1)[:, None]
+        curves.append(_rmse(running_mean, y[test]))
+        variances.append(np.var(y[test]))
+
+    curve = np.mean(curves, axis=0)
+    n_trees = int(np.argmax(curve <= curve.min() * (1 + tree_tolerance))) + 1
+    fold_rmse = np.array([c[n_trees - 1] for c in curves])
+
+    forest = RandomForestRegressor(n_estimators=n_trees, max_depth=max_depth, random_state=seed)
+    scaler = StandardScaler().fit(X)
+    forest.fit(scaler.transform(X), y)
+
+    return {
+        "model": "duration",
+        "params": {"max_depth": max_depth, "n_estimators": n_trees},
+        "cv_rmse": float(fold_rmse.mean()),
+        "cv_rmse_std": float(fold_rmse.std()),
+        "cv_r2": float(np.mean(1 - fold_rmse ** 2 / np.array(variances))),
+        "nodes": int(sum(tree.tree_.node_count for tree in forest.estimators_))
+    }, (CompiledForest.from_estimator(forest), scaler)
+
+
+def credit_trial(max_depth, learning_rate, max_rounds, early_stopping_rounds, folds, seed):
+    """CV error of an XGBoost regressor, early-stopped on a validation split of each training fold."""
+    X, y = _DATA["credit"]
+    fold_rmse, variances, rounds = [], [], []
+    for train, test in KFold(folds, shuffle=True, random_state=seed).split(X):
+        fit, validation = train_test_split(train, test_size=0.15, random_state=seed)
+        scaler = MinMaxScaler().fit(X[fit])
+        model = xgb.XGBRegressor(
+            objective="reg:squarederror", max_depth=max_depth, learning_rate=learning_rate,
+            n_estimators=max_rounds, early_stopping_rounds=early_stopping_rounds,
+            random_state=seed, n_jobs=1
+        )
+        model.fit(scaler.transform(X[fit]), y[fit],
+                  eval_set=[(scaler.transform(X[validation]), y[validation])], verbose=False)
+        rounds.append(model.best_iteration + 1)
+        fold_rmse.append(_rmse(model.predict(scaler.transform(X[test])), y[test]))
+        variances.append(np.var(y[test]))
+
+    fold_rmse = np.array(fold_rmse)
+    n_rounds = int(np.median(rounds))
+    scaler = MinMaxScaler().fit(X)
+    model = xgb.XGBRegressor(
+        objective="reg:squarederror", max_depth=max_depth, learning_rate=learning_rate,
+        n_estimators=n_rounds, random_state=seed, n_jobs=1
+    )
+    model.fit(scaler.transform(X), y)
+
+    return {
+        "model": "credit",
+        "params": {"max_depth": max_depth, "learning_rate": learning_rate, "n_estimators": n_rounds},
+        "cv_rmse": float(fold_rmse.mean()),
+        "cv_rmse_std": float(fold_rmse.std()),
+        "cv_r2": float(np.mean(1 - fold_rmse ** 2 / np.array(variances))),
+        "nodes": int(model.get_booster().trees_to_dataframe().shape[0])
+    }, (model, scaler)
+
+
+def run_trials(pool_args, fn, param_grid, X):
+    """
+    Run fn(*params) for every params tuple on a fresh process pool, then
+    time each trial's refit model here, one at a time, so the latencies are
+    not skewed by trials running in parallel.
+    """
+    with ProcessPoolExecutor(**pool_args) as pool:
+        futures = [pool.submit(fn, *params) for params in param_grid]
+        trials = [future.result() for future in futures]
+
+    results = []
+    for result, (model, scaler) in trials:
+        X_scaled = scaler.transform(X)
+        result["single_row_us"], result["batch_row_us"] = _time_predict(
+            model.predict, X_scaled[:1], X_scaled[np.arange(1000) % len(X_scaled)]
+        )
+        results.append(result)
+    return results
+
+
+def select(results, tolerance):
+    """Fastest single-row model whose CV error is within `tolerance` of the best."""
+    best_rmse = min(r["cv_rmse"] for r in results)
+    eligible = [r for r in results if r["cv_rmse"] <= best_rmse * (1 + tolerance)]
+    return min(eligible, key=lambda r: r["single_row_us"])
+
+
+def print_table(title, results, chosen):
+    print(f"\n{title}")
+    print(f"  {'params':<50}{'cv rmse':>14}{'r2':>8}{'nodes':>8}{'1-row µs':>11}{'batch µs/row':>14}")
+    for r in sorted(results, key=lambda r: r["single_row_us"]):
+        params = ", ".join(f"{k}={v}" for k, v in r["params"].items())
+        marker = " ✅" if r is chosen else ""
+        print(f"  {params:<50}{r['cv_rmse']:>8.2f} ±{r['cv_rmse_std']:>4.2f}{r['cv_r2']:>8.3f}{r['nodes']:>8}"
+              f"{r['single_row_us']:>11.1f}{r['batch_row_us']:>14.2f}{marker}")
+
+
+def cached_durations(predictor, params, credit_df, cache_dir, data_paths):
+    """predicted_holding_duration for the credit data, computed once per duration model and data."""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+    for path in data_paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    path = os.path.join(cache_dir, f"predicted_holding_duration-{digest.hexdigest()[:16]}.npy")
+    if os.path.exists(path):
+        print(f"♻️  Using cached predicted_holding_duration from {path}")
+        return np.load(path)
+    durations = predictor.predict(credit_df)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(path, durations)
+    return durations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the credit models")
+    parser.add_argument("--duration-data", default="portfolio_training_data.csv")
+    parser.add_argument("--credit-data", default="synthetic_credit_data.csv")
+    parser.add_argument("--output-dir", default="tuned")
+    parser.add_argument("--cache-dir", default=os.path.join("tuned", "cache"))
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="accept models whose CV RMSE is within this fraction of the best, preferring faster ones")
+    parser.add_argument("--duration-depths", type=int, nargs="+", default=[3, 5, 8, 10, 15])
+    parser.add_argument("--duration-max-trees", type=int, default=200)
+    parser.add_argument("--tree-tolerance", type=float, default=0.005,
+                        help="stop growing the forest once its CV RMSE is within this fraction of the best size")
+    parser.add_argument("--credit-depths", type=int, nargs="+", default=[2, 3, 4, 5, 6])
+    parser.add_argument("--credit-learning-rates", type=float, nargs="+", default=[0.05, 0.1, 0.3])
+    parser.add_argument("--credit-max-rounds", type=int, default=1000)
+    parser.add_argument("--early-stopping-rounds", type=int, default=20)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Stage 1: duration model
+    duration_df = pd.read_csv(args.duration_data)
+    duration_predictor = TokenHoldingDurationPredictor()
+    X_duration = duration_df[duration_predictor.feature_columns].to_numpy(dtype=np.float64)
+    y_duration = duration_df["holding_duration"].to_numpy(dtype=np.float64)
+    pool_args = {"max_workers": args.workers, "initializer": _init_worker,
+                 "initargs": ({"duration": (X_duration, y_duration)},)}
+    grid = [(depth, args.duration_max_trees, args.folds, args.seed, args.tree_tolerance)
+            for depth in args.duration_depths]
+    print(f"🔎 Duration model: {len(grid)} trials x {args.folds} folds on {args.workers} workers")
+    duration_results = run_trials(pool_args, duration_trial, grid, X_duration)
+    duration_best = select(duration_results, args.tolerance)
+    print_table("Duration model (RandomForest, compiled evaluator)", duration_results, duration_best)
+
+    duration_predictor = TokenHoldingDurationPredictor(random_state=args.seed, **duration_best["params"])
+    features = duration_df[duration_predictor.feature_columns]
+    duration_predictor.model.fit(duration_predictor.scaler.fit_transform(features), y_duration)
+    duration_path = os.path.join(args.output_dir, "trained_token_duration_model.joblib")
+    duration_predictor.save_model(duration_path)
+
+    # Stage 2: credit model, on the cached duration column
+    credit_df = pd.read_csv(args.credit_data)
+    credit_df["predicted_holding_duration"] = cached_durations(
+        duration_predictor, dict(duration_best["params"], random_state=args.seed), credit_df, args.cache_dir,
+        [args.duration_data, args.credit_data]
+    )
+    X_credit = credit_df.drop(columns=["credit_score"])
+    y_credit = credit_df["credit_score"].to_numpy(dtype=np.float64)
+    X_credit_matrix = X_credit.to_numpy(dtype=np.float64)
+    pool_args["initargs"] = ({"credit": (X_credit_matrix, y_credit)},)
+    grid = [(depth, rate, args.credit_max_rounds, args.early_stopping_rounds, args.folds, args.seed)
+            for depth, rate in itertools.product(args.credit_depths, args.credit_learning_rates)]
+    print(f"\n🔎 Credit model: {len(grid)} trials x {args.folds} folds on {args.workers} workers")
+    credit_results = run_trials(pool_args, credit_trial, grid, X_credit_matrix)
+    credit_best = select(credit_results, args.tolerance)
+    print_table("Credit model (XGBoost)", credit_results, credit_best)
+
+    scaler = MinMaxScaler()
+    model = xgb.XGBRegressor(objective="reg:squarederror", random_state=args.seed, **credit_best["params"])
+    model.fit(scaler.fit_transform(X_credit), y_credit)
+    credit_path = os.path.join(args.output_dir, "xgboost_credit_model.pkl")
+    with open(credit_path, "wb") as f:
+        pickle.dump({"model": model, "scaler": scaler, "feature_names": list(X_credit.columns)}, f)
+
+    pipeline = CreditScoringPipeline.from_artifacts(duration_path, credit_path)
+    pipeline.save(os.path.join(args.output_dir, "credit_pipeline.joblib"))
+
+    with open(os.path.join(args.output_dir, "tuning_results.json"), "w") as f:
+        json.dump({
+            "folds": args.folds,
+            "tolerance": args.tolerance,
+            "duration": {"selected": duration_best, "trials": duration_results},
+            "credit": {"selected": credit_best, "trials": credit_results}
+        }, f, indent=2)
+    print(f"\n💾 Credit pipeline v{pipeline.version} and tuning_results.json saved to '{args.output_dir}/'")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,9 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 from sklearn.preprocessing import MinMaxScaler
 from token_duration_predictor import TokenHoldingDurationPredictor
+from credit_pipeline import CreditScoringPipeline
 import pickle
+from model_artifacts import export_credit_pipeline
 
 # Instead of generating data, load existing synthetic data
 df = pd.read_csv("synthetic_credit_data.csv")
@@ -59,4 +61,11 @@ model_data = {
 with open("xgboost_credit_model.pkl", "wb") as f:
     pickle.dump(model_data, f)
 
-print("💾 Model and preprocessing components saved to 'xgboost_credit_model.pkl'")
\ No newline at end of file
+# Fuse both stages into the single artifact the API serves
+pipeline = CreditScoringPipeline.from_artifacts('trained_token_duration_model.joblib', 'xgboost_credit_model.pkl')
+pipeline.save('credit_pipeline.joblib')
+# Re-export the array artifacts the API serves, so they match the new pickles
+export_credit_pipeline(pipeline)
+
+print("💾 Model and preprocessing components saved to 'xgboost_credit_model.pkl'")
+print(f"💾 Fused credit pipeline v{pipeline.version} saved to 'credit_pipeline.joblib' and exported to 'credit_pipeline/'")
@@ -0,0 +1,247 @@
+import os
+import json
+import math
+import numpy as np
+
+from threat_intel import get_blacklist_index
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SNAPSHOT_PATH = os.environ.get("ADDRESS_CLUSTERS_PATH", os.path.join(BASE_DIR, "address_clusters.npz"))
+
+# Risk of an address on the threat-intel blacklist
+BLACKLISTED_RISK = 1.0
+
+
+class AddressClusters:
+    """
+    Incremental address clustering with per-cluster risk, on a union-find
+    (disjoint set) forest over integer-indexed addresses.
+
+    Link evidence comes from transactions: all input addresses of a
+    multi-input transaction are controlled by one owner (common-input
+    ownership), and so is a change address sending value back to the
+    sender. Each link is a union by size; find compresses the path it walks,
+    so lookups cost O(α(n)), effectively constant.
+
+    Every address carries a risk in [0, 1] (blacklisted addresses get 1.0 on
+    first sight). Per cluster root the forest keeps the number of members
+    with risk 1 and the sum of log(1 - risk) over the others, both merged on
+    union, so the cluster risk 1 - Π(1 - risk) — the chance that at least
+    one member is bad — is one read at the root. Everything is stored in
+    flat arrays grown by doubling and saved as one .npz snapshot.
+    """
+
+    def __init__(self, capacity=1024, blacklist=None, snapshot_path=None, snapshot_every=None):
+        self.addresses = []
+        self._index = {}
+        self.parent = np.arange(capacity, dtype=np.int64)
+        self.size = np.ones(capacity, dtype=np.int64)
+        self.risk = np.zeros(capacity, dtype=np.float64)
+        self.certain = np.zeros(capacity, dtype=np.int64)      # per root: members with risk 1
+        self.log_safe = np.zeros(capacity, dtype=np.float64)  # per root: Σ log(1 - risk) of the rest
+        self.blacklist = blacklist
+        self.transactions_seen = 0
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def index_of(self, address, create=False):
+        """Integer index of an address (case-insensitive), or None if unseen and not create."""
+        address = address.lower()
+        index = self._index.get(address)
+        if index is None and create:
+            index = len(self.addresses)
+            if index == len(self.parent):
+                self._grow(2 * index)
+            self._index[address] = index
+            self.addresses.append(address)
+            if self.blacklist is not None and self.blacklist.lookup(address) is not None:
+                self.set_risk(address, BLACKLISTED_RISK)
+        return index
+
+    def _grow(self, capacity):
+        n = len(self.parent)
+        parent = np.arange(capacity, dtype=np.int64)
+        parent[:n] = self.parent
+        size = np.ones(capacity, dtype=np.int64)
+        size[:n] = self.size
+        risk = np.zeros(capacity, dtype=np.float64)
+        risk[:n] = self.risk
+        certain = np.zeros(capacity, dtype=np.int64)
+        certain[:n] = self.certain
+        log_safe = np.zeros(capacity, dtype=np.float64)
+        log_safe[:n] = self.log_safe
+        self.parent, self.size, self.risk, self.certain, self.log_safe = parent, size, risk, certain, log_safe
+
+    def _find(self, index):
+        """Root of an index's cluster, pointing every node on the way straight at it."""
+        parent = self.parent
+        root = index
+        while parent[root] != root:
+            root = parent[root]
+        while parent[index] != root:
+            parent[index], index = root, parent[index]
+        return int(root)
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return a
+        # The smaller tree goes under the larger one, which keeps trees shallow
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.certain[a] += self.certain[b]
+        self.log_safe[a] += self.log_safe[b]
+        return a
+
+    def link(self, a, b):
+        """Record evidence that addresses a and b have the same owner."""
+        self._union(self.index_of(a, create=True), self.index_of(b, create=True))
+
+    def set_risk(self, address, risk):
+        """Set an address's own risk in [0, 1]; its cluster's aggregate follows."""
+        index = self.index_of(address, create=True)
+        risk = min(max(float(risk), 0.0), 1.0)
+        root = self._find(index)
+        for member_risk, sign in ((self.risk[index], -1), (risk, 1)):
+            if member_risk == 1.0:
+                self.certain[root] += sign
+            else:
+                self.log_safe[root] += sign * np.log1p(-member_risk)
+        self.risk[index] = risk
+
+    def add_transaction(self, transaction: dict):
+        """
+        Fold the link evidence of one transaction into the clusters: its
+        optional `inputs` (every address spending in it, sender included)
+        and `change` address are linked to the sender. The recipient is
+        registered but never linked, since paying an address says nothing
+        about owning it.
+        """
+        sender = self.index_of(transaction["sender"], create=True)
+        self.index_of(transaction["recipient"], create=True)
+        for address in transaction.get("inputs") or ():
+            self._union(sender, self.index_of(address, create=True))
+        if transaction.get("change"):
+            self._union(sender, self.index_of(transaction["change"], create=True))
+
+        self.transactions_seen += 1
+        if self.snapshot_every and self.snapshot_path and self.transactions_seen % self.snapshot_every == 0:
+            self.save(self.snapshot_path)
+
+    def add_transactions(self, transactions):
+        for transaction in transactions:
+            self.add_transaction(transaction)
+
+    def same_cluster(self, a, b) -> bool:
+        """Whether two addresses are known to share an owner."""
+        a, b = self.index_of(a), self.index_of(b)
+        if a is None or b is None:
+            return False
+        return a == b or self._find(a) == self._find(b)
+
+    def cluster_size(self, address) -> int:
+        index = self.index_of(address)
+        return 1 if index is None else int(self.size[self._find(index)])
+
+    def cluster_risk(self, address) -> float:
+        """
+        1 - Π(1 - risk) over the address's cluster. An address never seen is
+        its own cluster: 1.0 if it is blacklisted, else 0.0.
+        """
+        index = self.index_of(address)
+        if index is None:
+            blacklisted = self.blacklist is not None and self.blacklist.lookup(address) is not None
+            return BLACKLISTED_RISK if blacklisted else 0.0
+        root = self._find(index)
+        return 1.0 if self.certain[root] else 0.0 - math.expm1(self.log_safe[root])
+
+    def _root_risk(self, roots):
+        return np.where(self.certain[roots] > 0, 1.0, 0.0 - np.expm1(self.log_safe[roots]))
+
+    def cluster_risks(self, addresses) -> np.ndarray:
+        """
+        cluster_risk for many addresses at once. The roots are found by
+        pointer jumping over the whole batch (parent[parent[...]]), one
+        vectorized step per tree level, then compressed onto the batch.
+        """
+        indices = np.fromiter((self._index.get(a.lower(), -1) for a in addresses), dtype=np.int64, count=len(addresses))
+        known = indices >= 0
+        risks = np.zeros(len(indices), dtype=np.float64)
+
+        nodes = indices[known]
+        roots = self.parent[nodes]
+        while True:
+            next_roots = self.parent[roots]
+            if np.array_equal(next_roots, roots):
+                break
+            roots = next_roots
+        self.parent[nodes] = roots
+        risks[known] = self._root_risk(roots)
+
+        if self.blacklist is not None and not known.all():
+            unknown = np.flatnonzero(~known)
+            hits, _ = self.blacklist.lookup_batch([addresses[i] for i in unknown])
+            risks[unknown[hits]] = BLACKLISTED_RISK
+        return risks
+
+    def compress(self):
+        """Point every address straight at its root, e.g. before a snapshot."""
+        n = len(self.addresses)
+        parent = self.parent[:n]
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent[:] = grandparent
+
+    def save(self, path):
+        """Atomic .npz snapshot of the address table and the compressed forest."""
+        self.compress()
+        n = len(self.addresses)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path, addresses=np.array(self.addresses, dtype=str), parent=self.parent[:n],
+            size=self.size[:n], risk=self.risk[:n], certain=self.certain[:n], log_safe=self.log_safe[:n],
+            config=json.dumps({"transactions_seen": self.transactions_seen})
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, blacklist=None, snapshot_path=None, snapshot_every=None):
+        data = np.load(path)
+        addresses = data["addresses"].tolist()
+        n = len(addresses)
+        model = cls(capacity=max(n, 1), blacklist=blacklist,
+                    snapshot_path=snapshot_path, snapshot_every=snapshot_every)
+        model.addresses = addresses
+        model._index = {address: index for index, address in enumerate(addresses)}
+        model.parent[:n] = data["parent"]
+        model.size[:n] = data["size"]
+        model.risk[:n] = data["risk"]
+        model.certain[:n] = data["certain"]
+        model.log_safe[:n] = data["log_safe"]
+        model.transactions_seen = json.loads(str(data["config"]))["transactions_seen"]
+        return model
+
+
+_address_clusters = None
+
+
+def get_address_clusters() -> AddressClusters:
+    """
+    Loads the address clusters once per process: from ADDRESS_CLUSTERS_PATH
+    if a snapshot exists, otherwise empty. Either way addresses are scored
+    against the threat-intel blacklist.
+    """
+    global _address_clusters
+    if _address_clusters is None:
+        if os.path.exists(DEFAULT_SNAPSHOT_PATH):
+            _address_clusters = AddressClusters.load(DEFAULT_SNAPSHOT_PATH, blacklist=get_blacklist_index())
+        else:
+            _address_clusters = AddressClusters(blacklist=get_blacklist_index())
+    return _address_clusters
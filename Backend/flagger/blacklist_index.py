@@ -0,0 +1,130 @@
+import os
+import csv
+import json
+import argparse
+import hashlib
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INDEX_DIR = os.environ.get("BLACKLIST_INDEX_DIR", os.path.join(BASE_DIR, "blacklist_index"))
+
+KEY_BYTES = 20
+KEY_DTYPE = np.dtype(f"S{KEY_BYTES}")
+
+
+def address_key(address: str) -> bytes:
+    """
+    20-byte lookup key for an address. Real 0x-prefixed hex addresses map to
+    their raw bytes; anything else (labels like "0xscammer1") is hashed down
+    to 20 bytes so it can live in the same table.
+    """
+    address = address.strip().lower()
+    hex_part = address[2:] if address.startswith("0x") else address
+    if len(hex_part) == 2 * KEY_BYTES:
+        try:
+            return bytes.fromhex(hex_part)
+        except ValueError:
+            pass
+    return hashlib.sha256(address.encode()).digest()[:KEY_BYTES]
+
+
+class BlacklistIndex:
+    """
+    Exact address blocklist stored as a sorted array of 20-byte keys.
+
+    Lookups are a binary search (O(log n)), batch lookups are a single
+    vectorized searchsorted. On disk the index is a directory of .npy files
+    that are memory-mapped on load, so tens of millions of addresses cost
+    ~22 bytes each and only the pages actually touched are read.
+    """
+
+    def __init__(self, keys: np.ndarray, reason_ids: np.ndarray, reasons: list):
+        self.keys = keys
+        self.reason_ids = reason_ids
+        self.reasons = reasons
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build an in-memory index from (address, reason) pairs."""
+        reasons, reason_lookup = [], {}
+        keys, reason_ids = bytearray(), []
+        for address, reason in entries:
+            if reason not in reason_lookup:
+                reason_lookup[reason] = len(reasons)
+                reasons.append(reason)
+            keys += address_key(address)
+            reason_ids.append(reason_lookup[reason])
+
+        keys = np.frombuffer(bytes(keys), dtype=KEY_DTYPE)
+        # Sort and keep the first reason seen for duplicated addresses
+        keys, first = np.unique(keys, return_index=True)
+        reason_ids = np.asarray(reason_ids, dtype=np.uint32)[first]
+        return cls(keys, reason_ids, reasons)
+
+    @classmethod
+    def from_csv(cls, path: str):
+        """Build from a CSV file with `address` and `reason` columns."""
+        with open(path, newline="") as f:
+            return cls.from_entries((row["address"], row["reason"]) for row in csv.DictReader(f))
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "keys.npy"), self.keys)
+        np.save(os.path.join(directory, "reason_ids.npy"), self.reason_ids)
+        with open(os.path.join(directory, "reasons.json"), "w") as f:
+            json.dump(self.reasons, f)
+
+    @classmethod
+    def load(cls, directory: str):
+        """Memory-map an index written by save()."""
+        keys = np.load(os.path.join(directory, "keys.npy"), mmap_mode="r")
+        reason_ids = np.load(os.path.join(directory, "reason_ids.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "reasons.json")) as f:
+            reasons = json.load(f)
+        return cls(keys, reason_ids, reasons)
+
+    def lookup(self, address: str):
+        """Blacklist reason for an address, or None."""
+        key = address_key(address)
+        position = int(np.searchsorted(self.keys, key))
+        # Compare the raw 20 bytes: indexing an S20 array strips trailing NULs
+        if position < len(self.keys) and self.keys[position:position + 1].tobytes() == key:
+            return self.reasons[self.reason_ids[position]]
+        return None
+
+    def __contains__(self, address: str):
+        return self.lookup(address) is not None
+
+    def lookup_batch(self, addresses):
+        """
+        Membership for many addresses at once.
+        Returns (boolean hit array, list of reasons with None for misses).
+        """
+        queries = np.frombuffer(b"".join(address_key(a) for a in addresses), dtype=KEY_DTYPE)
+        positions = np.searchsorted(self.keys, queries)
+        in_range = positions < len(self.keys)
+        hits = np.zeros(len(queries), dtype=bool)
+        hits[in_range] = self.keys[positions[in_range]] == queries[in_range]
+        reasons = [
+            self.reasons[self.reason_ids[position]] if hit else None
+            for position, hit in zip(positions.tolist(), hits.tolist())
+        ]
+        return hits, reasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a memory-mappable blacklist index from a CSV blocklist")
+    parser.add_argument("csv_path", help="CSV with `address` and `reason` columns")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_INDEX_DIR)
+    args = parser.parse_args()
+
+    index = BlacklistIndex.from_csv(args.csv_path)
+    index.save(args.output_dir)
+    print(f"✅ Indexed {len(index)} addresses into {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,29 @@
-import os
-import json
+import time
 import numpy as np
+from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 
-# Folder to store transaction JSON files
-OUTPUT_DIR = "transactions"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+from feature_store import FeatureStore, get_default_store
+from fraud_scoring import EXTRACTED_COLUMNS, FEATURE_COLUMNS
+from wallet_stats import WalletStatistics
+from address_clusters import AddressClusters
+from transaction_graph import TransactionGraph
 
-def extract_and_save_features(transaction: dict, wallet_history: dict = None):
-    tx_id = transaction.get("tx_id", f"tx_{datetime.now().timestamp()}")
-    sender = transaction["sender"]
+# Transactions per block yielded by extract_feature_blocks
+DEFAULT_CHUNK_SIZE = 65536
+
+def extract_features(transaction: dict, wallet_history: dict = None, clusters: AddressClusters = None,
+                     graph: TransactionGraph = None) -> dict:
+    """
+    Computes the fraud model features for a single transaction.
+    Pure function: nothing is persisted (see extract_and_save_features).
+    With clusters, recipient_cluster_risk is the risk of the recipient's
+    address cluster instead of a random stub. With graph,
+    interaction_frequency and (for a recipient the graph has seen)
+    recipient_age_days come from the transaction graph, and the recipient's
+    propagated blacklist risk is added as recipient_counterparty_risk.
+    """
     recipient = transaction["recipient"]
     value = transaction["value"]
     gas = transaction["gas"]
@@ -18,13 +32,18 @@ def extract_and_save_features(transaction: dict, wallet_history: dict = None):
     # Mock/stub feature extraction
     contract_type = "contract"
     ens = None
-    cluster_risk = np.random.uniform(0.0, 1.0)
+    cluster_risk = clusters.cluster_risk(recipient) if clusters is not None else np.random.uniform(0.0, 1.0)
     sender_age = np.random.randint(1, 1000)
-    recipient_age = np.random.randint(1, 1000)
+    recipient_age = graph.age_days(recipient, timestamp) if graph is not None else None
+    if recipient_age is None:
+        recipient_age = np.random.randint(1, 1000)
     interaction_freq = wallet_history.get(recipient, 0) if wallet_history else 0
+    if graph is not None:
+        interaction_freq = graph.interaction_frequency(transaction["sender"], recipient)
     avg_tx_value = wallet_history.get("avg_tx_value", 1) if wallet_history else 1
     avg_gas = wallet_history.get("avg_gas", 21000) if wallet_history else 21000
-    time_deviation = 1 if datetime.fromtimestamp(timestamp).hour < 4 or datetime.fromtimestamp(timestamp).hour > 23 else 0
+    hour = datetime.fromtimestamp(timestamp).hour
+    time_deviation = 1 if hour < 4 or hour > 23 else 0
     gas_volatility = abs(gas - avg_gas) / avg_gas
     token_hygiene = np.random.uniform(0.0, 1.0)
     contract_similarity = np.random.uniform(0.0, 1.0)
@@ -43,17 +62,154 @@ def extract_and_save_features(transaction: dict, wallet_history: dict = None):
         "gas_volatility_score": gas_volatility,
         "tx_time_deviation": time_deviation
     }
+    if graph is not None:
+        features["recipient_counterparty_risk"] = graph.counterparty_risk(recipient)
+    return features
 
-    output = {
-        "tx_id": tx_id,
-        "sender": sender,
-        "recipient": recipient,
-        "features": features
+def extract_and_save_features(transaction: dict, wallet_history: dict = None, store: FeatureStore = None,
+                              wallet_stats: WalletStatistics = None) -> dict:
+    """
+    Extracts features, persists them to the feature store and returns the
+    record, so callers keep working from memory instead of re-reading disk.
+    With wallet_stats, the wallet history is looked up there (instead of
+    being passed in) and the transaction is then added to it.
+    """
+    timestamp = transaction.get("timestamp", int(datetime.now().timestamp()))
+    if wallet_stats is not None:
+        wallet_history = wallet_stats.wallet_history(transaction["sender"], transaction["recipient"])
+    record = {
+        "tx_id": transaction.get("tx_id", f"tx_{datetime.now().timestamp()}"),
+        "sender": transaction["sender"],
+        "recipient": transaction["recipient"],
+        "timestamp": timestamp,
+        "features": extract_features(dict(transaction, timestamp=timestamp), wallet_history)
     }
 
-    file_path = os.path.join(OUTPUT_DIR, f"{tx_id}.json")
-    with open(file_path, "w") as f:
-        json.dump(output, f, indent=2)
+    if wallet_stats is not None:
+        wallet_stats.update(dict(transaction, timestamp=timestamp))
+
+    store = store if store is not None else get_default_store()
+    store.write(record)
+    print(f"✅ Saved extracted features for {record['tx_id']} to: {store.path}")
+    return record
+
+
+@dataclass
+class FeatureBlock:
+    """A chunk of transactions with their numeric features as one matrix."""
+    tx_ids: list
+    senders: list
+    recipients: list
+    timestamps: np.ndarray
+    features: np.ndarray  # shape (n, 9), columns in EXTRACTED_COLUMNS order
+
+    def __len__(self):
+        return len(self.tx_ids)
+
+    def model_matrix(self, threat_scores, intent_confidences) -> np.ndarray:
+        """Append threat scores and intent confidences: (n, 11) IsolationForest input."""
+        X = np.empty((len(self), len(FEATURE_COLUMNS)), dtype=np.float64)
+        X[:, :len(EXTRACTED_COLUMNS)] = self.features
+        X[:, -2] = threat_scores
+        X[:, -1] = intent_confidences
+        return X
+
+
+def _local_hours(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Local-time hour of each timestamp, as datetime.fromtimestamp(ts).hour.
+    The UTC offset is looked up once per distinct UTC hour, which keeps DST
+    changes exact without a per-row datetime.
+    """
+    utc_hours, inverse = np.unique(timestamps // 3600, return_inverse=True)
+    offsets = np.array([time.localtime(int(h) * 3600).tm_gmtoff for h in utc_hours], dtype=np.int64)
+    return ((timestamps + offsets[inverse]) // 3600) % 24
+
+
+def _extract_block(chunk: list, first_index: int, wallet_history: dict, rng,
+                   wallet_stats: WalletStatistics = None, clusters: AddressClusters = None,
+                   graph: TransactionGraph = None, id_prefix: str = None) -> FeatureBlock:
+    n = len(chunk)
+    now = int(datetime.now().timestamp())
+    id_prefix = id_prefix or f"tx_{now}"
+    values = np.fromiter((tx["value"] for tx in chunk), dtype=np.float64, count=n)
+    gas = np.fromiter((tx["gas"] for tx in chunk), dtype=np.float64, count=n)
+    timestamps = np.fromiter((tx.get("timestamp", now) for tx in chunk), dtype=np.int64, count=n)
+    recipients = [tx["recipient"] for tx in chunk]
+
+    if wallet_stats is not None:
+        # Per-transaction history, each row seeing only the rows before it
+        avg_tx_value, avg_gas, interaction_freq = wallet_stats.history_arrays(
+            [dict(tx, timestamp=int(ts)) for tx, ts in zip(chunk, timestamps)]
+        )
+    elif wallet_history:
+        avg_tx_value = wallet_history.get("avg_tx_value", 1)
+        avg_gas = wallet_history.get("avg_gas", 21000)
+        interaction_freq = np.fromiter((wallet_history.get(r, 0) for r in recipients), dtype=np.float64, count=n)
+    else:
+        avg_tx_value, avg_gas = 1, 21000
+        interaction_freq = np.zeros(n)
+
+    if graph is not None:
+        # Pair counts as of just before each row; the chunk is then in the graph
+        interaction_freq, recipient_age = graph.history_arrays(
+            [dict(tx, timestamp=int(ts)) for tx, ts in zip(chunk, timestamps)]
+        )
+
+    if clusters is not None:
+        # The chunk's link evidence is folded in before its recipients are scored
+        clusters.add_transactions(chunk)
+        cluster_risk = clusters.cluster_risks(recipients)
+
+    hours = _local_hours(timestamps)
+
+    # Same stub distributions as extract_features, drawn a block at a time
+    features = np.empty((n, len(EXTRACTED_COLUMNS)), dtype=np.float64)
+    features[:, 0] = rng.integers(1, 1000, size=n)           # wallet_age_days
+    features[:, 1] = recipient_age if graph is not None else rng.integers(1, 1000, size=n)  # recipient_age_days
+    features[:, 2] = values / avg_tx_value                   # value_to_avg_ratio
+    features[:, 3] = interaction_freq                        # interaction_frequency
+    features[:, 4] = rng.uniform(0.0, 1.0, size=n)           # recipient_token_hygiene
+    features[:, 5] = rng.uniform(0.0, 1.0, size=n)           # contract_code_similarity_score
+    features[:, 6] = np.abs(gas - avg_gas) / avg_gas         # gas_volatility_score
+    features[:, 7] = (hours < 4) | (hours > 23)              # tx_time_deviation
+    features[:, 8] = cluster_risk if clusters is not None else rng.uniform(0.0, 1.0, size=n)  # recipient_cluster_risk
+
+    return FeatureBlock(
+        tx_ids=[tx.get("tx_id", f"{id_prefix}_{first_index + i}") for i, tx in enumerate(chunk)],
+        senders=[tx["sender"] for tx in chunk],
+        recipients=recipients,
+        timestamps=timestamps,
+        features=features
+    )
+
+
+def extract_feature_blocks(transactions, wallet_history: dict = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE, seed=None,
+                           wallet_stats: WalletStatistics = None, clusters: AddressClusters = None,
+                           graph: TransactionGraph = None, first_index: int = 0, id_prefix: str = None):
+    """
+    Streaming, vectorized counterpart of extract_features.
+
+    Consumes any iterable of transaction dicts chunk_size at a time and
+    yields one FeatureBlock per chunk, so memory stays constant however long
+    the stream is. Pass a seed to make the stubbed random features
+    reproducible. With wallet_stats, each transaction's history comes from
+    the running statistics (updated as the stream goes) instead of the one
+    wallet_history dict. With clusters, each chunk's link evidence is added
+    to the address clusters and recipient_cluster_risk is read from them.
+    With graph, interaction_frequency and recipient_age_days come from the
+    transaction graph, which takes in each chunk as it goes.
 
-    print(f"✅ Saved extracted features to: {file_path}")
-    return file_path
+    Transactions without a tx_id get f"{id_prefix}_{position}", counting
+    positions from first_index; the default prefix includes the current
+    time so separate runs don't collide in the feature store.
+    """
+    rng = np.random.default_rng(seed)
+    iterator = iter(transactions)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield _extract_block(chunk, first_index, wallet_history, rng, wallet_stats, clusters, graph, id_prefix)
+        first_index += len(chunk)
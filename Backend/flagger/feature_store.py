@@ -0,0 +1,173 @@
+import os
+import json
+import sqlite3
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE_PATH = os.path.join(BASE_DIR, "feature_store.db")
+
+# Numeric features written by feature_extract.extract_features, in column order
+NUMERIC_FEATURES = [
+    "wallet_age_days",
+    "recipient_age_days",
+    "value_to_avg_ratio",
+    "interaction_frequency",
+    "recipient_token_hygiene",
+    "contract_code_similarity_score",
+    "gas_volatility_score",
+    "tx_time_deviation",
+    "recipient_cluster_risk"
+]
+TEXT_FEATURES = ["recipient_contract_type", "recipient_ens"]
+
+_COLUMNS = ["tx_id", "sender", "recipient", "timestamp"] + TEXT_FEATURES + NUMERIC_FEATURES
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS transaction_features (
+    tx_id TEXT PRIMARY KEY,
+    sender TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    timestamp INTEGER,
+    {", ".join(f"{name} TEXT" for name in TEXT_FEATURES)},
+    {", ".join(f"{name} REAL" for name in NUMERIC_FEATURES)}
+);
+CREATE INDEX IF NOT EXISTS idx_features_sender ON transaction_features (sender, timestamp);
+CREATE INDEX IF NOT EXISTS idx_features_recipient ON transaction_features (recipient, timestamp);
+CREATE INDEX IF NOT EXISTS idx_features_timestamp ON transaction_features (timestamp);
+"""
+
+
+class FeatureStore:
+    """
+    SQLite-backed store of extracted transaction features.
+
+    Replaces the one-JSON-file-per-transaction layout: rows are written in
+    bulk inside a single transaction, the database runs in WAL mode so
+    readers never block the writer, and lookups are indexed by tx_id,
+    sender and recipient, with timestamp range scans.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM transaction_features").fetchone()[0]
+
+    @staticmethod
+    def _to_row(record: dict) -> tuple:
+        features = record["features"]
+        return (
+            record["tx_id"], record["sender"], record["recipient"], record.get("timestamp"),
+            *(features.get(name) for name in TEXT_FEATURES),
+            *(features[name] for name in NUMERIC_FEATURES)
+        )
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> dict:
+        return {
+            "tx_id": row["tx_id"],
+            "sender": row["sender"],
+            "recipient": row["recipient"],
+            "timestamp": row["timestamp"],
+            "features": {name: row[name] for name in TEXT_FEATURES + NUMERIC_FEATURES}
+        }
+
+    def _insert(self, rows):
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO transaction_features ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+
+    def write(self, record: dict):
+        self.write_many([record])
+
+    def write_many(self, records) -> int:
+        """
+        Insert (or replace) records shaped like extract_and_save_features
+        output, all in one transaction. Returns the number of rows written.
+        """
+        rows = [self._to_row(record) for record in records]
+        self._insert(rows)
+        return len(rows)
+
+    def write_block(self, block) -> int:
+        """Bulk-insert a feature_extract.FeatureBlock without building per-row dicts."""
+        rows = zip(
+            block.tx_ids, block.senders, block.recipients, block.timestamps.tolist(),
+            ["contract"] * len(block), [None] * len(block),
+            *block.features.T.tolist()
+        )
+        self._insert(rows)
+        return len(block)
+
+    def get(self, tx_id: str):
+        row = self._conn.execute(
+            "SELECT * FROM transaction_features WHERE tx_id = ?", (tx_id,)
+        ).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def _scan(self, where: str, params: list, start=None, end=None, limit=None):
+        clauses = [where] if where else []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        sql = "SELECT * FROM transaction_features"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self._to_record(row) for row in self._conn.execute(sql, params)]
+
+    def by_sender(self, sender: str, start=None, end=None, limit=None):
+        """Transactions sent by a wallet, optionally within [start, end)."""
+        return self._scan("sender = ?", [sender], start, end, limit)
+
+    def by_recipient(self, recipient: str, start=None, end=None, limit=None):
+        """Transactions received by a wallet, optionally within [start, end)."""
+        return self._scan("recipient = ?", [recipient], start, end, limit)
+
+    def time_range(self, start=None, end=None, limit=None):
+        """All transactions with start <= timestamp < end."""
+        return self._scan("", [], start, end, limit)
+
+    def import_json_dir(self, directory: str) -> int:
+        """Load legacy per-transaction JSON files (e.g. transactions/) into the store."""
+        records = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name)) as f:
+                    records.append(json.load(f))
+        return self.write_many(records)
+
+
+_default_store = None
+
+
+def get_default_store() -> FeatureStore:
+    """Process-wide store at flagger/feature_store.db, opened on first use."""
+    global _default_store
+    if _default_store is None:
+        _default_store = FeatureStore()
+    return _default_store
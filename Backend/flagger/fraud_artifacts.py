@@ -0,0 +1,63 @@
+"""
+Pickle-free serving format of the fraud model: the IsolationForest as
+CompiledIsolationForest node arrays plus its StandardScaler, in the format
+of cScoring/model_artifacts.py. isolation_fraud_model.py exports it after
+every retrain; the API and backfill.py load it memory-mapped.
+"""
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# The compiled forests and the shared artifact format live in the sibling cScoring folder
+CSCORING_DIR = BASE_DIR.parent / "cScoring"
+if str(CSCORING_DIR) not in sys.path:
+    sys.path.append(str(CSCORING_DIR))
+
+from compiled_forest import ARRAY_NAMES, CompiledIsolationForest
+from model_artifacts import (FORMAT_VERSION, SCALER_ARRAYS, load_scaler, read_manifest, save_scaler,
+                             source_digest, write_manifest)
+
+FRAUD_MODEL_DIR = BASE_DIR / "fraud_model"
+
+# The pickles the fraud model directory is exported from
+FRAUD_MODEL_SOURCES = [BASE_DIR / "isolation_fraud_model.pkl", BASE_DIR / "scaler.pkl"]
+
+
+def fraud_model_version(forest: CompiledIsolationForest, scaler) -> str:
+    """Short hash of the fitted model itself: the forest's node arrays and the scaler's statistics."""
+    digest = hashlib.sha256()
+    for array in [getattr(forest, name) for name in ARRAY_NAMES]:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    for attribute in SCALER_ARRAYS[type(scaler).__name__]:
+        digest.update(np.ascontiguousarray(getattr(scaler, attribute)).tobytes())
+    digest.update(json.dumps([forest.offset, forest.max_samples, int(forest.max_depth)]).encode())
+    return digest.hexdigest()[:12]
+
+
+def export_fraud_model(model, scaler, directory: Path = FRAUD_MODEL_DIR, source_paths=FRAUD_MODEL_SOURCES) -> None:
+    """Write the array artifacts of an IsolationForest and scaler pickled as source_paths."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    forest = CompiledIsolationForest.from_estimator(model)
+    forest.save(directory / "forest")
+    write_manifest(directory, {
+        "format_version": FORMAT_VERSION,
+        "version": fraud_model_version(forest, scaler),
+        "source_digest": source_digest(source_paths),
+        "scaler": save_scaler(scaler, directory, "scaler"),
+    })
+
+
+def load_fraud_model(directory: Path = FRAUD_MODEL_DIR, mmap_mode="r"):
+    """(CompiledIsolationForest, StandardScaler) for the fraud score."""
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    return (
+        CompiledIsolationForest.load(directory / "forest", mmap_mode),
+        load_scaler(manifest["scaler"], directory, mmap_mode)
+    )
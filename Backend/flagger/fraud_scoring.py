@@ -0,0 +1,47 @@
+import numpy as np
+
+# Column order the IsolationForest and its scaler were fitted on
+# (fraud_detection_data.csv without the is_fraud label)
+FEATURE_COLUMNS = [
+    "wallet_age_days",
+    "recipient_age_days",
+    "value_to_avg_ratio",
+    "interaction_frequency",
+    "recipient_token_hygiene",
+    "contract_code_similarity_score",
+    "gas_volatility_score",
+    "tx_time_deviation",
+    "recipient_cluster_risk",
+    "threat_score",
+    "intent_confidence"
+]
+
+# Features produced by feature_extract.extract_features
+EXTRACTED_COLUMNS = FEATURE_COLUMNS[:9]
+
+
+def build_feature_matrix(features: list, threat_scores, intent_confidences) -> np.ndarray:
+    """
+    Stacks N extracted feature dicts plus their threat scores and intent
+    confidences into one (N, 11) float matrix in FEATURE_COLUMNS order.
+    """
+    n = len(features)
+    X = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float64)
+    for j, column in enumerate(EXTRACTED_COLUMNS):
+        X[:, j] = np.fromiter((f[column] for f in features), dtype=np.float64, count=n)
+    X[:, 9] = np.asarray(threat_scores, dtype=np.float64)
+    X[:, 10] = np.asarray(intent_confidences, dtype=np.float64)
+    return X
+
+
+def probability_from_anomaly_scores(anomaly_scores: np.ndarray) -> np.ndarray:
+    """Maps IsolationForest decision_function output (higher is safer) to a fraud probability."""
+    return 1 - (anomaly_scores + 0.5)  # normalized
+
+
+def fraud_probability(model, scaler, X: np.ndarray) -> np.ndarray:
+    """
+    Scores a whole feature matrix with a single scaler.transform and
+    decision_function call. Returns one fraud probability per row.
+    """
+    return probability_from_anomaly_scores(model.decision_function(scaler.transform(X)))
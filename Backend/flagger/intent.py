@@ -1,63 +1,92 @@
 import random
+import numpy as np
+from dataclasses import dataclass
 
-def infer_transaction_intent(buyer: str, seller: str, value: float) -> dict:
+# Predefined possible intents
+INTENTS = [
+    "payment_for_goods_or_services",
+    "exchange_swap",
+    "smart_contract_interaction",
+    "transfer_between_wallets",
+    "donation",
+    "NFT_purchase",
+    "DEX_liquidity_move",
+    "gambling",
+    "loan_repayment",
+    "phishing_suspected"
+]
+
+# Reason behind each heuristic; a reason code is an index into this list
+REASONS = [
+    "Buyer and seller have similar wallet prefixes (likely self-transfer)",
+    "Transaction value is very low",
+    "Transaction value is a clean round number",
+    "Transaction value falls in common NFT pricing range",
+    "Transaction value is unusually high",
+    "No strong heuristics matched — inferred from fallback model",
+    "Buyer and seller are linked in the same address cluster (self-transfer)"
+]
+SELF_TRANSFER, LOW_VALUE, ROUND_NUMBER, NFT_RANGE, HIGH_VALUE, FALLBACK, LINKED_ADDRESSES = range(len(REASONS))
+
+ROUND_VALUES = [1.0, 5.0, 10.0, 100.0]
+
+# Characters compared by the same-cluster heuristic
+PREFIX_LENGTH = 6
+
+def infer_transaction_intent(buyer: str, seller: str, value: float, rng: random.Random = None,
+                             clusters=None) -> dict:
     """
     Infers the likely purpose of a blockchain transaction using heuristics.
     Returns a dictionary with intent, confidence score, and reasoning.
+    Pass a random.Random as rng for reproducible results, and
+    address_clusters.AddressClusters as clusters to decide the self-transfer
+    heuristic on linked addresses instead of wallet prefixes.
     """
-
-    # Predefined possible intents
-    intents = [
-        "payment_for_goods_or_services",
-        "exchange_swap",
-        "smart_contract_interaction",
-        "transfer_between_wallets",
-        "donation",
-        "NFT_purchase",
-        "DEX_liquidity_move",
-        "gambling",
-        "loan_repayment",
-        "phishing_suspected"
-    ]
+    rng = rng or random
 
     # Simulated heuristics (you can replace with on-chain queries)
     reasons = []
 
     # Heuristic 1: Same buyer/seller cluster → likely self-transfer or rebalancing
-    if buyer[:6] == seller[:6]:  # simplistic clustering heuristic
-        reasons.append("Buyer and seller have similar wallet prefixes (likely self-transfer)")
+    if clusters is not None and clusters.same_cluster(buyer, seller):
+        reasons.append(REASONS[LINKED_ADDRESSES])
+        intent = "transfer_between_wallets"
+        confidence = 0.9
+
+    elif clusters is None and buyer[:PREFIX_LENGTH] == seller[:PREFIX_LENGTH]:  # simplistic clustering heuristic
+        reasons.append(REASONS[SELF_TRANSFER])
         intent = "transfer_between_wallets"
         confidence = 0.85
 
     # Heuristic 2: Low value transaction
     elif value < 0.01:
-        reasons.append("Transaction value is very low")
-        intent = "donation" if random.random() < 0.5 else "phishing_suspected"
+        reasons.append(REASONS[LOW_VALUE])
+        intent = "donation" if rng.random() < 0.5 else "phishing_suspected"
         confidence = 0.65 if intent == "donation" else 0.75
 
     # Heuristic 3: Clean round numbers (like 1.00, 5.00, etc.)
-    elif round(value, 2) in [1.0, 5.0, 10.0, 100.0]:
-        reasons.append("Transaction value is a clean round number")
+    elif round(value, 2) in ROUND_VALUES:
+        reasons.append(REASONS[ROUND_NUMBER])
         intent = "payment_for_goods_or_services"
         confidence = 0.78
 
     # Heuristic 4: NFT price range
     elif 0.05 <= value <= 2.5:
-        reasons.append("Transaction value falls in common NFT pricing range")
+        reasons.append(REASONS[NFT_RANGE])
         intent = "NFT_purchase"
         confidence = 0.7
 
     # Heuristic 5: High value spikes
     elif value > 1000:
-        reasons.append("Transaction value is unusually high")
+        reasons.append(REASONS[HIGH_VALUE])
         intent = "loan_repayment"
         confidence = 0.8
 
     # Heuristic 6: Random fallback
     else:
-        intent = random.choice(intents)
-        confidence = round(random.uniform(0.4, 0.7), 2)
-        reasons.append("No strong heuristics matched — inferred from fallback model")
+        intent = rng.choice(INTENTS)
+        confidence = round(rng.uniform(0.4, 0.7), 2)
+        reasons.append(REASONS[FALLBACK])
 
     return {
         "intent": intent,
@@ -66,6 +95,90 @@ def infer_transaction_intent(buyer: str, seller: str, value: float) -> dict:
     }
 
 
+@dataclass
+class IntentBatch:
+    """Intents of N transactions as parallel arrays."""
+    intent_codes: np.ndarray  # indices into INTENTS
+    confidences: np.ndarray
+    reason_codes: np.ndarray  # indices into REASONS
+
+    def __len__(self):
+        return len(self.intent_codes)
+
+    @property
+    def intents(self) -> np.ndarray:
+        return np.asarray(INTENTS)[self.intent_codes]
+
+    @property
+    def reasons(self) -> np.ndarray:
+        return np.asarray(REASONS)[self.reason_codes]
+
+
+def _is_round_value(values: np.ndarray) -> np.ndarray:
+    """round(value, 2) in ROUND_VALUES, for an array of values."""
+    rounded = np.round(values, 2)
+    mask = np.zeros(len(values), dtype=bool)
+    boundary = np.zeros(len(values), dtype=bool)
+    for target in ROUND_VALUES:
+        mask |= rounded == target
+        boundary |= np.abs(np.abs(values - target) - 0.005) < 1e-9
+    # np.round scales by 100 first, so exactly at a half-cent boundary it can
+    # disagree with round(); those few values are decided by round() itself
+    for i in np.flatnonzero(boundary):
+        mask[i] = round(float(values[i]), 2) in ROUND_VALUES
+    return mask
+
+
+def infer_transaction_intents(buyers, sellers, values, seed=None, clusters=None) -> IntentBatch:
+    """
+    Vectorized infer_transaction_intent over N transactions: the same
+    heuristics in the same priority order, evaluated as boolean masks over
+    arrays of values and address prefixes. The random choices come from a
+    numpy Generator seeded by seed (an int or a Generator), so a seeded call
+    is reproducible. With clusters, the self-transfer heuristic checks
+    whether buyer and seller are linked instead of comparing prefixes.
+    """
+    rng = np.random.default_rng(seed)
+    values = np.asarray(values, dtype=np.float64)
+    if clusters is not None:
+        same_cluster = np.fromiter((clusters.same_cluster(b, s) for b, s in zip(buyers, sellers)),
+                                   dtype=bool, count=len(values))
+        self_transfer = LINKED_ADDRESSES
+    else:
+        prefix_dtype = f"U{PREFIX_LENGTH}"
+        same_cluster = np.asarray(buyers, dtype=str).astype(prefix_dtype) == np.asarray(sellers, dtype=str).astype(prefix_dtype)
+        self_transfer = SELF_TRANSFER
+
+    # Each heuristic applies where no earlier one matched: assign the
+    # lowest-priority ones first and let earlier heuristics overwrite them
+    reason_codes = np.full(len(values), FALLBACK, dtype=np.int8)
+    reason_codes[values > 1000] = HIGH_VALUE
+    reason_codes[(values >= 0.05) & (values <= 2.5)] = NFT_RANGE
+    reason_codes[_is_round_value(values)] = ROUND_NUMBER
+    reason_codes[values < 0.01] = LOW_VALUE
+    reason_codes[same_cluster] = self_transfer
+
+    # Fixed intent and confidence per heuristic; low value and fallback are drawn below
+    intent_codes = np.array([
+        INTENTS.index("transfer_between_wallets"), 0, INTENTS.index("payment_for_goods_or_services"),
+        INTENTS.index("NFT_purchase"), INTENTS.index("loan_repayment"), 0, INTENTS.index("transfer_between_wallets")
+    ])[reason_codes]
+    confidences = np.array([0.85, 0.0, 0.78, 0.7, 0.8, 0.0, 0.9])[reason_codes]
+
+    low = np.flatnonzero(reason_codes == LOW_VALUE)
+    if len(low):
+        donation = rng.random(len(low)) < 0.5
+        intent_codes[low] = np.where(donation, INTENTS.index("donation"), INTENTS.index("phishing_suspected"))
+        confidences[low] = np.where(donation, 0.65, 0.75)
+
+    fallback = np.flatnonzero(reason_codes == FALLBACK)
+    if len(fallback):
+        intent_codes[fallback] = rng.integers(len(INTENTS), size=len(fallback))
+        confidences[fallback] = np.round(rng.uniform(0.4, 0.7, size=len(fallback)), 2)
+
+    return IntentBatch(intent_codes=intent_codes, confidences=confidences, reason_codes=reason_codes)
+
+
 # 🔍 Example usage
 if __name__ == "__main__":
     result = infer_transaction_intent("0xabc123...", "0xabc991...", 1.00)
@@ -3,6 +3,8 @@ from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 import pickle
 
+from fraud_artifacts import export_fraud_model
+
 # Load the dataset
 df = pd.read_csv("fraud_detection_data.csv")
 
@@ -30,4 +32,7 @@ with open("isolation_fraud_model.pkl", "wb") as f:
 with open("scaler.pkl", "wb") as f:
     pickle.dump(scaler, f)
 
-print("✅ Isolation Forest model and scaler saved successfully.")
+# Re-export the array artifacts the API serves, so they match the new pickles
+export_fraud_model(model, scaler)
+
+print("✅ Isolation Forest model and scaler saved successfully (and exported to 'fraud_model/').")
@@ -0,0 +1,69 @@
+import os
+import asyncio
+import hashlib
+from collections import Counter
+
+from fastapi import FastAPI
+
+CONTRACT_FLAGS = ["proxy_contract", "flashloan_exploiter", "honeypot_trigger"]
+ETHERSCAN_LABELS = ["Fake USDT", "Suspicious Mixer", "Wallet Drainer", "None"]
+
+
+def _draw(kind: str, key: str) -> float:
+    """Deterministic pseudo-random number in [0, 1) per (provider, key)."""
+    digest = hashlib.sha256(f"{kind}:{key.lower()}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def create_app(latency: dict = None) -> FastAPI:
+    """
+    Local stand-in for the Chainabuse / Etherscan style providers used by
+    ThreatIntelClient. Answers are deterministic per address, so tests can
+    assert on them, and `latency` (seconds per provider: reports, labels,
+    contracts, tokens) simulates slow upstreams. Requests served per provider
+    are counted in app.state.request_counts.
+    """
+    app = FastAPI(title="Mock threat intel")
+    default_latency = float(os.environ.get("MOCK_THREAT_INTEL_LATENCY_MS", "0")) / 1000
+    app.state.latency = {name: default_latency for name in ("reports", "labels", "contracts", "tokens")}
+    app.state.latency.update(latency or {})
+    app.state.request_counts = Counter()
+
+    async def respond(provider: str):
+        app.state.request_counts[provider] += 1
+        if app.state.latency[provider]:
+            await asyncio.sleep(app.state.latency[provider])
+
+    @app.get("/reports/{address}")
+    async def reports(address: str):
+        await respond("reports")
+        reported = _draw("reports", address) < 0.05
+        return {"address": address, "reported": reported, "reason": "Community scam report" if reported else None}
+
+    @app.get("/labels/{address}")
+    async def labels(address: str):
+        await respond("labels")
+        return {"address": address, "label": ETHERSCAN_LABELS[int(_draw("labels", address) * len(ETHERSCAN_LABELS))]}
+
+    @app.get("/contracts/{address}")
+    async def contracts(address: str):
+        await respond("contracts")
+        draw = _draw("contracts", address)
+        return {"address": address, "flag": CONTRACT_FLAGS[int(draw / 0.1)] if draw < 0.3 else None}
+
+    @app.get("/tokens/{token}")
+    async def tokens(token: str):
+        await respond("tokens")
+        rugpull = _draw("rugpull", token) < 0.1
+        draw = _draw("tokens", token)
+        risk_score = round(0.1 + 0.9 * draw, 2) if rugpull else round(0.3 * draw, 2)
+        return {"token": token, "risk_score": risk_score, "rugpull": rugpull}
+
+    return app
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=int(os.environ.get("MOCK_THREAT_INTEL_PORT", "8100")))
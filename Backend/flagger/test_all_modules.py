@@ -24,11 +24,7 @@ wallet_history = {
 
 # Run feature extraction
 print("\n🔍 Feature Extraction")
-feature_path = extract_and_save_features(sample_tx, wallet_history)
-
-# Load feature output
-with open(feature_path) as f:
-    features = json.load(f)
+features = extract_and_save_features(sample_tx, wallet_history)
 print(json.dumps(features, indent=2))
 
 # Run threat intel
@@ -1,7 +1,6 @@
 import os
 import pickle
 import numpy as np
-import json
 from datetime import datetime
 
 from feature_extract import extract_and_save_features
@@ -37,9 +36,7 @@ wallet_history = {
 }
 
 # 🔍 Step 1: Feature extraction
-feature_path = extract_and_save_features(sample_tx, wallet_history)
-with open(feature_path) as f:
-    features = json.load(f)["features"]
+features = extract_and_save_features(sample_tx, wallet_history)["features"]
 
 # 🛡 Step 2: Threat intel
 threat = query_threat_intel(sample_tx["recipient"])
@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+import pytest
+
+from address_clusters import AddressClusters
+from blacklist_index import BlacklistIndex
+
+NUL_ENDING = "0x" + "cd" * 19 + "00"
+
+
+def reference_clusters(links, addresses):
+    """Connected components by repeated relabeling, as {address: component id}."""
+    component = {address: address for address in addresses}
+    changed = True
+    while changed:
+        changed = False
+        for a, b in links:
+            low = min(component[a], component[b])
+            for address in (a, b):
+                if component[address] != low:
+                    component[address] = low
+                    changed = True
+    return component
+
+
+def random_links(rng, n_addresses, n_links):
+    addresses = [f"0x{i:040x}" for i in range(n_addresses)]
+    links = [(addresses[a], addresses[b]) for a, b in rng.integers(n_addresses, size=(n_links, 2))]
+    return addresses, links
+
+
+def test_clusters_match_connected_components():
+    rng = np.random.default_rng(0)
+    addresses, links = random_links(rng, 300, 200)
+    clusters = AddressClusters(capacity=4)
+    for address in addresses:
+        clusters.index_of(address, create=True)
+    for a, b in links:
+        clusters.link(a, b)
+
+    component = reference_clusters(links, addresses)
+    for a in addresses[:60]:
+        for b in addresses:
+            assert clusters.same_cluster(a, b) == (component[a] == component[b])
+        assert clusters.cluster_size(a) == sum(c == component[a] for c in component.values())
+
+
+def test_cluster_risk_is_noisy_or_of_member_risks():
+    rng = np.random.default_rng(1)
+    addresses, links = random_links(rng, 200, 150)
+    risks = dict(zip(addresses, rng.uniform(0.0, 0.5, size=len(addresses)) * (rng.random(len(addresses)) < 0.3)))
+    clusters = AddressClusters()
+    # Risks set before and after the unions must aggregate the same way
+    for address in addresses[:100]:
+        clusters.set_risk(address, risks[address])
+    for a, b in links:
+        clusters.link(a, b)
+    for address in addresses[100:]:
+        clusters.set_risk(address, 0.9)
+        clusters.set_risk(address, risks[address])
+
+    component = reference_clusters(links, addresses)
+    for address in addresses:
+        members = [a for a in addresses if component[a] == component[address]]
+        expected = 1 - math.prod(1 - risks[a] for a in members)
+        assert clusters.cluster_risk(address) == pytest.approx(expected, abs=1e-12)
+
+
+def test_certain_members_make_the_cluster_certain_until_cleared():
+    clusters = AddressClusters()
+    clusters.link("0xa", "0xb")
+    clusters.set_risk("0xa", 1.0)
+    clusters.set_risk("0xb", 0.5)
+    assert clusters.cluster_risk("0xb") == 1.0
+    clusters.set_risk("0xa", 0.0)
+    assert clusters.cluster_risk("0xb") == pytest.approx(0.5)
+
+
+def test_transactions_link_inputs_and_change_but_not_recipients():
+    clusters = AddressClusters()
+    clusters.add_transaction({"sender": "0xa", "recipient": "0xshop", "inputs": ["0xa", "0xb"], "change": "0xc"})
+    assert clusters.same_cluster("0xa", "0xb") and clusters.same_cluster("0xb", "0xc")
+    assert not clusters.same_cluster("0xa", "0xshop")
+
+
+def test_single_and_batch_lookups_agree_with_the_blacklist():
+    blacklist = BlacklistIndex.from_entries([(NUL_ENDING, "scam"), ("0xscammer1", "phishing")])
+    clusters = AddressClusters(blacklist=blacklist)
+    clusters.add_transaction({"sender": "0xa", "recipient": NUL_ENDING, "inputs": ["0xb"]})
+    clusters.link("0xb", "0xscammer1")
+    clusters.set_risk("0xc", 0.25)
+
+    queries = ["0xa", "0xb", "0xc", NUL_ENDING, "0xscammer1", "0xrugpuller", "0x" + "cd" * 19 + "01", "0xnever"]
+    batch = clusters.cluster_risks(queries)
+    for address, risk in zip(queries, batch):
+        assert clusters.cluster_risk(address) == risk
+    assert clusters.cluster_risk(NUL_ENDING) == 1.0
+    assert clusters.cluster_risk("0xa") == 1.0
+    # An unseen blacklisted address scores 1 without being ingested
+    unseen = AddressClusters(blacklist=blacklist)
+    assert unseen.cluster_risk(NUL_ENDING) == unseen.cluster_risks([NUL_ENDING])[0] == 1.0
+
+
+def test_snapshot_round_trip(tmp_path):
+    rng = np.random.default_rng(2)
+    addresses, links = random_links(rng, 500, 400)
+    clusters = AddressClusters(capacity=8)
+    for (a, b), risk in zip(links, rng.uniform(0.0, 0.3, size=len(links))):
+        clusters.link(a, b)
+        clusters.set_risk(a, risk)
+    path = str(tmp_path / "clusters.npz")
+    clusters.save(path)
+    loaded = AddressClusters.load(path)
+
+    assert loaded.addresses == clusters.addresses
+    np.testing.assert_array_equal(loaded.cluster_risks(addresses), clusters.cluster_risks(addresses))
+    assert all(loaded.same_cluster(a, b) for a, b in links)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backfill
+
+
+@pytest.fixture
+def history(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 2500
+    frame = pd.DataFrame({
+        "sender": [f"0xs{i}" for i in rng.integers(300, size=n)],
+        "recipient": [f"0xr{i}" for i in rng.integers(300, size=n)],
+        "value": rng.lognormal(0.0, 2.0, size=n).round(4),
+        "timestamp": 1700000000 + np.arange(n) * 7,
+    })
+    # A few known-bad recipients, so the blacklist path is exercised
+    frame.loc[::97, "recipient"] = "0xscammer1"
+    path = tmp_path / "history.csv"
+    frame.to_csv(path, index=False)
+    return path, frame
+
+
+def run(history_path, output_path, workers, chunk_size=400):
+    return backfill.backfill(str(history_path), str(output_path), "csv", "csv", chunk_size, workers, seed=7)
+
+
+def test_output_keeps_input_order_with_unique_ids(history, tmp_path):
+    history_path, frame = history
+    summary = run(history_path, tmp_path / "scores.csv", workers=2)
+    scores = pd.read_csv(tmp_path / "scores.csv")
+
+    assert summary["transactions"] == len(frame) and summary["chunks"] == 7
+    assert scores["tx_id"].tolist() == [f"tx_{i}" for i in range(len(frame))]
+    assert scores["sender"].tolist() == frame["sender"].tolist()
+    assert scores["timestamp"].tolist() == frame["timestamp"].tolist()
+    assert scores["is_blacklisted"].tolist() == (frame["recipient"] == "0xscammer1").tolist()
+
+
+def test_reruns_reproduce_whatever_the_worker_count(history, tmp_path):
+    history_path, _ = history
+    run(history_path, tmp_path / "one.csv", workers=1)
+    run(history_path, tmp_path / "two.csv", workers=2)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "one.csv"), pd.read_csv(tmp_path / "two.csv"))
+
+
+def test_scores_match_the_models_on_the_written_features(history, tmp_path):
+    history_path, _ = history
+    run(history_path, tmp_path / "scores.csv", workers=1)
+    scores = pd.read_csv(tmp_path / "scores.csv")
+
+    model, scaler = backfill.load_models()
+    X = scores[backfill.FEATURE_COLUMNS].to_numpy()
+    np.testing.assert_allclose(scores["fraud_probability"], backfill.fraud_probability(model, scaler, X), atol=1e-12)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from blacklist_index import BlacklistIndex, address_key
+
+# Real hex addresses whose 20-byte keys end in NUL bytes, plus hashed labels
+ADDRESSES = [
+    "0x" + "ab" * 19 + "00",
+    "0x" + "00" * 20,
+    "0x" + "12" * 18 + "0000",
+    "0x" + "ff" * 20,
+    "0xscammer1",
+    "0xrugpuller",
+]
+
+
+def build_index():
+    return BlacklistIndex.from_entries((address, f"reason {i}") for i, address in enumerate(ADDRESSES))
+
+
+def test_lookup_finds_keys_ending_in_nul_bytes():
+    index = build_index()
+    for i, address in enumerate(ADDRESSES):
+        assert index.lookup(address) == f"reason {i}"
+        assert address.upper() in index
+
+
+def test_lookup_misses_addresses_not_in_the_index():
+    index = build_index()
+    for address in ["0x" + "ab" * 20, "0x" + "ab" * 19 + "01", "0xfakecex"]:
+        assert index.lookup(address) is None
+
+
+def test_lookup_batch_agrees_with_lookup():
+    index = build_index()
+    rng = np.random.default_rng(0)
+    queries = ADDRESSES + ["0x" + bytes(rng.integers(0, 256, size=20, dtype=np.uint8)).hex() for _ in range(200)]
+    hits, reasons = index.lookup_batch(queries)
+    assert reasons == [index.lookup(address) for address in queries]
+    assert hits.tolist() == [reason is not None for reason in reasons]
+
+
+def test_matches_a_set_over_random_addresses(tmp_path):
+    rng = np.random.default_rng(1)
+    addresses = ["0x" + bytes(rng.integers(0, 256, size=20, dtype=np.uint8)).hex() for _ in range(2000)]
+    # Force a share of the keys to end in NUL bytes
+    addresses[::8] = [address[:-2] + "00" for address in addresses[::8]]
+    blacklisted = set(addresses[:1000])
+    index = BlacklistIndex.from_entries((address, "scam") for address in blacklisted)
+    index.save(str(tmp_path))
+    loaded = BlacklistIndex.load(str(tmp_path))
+
+    hits, _ = loaded.lookup_batch(addresses)
+    assert hits.tolist() == [address in blacklisted for address in addresses]
+    assert [loaded.lookup(address) is not None for address in addresses] == hits.tolist()
+    assert len(loaded) == len({address_key(address) for address in blacklisted})
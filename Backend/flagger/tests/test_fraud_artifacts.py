@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from fraud_artifacts import export_fraud_model, load_fraud_model
+from model_artifacts import check_source, read_manifest
+
+
+def fit(seed):
+    X = np.random.default_rng(seed).normal(size=(300, 11))
+    scaler = StandardScaler().fit(X)
+    return IsolationForest(n_estimators=20, random_state=seed).fit(scaler.transform(X)), scaler, X
+
+
+def export(tmp_path, model, scaler, name):
+    sources = [tmp_path / f"{name}.model.pkl", tmp_path / f"{name}.scaler.pkl"]
+    for path, obj in zip(sources, (model, scaler)):
+        path.write_bytes(pickle.dumps(obj))
+    export_fraud_model(model, scaler, tmp_path / name, source_paths=sources)
+    return tmp_path / name, sources
+
+
+def test_exported_model_scores_like_the_pickled_one(tmp_path):
+    model, scaler, X = fit(0)
+    directory, _ = export(tmp_path, model, scaler, "fraud_model")
+    exported_model, exported_scaler = load_fraud_model(directory)
+    np.testing.assert_array_equal(
+        exported_model.decision_function(exported_scaler.transform(X)),
+        model.decision_function(scaler.transform(X))
+    )
+
+
+def test_version_identifies_the_model_not_the_pickles(tmp_path):
+    model, scaler, _ = fit(0)
+    first, _ = export(tmp_path, model, scaler, "first")
+    again, _ = export(tmp_path, pickle.loads(pickle.dumps(model)), scaler, "again")
+    other, _ = export(tmp_path, *fit(1)[:2], "other")
+    versions = [read_manifest(directory)["version"] for directory in (first, again, other)]
+    assert versions[0] == versions[1] != versions[2]
+    assert read_manifest(first)["version"] != read_manifest(first)["source_digest"]
+
+
+def test_stale_artifacts_are_refused(tmp_path):
+    model, scaler, _ = fit(0)
+    directory, sources = export(tmp_path, model, scaler, "fraud_model")
+    check_source(directory, sources)
+    sources[0].write_bytes(pickle.dumps(fit(1)[0]))
+    with pytest.raises(ValueError, match="re-export"):
+        check_source(directory, sources)
@@ -0,0 +1,105 @@
+import numpy as np
+
+import half_space_trees
+from half_space_trees import NEUTRAL_PROBABILITY, HalfSpaceTrees
+
+
+def make_model(window_size=100, **kwargs):
+    return HalfSpaceTrees(np.zeros(11), np.ones(11), n_trees=7, depth=6, window_size=window_size, seed=1, **kwargs)
+
+
+def reference_score(model, x):
+    """score_samples for one row, walking each tree node by node."""
+    x = model._normalize(x)[0]
+    total = 0.0
+    for t in range(model.n_trees):
+        node = 0
+        for level in range(model.depth + 1):
+            mass = model.mass_reference[t, node]
+            if mass < model.size_limit or level == model.depth:
+                break
+            node = 2 * node + 1 + int(x[model.feature[t, node]] > model.threshold[t, node])
+        total += mass * 2.0 ** level
+    return total / model.n_trees / model.window_size
+
+
+def test_neutral_probability_until_the_first_window_is_complete():
+    model = make_model()
+    X = np.random.default_rng(0).uniform(size=(150, 11))
+    model.learn_many(X[:99])
+    assert not model.ready
+    assert np.all(model.fraud_probability(X) == NEUTRAL_PROBABILITY)
+    model.learn_many(X[99:])
+    assert model.ready
+    assert not np.all(model.fraud_probability(X) == NEUTRAL_PROBABILITY)
+
+
+def test_learn_many_matches_learn_one():
+    X = np.random.default_rng(1).uniform(size=(250, 11))
+    batched, single = make_model(), make_model()
+    batched.learn_many(X)
+    for x in X:
+        single.learn_one(x)
+    assert batched.windows_completed == single.windows_completed == 2
+    np.testing.assert_array_equal(batched.mass_reference, single.mass_reference)
+    np.testing.assert_array_equal(batched.mass_latest, single.mass_latest)
+
+
+def test_score_samples_matches_a_tree_walk():
+    rng = np.random.default_rng(2)
+    model = make_model()
+    model.learn_many(rng.normal(0.5, 0.1, size=(100, 11)))
+    X = np.vstack([rng.normal(0.5, 0.1, size=(50, 11)), rng.uniform(-1, 2, size=(50, 11))])
+    np.testing.assert_allclose(model.score_samples(X), [reference_score(model, x) for x in X])
+
+
+def test_chunked_scores_match_one_pass(monkeypatch):
+    rng = np.random.default_rng(3)
+    model = make_model()
+    model.learn_many(rng.uniform(size=(100, 11)))
+    X = rng.uniform(size=(1000, 11))
+    expected = model.score_samples(X)
+    monkeypatch.setattr(half_space_trees, "SCORE_CHUNK_SIZE", 7)
+    np.testing.assert_array_equal(model.score_samples(X), expected)
+
+
+def test_reference_normality_is_the_mean_score_of_the_window():
+    X = np.random.default_rng(4).normal(0.5, 0.15, size=(100, 11))
+    model = make_model()
+    model.learn_many(X)
+    assert np.isclose(model.reference_normality, model.score_samples(X).mean())
+
+
+def test_snapshot_round_trip(tmp_path):
+    rng = np.random.default_rng(5)
+    model = make_model()
+    model.learn_many(rng.uniform(size=(130, 11)))
+    path = str(tmp_path / "hst.npz")
+    model.save(path)
+    assert [p.name for p in tmp_path.iterdir()] == ["hst.npz"]
+    loaded = HalfSpaceTrees.load(path)
+    X = rng.uniform(size=(20, 11))
+    np.testing.assert_array_equal(loaded.fraud_probability(X), model.fraud_probability(X))
+    assert loaded.window_count == model.window_count == 30
+
+
+def _save_repeatedly(model, path):
+    for _ in range(20):
+        model.save(path)
+
+
+def test_concurrent_snapshots_from_several_processes_stay_loadable(tmp_path):
+    import multiprocessing
+
+    model = make_model()
+    model.learn_many(np.random.default_rng(6).uniform(size=(120, 11)))
+    path = str(tmp_path / "hst.npz")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_save_repeatedly, args=(model, path)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert [p.name for p in tmp_path.iterdir()] == ["hst.npz"]
+    np.testing.assert_array_equal(HalfSpaceTrees.load(path).mass_reference, model.mass_reference)
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+
+import threat_intel_client
+from threat_intel_client import ThreatIntelClient
+
+
+def make_client(requested, **kwargs):
+    def handler(request):
+        requested.append(request.url.path)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    return ThreatIntelClient(base_url="http://intel.test", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_cache_evicts_least_recently_used_beyond_max_entries():
+    requested = []
+
+    async def run():
+        async with make_client(requested, cache_max_entries=2) as client:
+            await client.etherscan_label("0xa")
+            await client.etherscan_label("0xb")
+            await client.etherscan_label("0xa")  # hit, 0xb is now least recent
+            await client.etherscan_label("0xc")  # evicts 0xb
+            await client.etherscan_label("0xa")
+            await client.etherscan_label("0xb")
+            return client
+
+    client = asyncio.run(run())
+    assert requested == ["/labels/0xa", "/labels/0xb", "/labels/0xc", "/labels/0xb"]
+    assert len(client._cache) == 2
+    assert client.stats["cache_hits"] == 2
+    assert client.stats["cache_evictions"] == 2
+
+
+def test_expired_entries_are_dropped_and_refetched(monkeypatch):
+    requested = []
+    now = [1000.0]
+    monkeypatch.setattr(threat_intel_client.time, "monotonic", lambda: now[0])
+
+    async def run():
+        async with make_client(requested, cache_ttl=60.0) as client:
+            await client.token_risk("eth")
+            now[0] += 30
+            await client.token_risk("eth")
+            now[0] += 31
+            assert client._cache_get("/tokens/ETH") is None
+            assert "/tokens/ETH" not in client._cache
+            await client.token_risk("eth")
+            return client
+
+    client = asyncio.run(run())
+    assert requested == ["/tokens/ETH", "/tokens/ETH"]
+    assert client.stats["cache_hits"] == 1
+    assert client.stats["cache_expirations"] == 1
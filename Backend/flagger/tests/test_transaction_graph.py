@@ -0,0 +1,110 @@
+from collections import Counter
+
+import numpy as np
+
+from blacklist_index import BlacklistIndex
+from transaction_graph import TransactionGraph
+
+ADDRESSES = [f"0x{i:038x}ff" for i in range(30)]
+BLACKLISTED = ADDRESSES[:2]
+
+
+def make_transactions(seed, n=800, start=1_600_000_000):
+    rng = np.random.default_rng(seed)
+    # Skewed towards a few busy addresses, so pairs repeat
+    picks = np.minimum(rng.geometric(0.12, size=(n, 2)) - 1, len(ADDRESSES) - 1)
+    timestamps = np.sort(rng.integers(start, start + 10_000_000, size=n))
+    return [
+        {"sender": ADDRESSES[s].upper() if i % 9 == 0 else ADDRESSES[s], "recipient": ADDRESSES[r],
+         "timestamp": int(t)}
+        for i, ((s, r), t) in enumerate(zip(picks, timestamps))
+    ]
+
+
+def pair_counts(transactions):
+    return Counter((t["sender"].lower(), t["recipient"].lower()) for t in transactions)
+
+
+def assert_counts_match(graph, transactions):
+    expected = pair_counts(transactions)
+    senders = [s for s in ADDRESSES for _ in ADDRESSES] + ["0xunknown"]
+    recipients = [r for _ in ADDRESSES for r in ADDRESSES] + [ADDRESSES[0]]
+    counts = graph.interaction_frequencies(senders, recipients)
+    assert counts.tolist() == [expected[s, r] for s, r in zip(senders, recipients)]
+    assert [graph.interaction_frequency(s, r) for s, r in zip(senders, recipients)] == counts.tolist()
+
+
+def test_pair_counts_match_a_counter_across_compactions():
+    transactions = make_transactions(0)
+    graph = TransactionGraph(capacity=4, compact_every=50)
+    for transaction in transactions[:100]:
+        graph.add_transaction(transaction)
+    for start in range(100, len(transactions), 150):
+        graph.add_transactions(transactions[start:start + 150])
+        assert_counts_match(graph, transactions[:start + 150])
+
+    assert graph.edge_count == len(pair_counts(transactions))
+    for row in range(len(graph)):
+        assert np.all(np.diff(graph.indices[graph.indptr[row]:graph.indptr[row + 1]]) > 0)
+    assert graph.transactions_seen == len(transactions)
+
+
+def test_history_arrays_count_only_earlier_transactions():
+    transactions = make_transactions(1, n=400)
+    graph = TransactionGraph(compact_every=64)
+    graph.add_transactions(transactions[:150])
+    interaction_freq, recipient_age = graph.history_arrays(transactions[150:])
+
+    for i, transaction in enumerate(transactions[150:], start=150):
+        pair = (transaction["sender"].lower(), transaction["recipient"])
+        assert interaction_freq[i - 150] == pair_counts(transactions[:i])[pair]
+        first_seen = min(t["timestamp"] for t in transactions[:i + 1]
+                         if transaction["recipient"] in (t["sender"].lower(), t["recipient"]))
+        assert recipient_age[i - 150] == (transaction["timestamp"] - first_seen) / 86400
+    assert_counts_match(graph, transactions)
+
+
+def test_propagated_risk_matches_a_dense_fixed_point():
+    transactions = make_transactions(2)
+    blacklist = BlacklistIndex.from_entries((address, "scam") for address in BLACKLISTED)
+    graph = TransactionGraph(blacklist=blacklist)
+    graph.add_transactions(transactions)
+    graph.propagate_risk(damping=0.5, max_iterations=1000, tolerance=1e-13)
+
+    # Dense reference over the same address numbering
+    n = len(graph)
+    weights = np.zeros((n, n))
+    for (sender, recipient), count in pair_counts(transactions).items():
+        weights[graph.index_of(sender), graph.index_of(recipient)] += count
+    symmetric = weights + weights.T
+    degree = symmetric.sum(axis=1, keepdims=True)
+    transition = symmetric / np.where(degree > 0, degree, 1.0)
+    seeds = np.array([address in BLACKLISTED for address in graph.addresses])
+    risk = seeds.astype(float)
+    for _ in range(1000):
+        risk = np.where(seeds, 1.0, 0.5 * transition @ risk)
+
+    np.testing.assert_allclose(graph.counterparty_risks(graph.addresses), risk, atol=1e-12)
+    assert graph.counterparty_risk(BLACKLISTED[0]) == 1.0
+    assert graph.counterparty_risk("0xunknown") == 0.0
+
+
+def test_snapshot_round_trip_keeps_ingesting(tmp_path):
+    transactions = make_transactions(3)
+    graph = TransactionGraph(compact_every=100)
+    graph.add_transactions(transactions[:500])
+    graph.propagate_risk()
+    graph.save(str(tmp_path / "graph"))
+
+    loaded = TransactionGraph.load(str(tmp_path / "graph"), compact_every=100)
+    assert isinstance(loaded.indices, np.memmap)
+    np.testing.assert_array_equal(loaded.risk_scores, graph.risk_scores)
+    for transaction in transactions[500:]:
+        loaded.add_transaction(transaction)
+    assert_counts_match(loaded, transactions)
+    first_seen = {}
+    for t in transactions:
+        for address in (t["sender"].lower(), t["recipient"]):
+            first_seen.setdefault(address, t["timestamp"])
+    now = 1_700_000_000
+    assert {a: loaded.age_days(a, now) for a in first_seen} == {a: (now - ts) / 86400 for a, ts in first_seen.items()}
@@ -0,0 +1,88 @@
+from collections import Counter
+
+import numpy as np
+
+from wallet_stats import WalletStatistics
+
+ADDRESSES = [f"0x{i:040x}" for i in range(12)]
+
+
+def make_transactions(seed, n=600):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "sender": ADDRESSES[rng.integers(len(ADDRESSES))].upper() if i % 7 == 0 else ADDRESSES[rng.integers(len(ADDRESSES))],
+            "recipient": ADDRESSES[rng.integers(len(ADDRESSES))],
+            # A large offset, where the naive sum-of-squares variance loses its precision
+            "value": 1e9 + rng.exponential(50.0),
+            "gas": float(rng.integers(21000, 90000)),
+            "timestamp": int(rng.integers(1_600_000_000, 1_700_000_000)) if i % 5 else None,
+        }
+        for i in range(n)
+    ]
+
+
+def test_running_moments_match_numpy():
+    transactions = make_transactions(0)
+    stats = WalletStatistics(capacity=4)  # grows several times
+    stats.update_many(transactions)
+
+    for address in ADDRESSES + ["0xnever"]:
+        sent = [t for t in transactions if t["sender"].lower() == address]
+        assert stats.sent_count(address) == len(sent)
+        if not sent:
+            assert stats.value_stats(address) is None
+            continue
+        for moments, column in ((stats.value_stats(address), "value"), (stats.gas_stats(address), "gas")):
+            values = np.array([t[column] for t in sent])
+            expected_var = values.var(ddof=1) if len(values) > 1 else 0.0
+            np.testing.assert_allclose(moments, (values.mean(), expected_var), rtol=1e-7)
+
+
+def test_interaction_counts_and_first_seen():
+    transactions = make_transactions(1)
+    stats = WalletStatistics()
+    stats.update_many(transactions)
+
+    pairs = Counter((t["sender"].lower(), t["recipient"].lower()) for t in transactions)
+    for sender in ADDRESSES:
+        for recipient in ADDRESSES:
+            assert stats.interaction_count(sender, recipient) == pairs[sender, recipient]
+
+    now = 1_800_000_000
+    for address in ADDRESSES:
+        seen = [t["timestamp"] for t in transactions
+                if t["timestamp"] is not None and address in (t["sender"].lower(), t["recipient"].lower())]
+        expected = (now - min(seen)) / 86400 if seen else None
+        assert stats.age_days(address, now) == expected
+
+
+def test_history_arrays_see_only_earlier_transactions():
+    transactions = make_transactions(2, n=200)
+    avg_tx_value, avg_gas, interaction_freq = WalletStatistics().history_arrays(transactions)
+
+    for i, transaction in enumerate(transactions):
+        sender = transaction["sender"].lower()
+        earlier = [t for t in transactions[:i] if t["sender"].lower() == sender]
+        if not earlier:
+            assert (avg_tx_value[i], avg_gas[i], interaction_freq[i]) == (1, 21000, 0)
+            continue
+        np.testing.assert_allclose(avg_tx_value[i], np.mean([t["value"] for t in earlier]), rtol=1e-12)
+        np.testing.assert_allclose(avg_gas[i], np.mean([t["gas"] for t in earlier]), rtol=1e-12)
+        assert interaction_freq[i] == sum(t["recipient"] == transaction["recipient"] for t in earlier)
+
+
+def test_snapshot_round_trip(tmp_path):
+    transactions = make_transactions(3)
+    stats = WalletStatistics(capacity=2)
+    stats.update_many(transactions[:400])
+    path = str(tmp_path / "wallet_stats.npz")
+    stats.save(path)
+
+    loaded = WalletStatistics.load(path)
+    stats.update_many(transactions[400:])
+    loaded.update_many(transactions[400:])
+    assert loaded.transactions_seen == stats.transactions_seen == len(transactions)
+    np.testing.assert_array_equal(loaded.stats[:len(loaded)], stats.stats[:len(stats)])
+    np.testing.assert_array_equal(loaded.first_seen[:len(loaded)], stats.first_seen[:len(stats)])
+    assert loaded.pair_counts == stats.pair_counts
@@ -1,21 +1,63 @@
+import os
 import random
 
+from blacklist_index import DEFAULT_INDEX_DIR, BlacklistIndex
+
+# Fallback blocklist used until an index has been built with blacklist_index.py
+DEFAULT_BLACKLIST = {
+    "0xscammer1": "Known phishing scam",
+    "0xrugpuller": "Rugpull operator",
+    "0xfakecex": "Fake centralized exchange impersonation"
+}
+
+_blacklist_index = None
+
+
+def get_blacklist_index() -> BlacklistIndex:
+    """
+    Loads the blacklist index once per process: memory-mapped from
+    BLACKLIST_INDEX_DIR if it exists, otherwise built from DEFAULT_BLACKLIST.
+    """
+    global _blacklist_index
+    if _blacklist_index is None:
+        if os.path.isdir(DEFAULT_INDEX_DIR):
+            _blacklist_index = BlacklistIndex.load(DEFAULT_INDEX_DIR)
+        else:
+            _blacklist_index = BlacklistIndex.from_entries(DEFAULT_BLACKLIST.items())
+    return _blacklist_index
+
+
+def check_blacklist_batch(recipients: list):
+    """Batch blacklist membership for the fraud pipeline: (hits, reasons)."""
+    return get_blacklist_index().lookup_batch(recipients)
+
+
 def query_threat_intel(recipient: str, token: str = "ETH") -> dict:
     """
     Simulates threat intelligence lookups for a recipient address and token.
     Replace these stubs with real API calls for production use.
     """
 
-    # 1. Blacklist check (stubbed – can link to Chainabuse, blocklist CSV, etc.)
-    blacklisted_wallets = {
-        "0xscammer1": "Known phishing scam",
-        "0xrugpuller": "Rugpull operator",
-        "0xfakecex": "Fake centralized exchange impersonation"
-    }
+    # 1. Blacklist check against the address index (see blacklist_index.py)
+    blacklist_reason = get_blacklist_index().lookup(recipient)
+
+    # 2-5. Stubbed provider signals and the weighted threat score
+    return build_threat_result(blacklist_reason, *_stub_provider_signals(token))
 
-    is_blacklisted = recipient.lower() in blacklisted_wallets
-    blacklist_reason = blacklisted_wallets.get(recipient.lower(), None)
 
+def query_threat_intel_batch(recipients: list, tokens: list = None) -> list:
+    """
+    query_threat_intel for many recipients: one vectorized blacklist lookup
+    for the whole batch, then the stubbed provider signals per row, drawn in
+    the same order as the per-row calls.
+    """
+    tokens = tokens or ["ETH"] * len(recipients)
+    _, reasons = check_blacklist_batch(recipients)
+    return [build_threat_result(reason, *_stub_provider_signals(token)) for reason, token in zip(reasons, tokens)]
+
+
+def _stub_provider_signals(token: str):
+    """(contract_flag, token_risk_score, token_rugpull_flag, etherscan_label) from the stubbed providers."""
     # 2. Contract flag (based on known bad contract types – stubbed)
     contract_flags = ["proxy_contract", "flashloan_exploiter", "honeypot_trigger"]
     contract_flag = random.choice(contract_flags) if random.random() < 0.3 else None
@@ -27,8 +69,13 @@ def query_threat_intel(recipient: str, token: str = "ETH") -> dict:
     # 4. Etherscan labels (fake for now – can use real API)
     etherscan_labels = ["Fake USDT", "Suspicious Mixer", "Wallet Drainer", "None"]
     etherscan_label = random.choice(etherscan_labels)
+    return contract_flag, token_risk_score, token_rugpull_flag, etherscan_label
+
+
+def build_threat_result(blacklist_reason, contract_flag, token_risk_score, token_rugpull_flag, etherscan_label) -> dict:
+    """Assembles the threat intel result and its weighted threat score."""
+    is_blacklisted = blacklist_reason is not None
 
-    # 5. Overall threat score computation (weighted logic)
     threat_score = 0.0
     if is_blacklisted:
         threat_score += 0.5
@@ -36,7 +83,7 @@ def query_threat_intel(recipient: str, token: str = "ETH") -> dict:
         threat_score += 0.2
     if token_rugpull_flag:
         threat_score += 0.2
-    if etherscan_label != "None":
+    if etherscan_label not in (None, "None"):
         threat_score += 0.1
 
     return {
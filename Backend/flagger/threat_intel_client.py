@@ -0,0 +1,157 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+
+from threat_intel import build_threat_result, get_blacklist_index
+
+DEFAULT_BASE_URL = os.environ.get("THREAT_INTEL_URL", "http://127.0.0.1:8100")
+
+
+class ThreatIntelClient:
+    """
+    Asyncio client for the remote threat intel providers (Chainabuse reports,
+    Etherscan labels, contract flags, token risk).
+
+    - one pooled httpx.AsyncClient for every provider
+    - a semaphore bounding requests in flight
+    - a per-call timeout, after which that signal is reported unavailable
+      instead of holding up the whole risk request
+    - per-key TTL caching of successful answers, in an LRU bounded to
+      cache_max_entries (expired entries are dropped when next looked up)
+    - deduplication: concurrent lookups of the same key share one request
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, api_key: str = None,
+                 max_connections: int = 20, max_concurrency: int = 10,
+                 timeout: float = 2.0, cache_ttl: float = 300.0, cache_max_entries: int = 10000,
+                 transport=None):
+        # httpx is imported here so importing the API does not pay for it
+        # unless live threat intel is configured
+        import httpx
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+        self._request_errors = (httpx.HTTPError, ValueError)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "cache_evictions": 0, "cache_expirations": 0,
+                      "deduplicated": 0, "timeouts": 0, "errors": 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def _request(self, path: str) -> dict:
+        async with self._semaphore:
+            self.stats["requests"] += 1
+            response = await self._http.get(path)
+            response.raise_for_status()
+            return response.json()
+
+    def _cache_get(self, path: str):
+        cached = self._cache.get(path)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del self._cache[path]
+            self.stats["cache_expirations"] += 1
+            return None
+        self._cache.move_to_end(path)
+        self.stats["cache_hits"] += 1
+        return cached
+
+    def _cache_put(self, path: str, result):
+        self._cache[path] = (time.monotonic() + self.cache_ttl, result)
+        self._cache.move_to_end(path)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+            self.stats["cache_evictions"] += 1
+
+    async def _get(self, path: str):
+        """GET a provider path through the cache, the in-flight table and the timeout."""
+        cached = self._cache_get(path)
+        if cached is not None:
+            return cached[1]
+
+        task = self._in_flight.get(path)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.wait_for(self._request(path), self.timeout))
+            self._in_flight[path] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(path, None))
+        else:
+            self.stats["deduplicated"] += 1
+
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            return None
+        except self._request_errors:
+            self.stats["errors"] += 1
+            return None
+
+        self._cache_put(path, result)
+        return result
+
+    async def blacklist_report(self, address: str):
+        return await self._get(f"/reports/{address.lower()}")
+
+    async def etherscan_label(self, address: str):
+        return await self._get(f"/labels/{address.lower()}")
+
+    async def contract_flag(self, address: str):
+        return await self._get(f"/contracts/{address.lower()}")
+
+    async def token_risk(self, token: str):
+        return await self._get(f"/tokens/{token.upper()}")
+
+    async def query(self, recipient: str, token: str = "ETH") -> dict:
+        """
+        Async counterpart of threat_intel.query_threat_intel. The provider
+        lookups run concurrently; any that fail or time out are listed under
+        "unavailable" and contribute nothing to the threat score.
+        """
+        report, label, contract, token_info = await asyncio.gather(
+            self.blacklist_report(recipient),
+            self.etherscan_label(recipient),
+            self.contract_flag(recipient),
+            self.token_risk(token)
+        )
+
+        blacklist_reason = get_blacklist_index().lookup(recipient)
+        if blacklist_reason is None and report and report.get("reported"):
+            blacklist_reason = report.get("reason")
+
+        result = build_threat_result(
+            blacklist_reason,
+            contract["flag"] if contract else None,
+            token_info["risk_score"] if token_info else None,
+            token_info["rugpull"] if token_info else False,
+            label["label"] if label else None
+        )
+        result["unavailable"] = [
+            name for name, answer in
+            [("blacklist_report", report), ("etherscan_label", label), ("contract_flag", contract), ("token_risk", token_info)]
+            if answer is None
+        ]
+        return result
+
+    async def query_many(self, requests) -> list:
+        """Threat intel for many (recipient, token) pairs, bounded by the semaphore."""
+        return await asyncio.gather(*(self.query(recipient, token) for recipient, token in requests))
@@ -0,0 +1,392 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import numpy as np
+
+from threat_intel import get_blacklist_index
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_GRAPH_DIR = os.environ.get("TRANSACTION_GRAPH_DIR", os.path.join(BASE_DIR, "transaction_graph"))
+
+# Pending sender -> recipient pairs merged into the CSR arrays at once
+DEFAULT_COMPACT_EVERY = 1 << 20
+
+# Sentinel for addresses that have no timestamped transaction yet
+NEVER = np.iinfo(np.int64).max
+
+# Risk propagation: share of a neighbour's risk that carries over one hop,
+# and the iteration budget / convergence threshold of the power iteration
+DEFAULT_DAMPING = 0.5
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_TOLERANCE = 1e-6
+
+_LOW_32 = (1 << 32) - 1
+
+
+class TransactionGraph:
+    """
+    Sender -> recipient transaction graph in compressed sparse row form.
+
+    Every address gets an integer index on first sight. Row i of the CSR
+    arrays lists the distinct recipients of address i (indices, sorted) and
+    how many transactions went to each (weights); indptr[i]:indptr[i + 1] is
+    its slice. Ingested pairs first collect in a dict of pending counts and
+    are merged into the sorted arrays in one O(E) pass once there are enough
+    of them, so ingestion is amortized O(1) per transaction and a pair
+    lookup is a binary search within one row.
+
+    Risk is propagated from the threat-intel blacklist with a damped random
+    walk over the undirected, transaction-weighted graph: blacklisted
+    addresses have risk 1, every other address damping x the weighted mean
+    of its counterparties' risk. It is solved by power iteration, one sparse
+    matrix-vector product (scipy) per step, and kept until the next
+    propagate_risk.
+
+    Snapshots are a directory of .npy files; the edge arrays are
+    memory-mapped on load, so a graph of tens of millions of edges opens
+    instantly and costs ~12 bytes per edge.
+    """
+
+    def __init__(self, capacity=1024, blacklist=None, compact_every=DEFAULT_COMPACT_EVERY):
+        self.addresses = []
+        self._index = {}
+        self.first_seen = np.full(capacity, NEVER, dtype=np.int64)
+        self.blacklisted = np.zeros(capacity, dtype=bool)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.uint32)
+        self.risk_scores = np.zeros(0, dtype=np.float64)
+        self.pending = {}  # sender_index << 32 | recipient_index -> count not yet in the CSR arrays
+        self.blacklist = blacklist
+        self.compact_every = compact_every
+        self.transactions_seen = 0
+
+    def __len__(self):
+        return len(self.addresses)
+
+    @property
+    def edge_count(self) -> int:
+        """Distinct sender -> recipient pairs."""
+        self.compact()
+        return len(self.indices)
+
+    def index_of(self, address, create=False):
+        """Integer index of an address (case-insensitive), or None if unseen and not create."""
+        address = address.lower()
+        index = self._index.get(address)
+        if index is None and create:
+            index = len(self.addresses)
+            if index == len(self.first_seen):
+                self._grow(2 * index)
+            self._index[address] = index
+            self.addresses.append(address)
+            if self.blacklist is not None:
+                self.blacklisted[index] = self.blacklist.lookup(address) is not None
+        return index
+
+    def _grow(self, capacity):
+        first_seen = np.full(capacity, NEVER, dtype=np.int64)
+        first_seen[:len(self.first_seen)] = self.first_seen
+        blacklisted = np.zeros(capacity, dtype=bool)
+        blacklisted[:len(self.blacklisted)] = self.blacklisted
+        self.first_seen, self.blacklisted = first_seen, blacklisted
+
+    def add_transaction(self, transaction: dict):
+        """Fold one transaction (sender, recipient, optional timestamp) into the graph."""
+        sender = self.index_of(transaction["sender"], create=True)
+        recipient = self.index_of(transaction["recipient"], create=True)
+        key = sender << 32 | recipient
+        self.pending[key] = self.pending.get(key, 0) + 1
+
+        timestamp = transaction.get("timestamp")
+        if timestamp is not None:
+            for index in (sender, recipient):
+                if timestamp < self.first_seen[index]:
+                    self.first_seen[index] = timestamp
+
+        self.transactions_seen += 1
+        if len(self.pending) >= self.compact_every:
+            self.compact()
+
+    def add_transactions(self, transactions):
+        """Fold many transactions in at once: vectorized edge counting and first-seen updates."""
+        self._add_block(*self._block_arrays(transactions))
+
+    def _block_arrays(self, transactions):
+        senders = np.fromiter((self.index_of(tx["sender"], create=True) for tx in transactions), dtype=np.int64)
+        recipients = np.fromiter((self.index_of(tx["recipient"], create=True) for tx in transactions),
+                                 dtype=np.int64, count=len(senders))
+        timestamps = np.fromiter((tx.get("timestamp", NEVER) for tx in transactions), dtype=np.int64,
+                                 count=len(senders))
+        return senders, recipients, timestamps
+
+    def _add_block(self, senders, recipients, timestamps):
+        keys, counts = np.unique(senders << 32 | recipients, return_counts=True)
+        if len(keys) + len(self.pending) >= self.compact_every:
+            self.compact()
+            self._merge(keys, counts)
+        else:
+            pending = self.pending
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                pending[key] = pending.get(key, 0) + count
+        np.minimum.at(self.first_seen, senders, timestamps)
+        np.minimum.at(self.first_seen, recipients, timestamps)
+        self.transactions_seen += len(senders)
+
+    def compact(self):
+        """Merge the pending pair counts into the CSR arrays."""
+        if not self.pending:
+            if len(self.indptr) <= len(self.addresses):
+                self._merge(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+            return
+        keys = np.fromiter(self.pending.keys(), dtype=np.int64, count=len(self.pending))
+        counts = np.fromiter(self.pending.values(), dtype=np.int64, count=len(self.pending))
+        order = np.argsort(keys)
+        self.pending = {}
+        self._merge(keys[order], counts[order])
+
+    def _merge(self, keys, counts):
+        """Merge sorted, distinct pair keys with their counts into the CSR arrays in O(E + P log E)."""
+        rows = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr))
+        existing = rows << 32 | self.indices
+        positions = np.searchsorted(existing, keys)
+        found = positions < len(existing)
+        found[found] = existing[positions[found]] == keys[found]
+
+        weights = np.array(self.weights, dtype=np.uint32)
+        weights[positions[found]] += counts[found].astype(np.uint32)
+        new = ~found
+        existing = np.insert(existing, positions[new], keys[new])
+        self.weights = np.insert(weights, positions[new], counts[new].astype(np.uint32))
+        self.indices = (existing & _LOW_32).astype(np.int32)
+        self.indptr = np.zeros(len(self.addresses) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(existing >> 32, minlength=len(self.addresses)), out=self.indptr[1:])
+
+    def _pair_counts(self, senders, recipients):
+        """Transactions from senders[i] to recipients[i] (index arrays), by a vectorized binary search per row."""
+        n_rows = len(self.indptr) - 1
+        in_csr = senders < n_rows
+        lo = np.zeros(len(senders), dtype=np.int64)
+        hi = np.zeros(len(senders), dtype=np.int64)
+        lo[in_csr] = self.indptr[senders[in_csr]]
+        hi[in_csr] = self.indptr[senders[in_csr] + 1]
+        end = hi.copy()
+        targets = recipients.astype(np.int32)
+        # Bisect every row at once until each window is empty: lo ends at the
+        # first position whose recipient is not below the target
+        active = lo < hi
+        while active.any():
+            mid = (lo + hi) // 2
+            below = np.zeros(len(lo), dtype=bool)
+            below[active] = self.indices[mid[active]] < targets[active]
+            lo = np.where(active & below, mid + 1, lo)
+            hi = np.where(active & ~below, mid, hi)
+            active = lo < hi
+
+        counts = np.zeros(len(senders), dtype=np.int64)
+        found = lo < end
+        found[found] = self.indices[lo[found]] == targets[found]
+        counts[found] = self.weights[lo[found]]
+        if self.pending:
+            pending = self.pending
+            counts += np.fromiter((pending.get(key, 0) for key in (senders << 32 | recipients).tolist()),
+                                  dtype=np.int64, count=len(senders))
+        return counts
+
+    def interaction_frequency(self, sender, recipient) -> int:
+        """Transactions sent from sender to recipient so far."""
+        sender, recipient = self.index_of(sender), self.index_of(recipient)
+        if sender is None or recipient is None:
+            return 0
+        count = self.pending.get(sender << 32 | recipient, 0)
+        if sender < len(self.indptr) - 1:
+            start, end = self.indptr[sender], self.indptr[sender + 1]
+            position = start + int(np.searchsorted(self.indices[start:end], recipient))
+            if position < end and self.indices[position] == recipient:
+                count += int(self.weights[position])
+        return count
+
+    def interaction_frequencies(self, senders, recipients) -> np.ndarray:
+        """interaction_frequency for many sender -> recipient pairs at once."""
+        sender_indices = np.fromiter((self._index.get(a.lower(), -1) for a in senders), dtype=np.int64,
+                                     count=len(senders))
+        recipient_indices = np.fromiter((self._index.get(a.lower(), -1) for a in recipients), dtype=np.int64,
+                                        count=len(recipients))
+        known = (sender_indices >= 0) & (recipient_indices >= 0)
+        counts = np.zeros(len(senders), dtype=np.int64)
+        counts[known] = self._pair_counts(sender_indices[known], recipient_indices[known])
+        return counts
+
+    def age_days(self, address, now):
+        """Days between the address's first transaction and the timestamp now, or None if never seen."""
+        index = self.index_of(address)
+        if index is None or self.first_seen[index] == NEVER:
+            return None
+        return max(now - int(self.first_seen[index]), 0) / 86400
+
+    def history_arrays(self, transactions):
+        """
+        For a time-ordered list of transactions: arrays of the
+        interaction_frequency of each sender -> recipient pair as of just
+        before the transaction, and the recipient's age in days at the
+        transaction's timestamp, after which the whole list has been folded
+        in. Pairs repeated within the list count their earlier occurrences.
+        """
+        senders, recipients, timestamps = self._block_arrays(transactions)
+        interaction_freq = self._pair_counts(senders, recipients)
+
+        # Occurrence number of each pair within the list (0 for its first)
+        keys = senders << 32 | recipients
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        occurrence = np.arange(len(keys)) - np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+        interaction_freq[order] += occurrence
+
+        self._add_block(senders, recipients, timestamps)
+        recipient_age = np.maximum(timestamps - self.first_seen[recipients], 0) / 86400
+        return interaction_freq.astype(np.float64), recipient_age
+
+    def propagate_risk(self, damping=DEFAULT_DAMPING, max_iterations=DEFAULT_MAX_ITERATIONS,
+                       tolerance=DEFAULT_TOLERANCE) -> int:
+        """
+        Recompute every address's counterparty risk from the blacklist.
+        Iterates r = max(blacklisted, damping * P r), with P the row-normalized
+        symmetric weight matrix, until no score moves by more than
+        tolerance. Returns the number of iterations.
+        """
+        from scipy.sparse import csr_matrix
+
+        self.compact()
+        n = len(self.addresses)
+        out_edges = csr_matrix((self.weights.astype(np.float64), self.indices, self.indptr), shape=(n, n))
+        P = (out_edges + out_edges.T).tocsr()
+        degree = np.asarray(P.sum(axis=1)).ravel()
+        P.data /= np.repeat(np.where(degree > 0, degree, 1.0), np.diff(P.indptr))
+
+        seeds = self.blacklisted[:n]
+        risk = seeds.astype(np.float64)
+        iterations = 0
+        while iterations < max_iterations:
+            iterations += 1
+            updated = damping * (P @ risk)
+            updated[seeds] = 1.0
+            converged = np.abs(updated - risk).max(initial=0.0) <= tolerance
+            risk = updated
+            if converged:
+                break
+        self.risk_scores = risk
+        return iterations
+
+    def counterparty_risk(self, address) -> float:
+        """
+        Propagated risk of an address as of the last propagate_risk. An
+        address added since then scores 1.0 if it is blacklisted, else 0.0.
+        """
+        index = self.index_of(address)
+        if index is None:
+            return 1.0 if self.blacklist is not None and self.blacklist.lookup(address) is not None else 0.0
+        if index < len(self.risk_scores):
+            return float(self.risk_scores[index])
+        return float(self.blacklisted[index])
+
+    def counterparty_risks(self, addresses) -> np.ndarray:
+        return np.fromiter((self.counterparty_risk(address) for address in addresses), dtype=np.float64,
+                           count=len(addresses))
+
+    def save(self, directory):
+        """
+        Snapshot into a directory of .npy files. It is written next to the
+        target and swapped in, so a reader never sees a half-written graph.
+        """
+        self.compact()
+        n = len(self.addresses)
+        tmp_directory = f"{directory}.tmp"
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+        arrays = {
+            "addresses": np.array(self.addresses, dtype=str), "first_seen": self.first_seen[:n],
+            "blacklisted": self.blacklisted[:n], "indptr": self.indptr, "indices": self.indices,
+            "weights": self.weights, "risk_scores": self.risk_scores
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_directory, f"{name}.npy"), array)
+        with open(os.path.join(tmp_directory, "config.json"), "w") as f:
+            json.dump({"transactions_seen": self.transactions_seen}, f)
+
+        old_directory = f"{directory}.old"
+        if os.path.isdir(directory):
+            shutil.rmtree(old_directory, ignore_errors=True)
+            os.replace(directory, old_directory)
+        os.replace(tmp_directory, directory)
+        shutil.rmtree(old_directory, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory, blacklist=None, compact_every=DEFAULT_COMPACT_EVERY):
+        """Load a snapshot written by save(), memory-mapping the edge arrays."""
+        def array(name, mmap_mode=None):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        addresses = array("addresses").tolist()
+        n = len(addresses)
+        graph = cls(capacity=max(n, 1), blacklist=blacklist, compact_every=compact_every)
+        graph.addresses = addresses
+        graph._index = {address: index for index, address in enumerate(addresses)}
+        graph.first_seen[:n] = array("first_seen")
+        graph.blacklisted[:n] = array("blacklisted")
+        graph.indptr = array("indptr", "r")
+        graph.indices = array("indices", "r")
+        graph.weights = array("weights", "r")
+        graph.risk_scores = array("risk_scores", "r")
+        with open(os.path.join(directory, "config.json")) as f:
+            graph.transactions_seen = json.load(f)["transactions_seen"]
+        return graph
+
+
+_transaction_graph = None
+
+
+def get_transaction_graph() -> TransactionGraph:
+    """
+    Loads the transaction graph once per process: memory-mapped from
+    TRANSACTION_GRAPH_DIR if a snapshot exists, otherwise empty.
+    """
+    global _transaction_graph
+    if _transaction_graph is None:
+        if os.path.isdir(DEFAULT_GRAPH_DIR):
+            _transaction_graph = TransactionGraph.load(DEFAULT_GRAPH_DIR, blacklist=get_blacklist_index())
+        else:
+            _transaction_graph = TransactionGraph(blacklist=get_blacklist_index())
+    return _transaction_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the transaction graph from a transaction history file")
+    parser.add_argument("input", help="CSV, NDJSON or Parquet file with sender, recipient and optionally timestamp")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_GRAPH_DIR)
+    parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], help="input format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=1000000)
+    parser.add_argument("--damping", type=float, default=DEFAULT_DAMPING)
+    args = parser.parse_args()
+
+    from backfill import detect_format, read_chunks
+
+    start = time.perf_counter()
+    # An existing snapshot is extended rather than rebuilt
+    if os.path.isdir(args.output_dir):
+        graph = TransactionGraph.load(args.output_dir, blacklist=get_blacklist_index())
+    else:
+        graph = TransactionGraph(blacklist=get_blacklist_index())
+    for frame in read_chunks(args.input, args.format or detect_format(args.input), args.chunk_size):
+        graph.add_transactions(frame.to_dict("records"))
+    iterations = graph.propagate_risk(damping=args.damping)
+    graph.save(args.output_dir)
+    print(f"✅ Graph of {len(graph):,} addresses and {graph.edge_count:,} edges "
+          f"({graph.transactions_seen:,} transactions, risk converged in {iterations} iterations) "
+          f"in {time.perf_counter() - start:.1f}s → {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import os
+import json
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SNAPSHOT_PATH = os.path.join(BASE_DIR, "wallet_stats.npz")
+
+# Per-address columns of the statistics table
+COUNT, VALUE_MEAN, VALUE_M2, GAS_MEAN, GAS_M2 = range(5)
+N_COLUMNS = 5
+
+# Sentinel for addresses that have no timestamped transaction yet
+NEVER = np.iinfo(np.int64).max
+
+
+class WalletStatistics:
+    """
+    Running per-wallet transaction statistics, updated in O(1) per
+    transaction so feature extraction looks history up instead of rescanning
+    it.
+
+    Every address gets an integer index on first sight. Per index the table
+    holds the number of transactions sent and the running mean and variance
+    (Welford) of their value and gas, plus the first timestamp the address
+    was seen on either side of a transaction. Sender -> recipient interaction
+    counts are kept per (sender index, recipient index) pair. Everything is
+    stored in flat arrays grown by doubling and saved as one .npz snapshot.
+    """
+
+    def __init__(self, capacity=1024, snapshot_path=None, snapshot_every=None):
+        self.addresses = []
+        self._index = {}
+        self.stats = np.zeros((capacity, N_COLUMNS), dtype=np.float64)
+        self.first_seen = np.full(capacity, NEVER, dtype=np.int64)
+        self.pair_counts = {}  # sender_index << 32 | recipient_index -> count
+        self.transactions_seen = 0
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def index_of(self, address, create=False):
+        """Integer index of an address (case-insensitive), or None if unseen and not create."""
+        address = address.lower()
+        index = self._index.get(address)
+        if index is None and create:
+            index = len(self.addresses)
+            if index == len(self.stats):
+                self._grow(2 * index)
+            self._index[address] = index
+            self.addresses.append(address)
+        return index
+
+    def _grow(self, capacity):
+        stats = np.zeros((capacity, N_COLUMNS), dtype=np.float64)
+        stats[:len(self.stats)] = self.stats
+        first_seen = np.full(capacity, NEVER, dtype=np.int64)
+        first_seen[:len(self.first_seen)] = self.first_seen
+        self.stats, self.first_seen = stats, first_seen
+
+    def update(self, transaction: dict):
+        """Fold one transaction (sender, recipient, value, gas, optional timestamp) into the statistics."""
+        sender = self.index_of(transaction["sender"], create=True)
+        recipient = self.index_of(transaction["recipient"], create=True)
+        row = self.stats[sender]
+
+        # Welford's update of the sender's value and gas mean / sum of squares
+        count = row[COUNT] + 1
+        row[COUNT] = count
+        for value, mean, m2 in ((transaction["value"], VALUE_MEAN, VALUE_M2), (transaction["gas"], GAS_MEAN, GAS_M2)):
+            delta = value - row[mean]
+            row[mean] += delta / count
+            row[m2] += delta * (value - row[mean])
+
+        key = sender << 32 | recipient
+        self.pair_counts[key] = self.pair_counts.get(key, 0) + 1
+
+        timestamp = transaction.get("timestamp")
+        if timestamp is not None:
+            for index in (sender, recipient):
+                if timestamp < self.first_seen[index]:
+                    self.first_seen[index] = timestamp
+
+        self.transactions_seen += 1
+        if self.snapshot_every and self.snapshot_path and self.transactions_seen % self.snapshot_every == 0:
+            self.save(self.snapshot_path)
+
+    def update_many(self, transactions):
+        for transaction in transactions:
+            self.update(transaction)
+
+    def sent_count(self, address) -> int:
+        index = self.index_of(address)
+        return 0 if index is None else int(self.stats[index, COUNT])
+
+    def value_stats(self, address):
+        """(mean, variance) of the values the address has sent, or None if it sent nothing."""
+        return self._moments(address, VALUE_MEAN, VALUE_M2)
+
+    def gas_stats(self, address):
+        """(mean, variance) of the gas of the address's transactions, or None if it sent nothing."""
+        return self._moments(address, GAS_MEAN, GAS_M2)
+
+    def _moments(self, address, mean, m2):
+        index = self.index_of(address)
+        if index is None or self.stats[index, COUNT] == 0:
+            return None
+        count, row = self.stats[index, COUNT], self.stats[index]
+        return float(row[mean]), float(row[m2] / (count - 1)) if count > 1 else 0.0
+
+    def interaction_count(self, sender, recipient) -> int:
+        """Transactions sent from sender to recipient so far."""
+        sender, recipient = self.index_of(sender), self.index_of(recipient)
+        if sender is None or recipient is None:
+            return 0
+        return self.pair_counts.get(sender << 32 | recipient, 0)
+
+    def age_days(self, address, now):
+        """Days between the address's first transaction and the timestamp now, or None if never seen."""
+        index = self.index_of(address)
+        if index is None or self.first_seen[index] == NEVER:
+            return None
+        return max(now - int(self.first_seen[index]), 0) / 86400
+
+    def wallet_history(self, sender, recipient):
+        """
+        The wallet_history dict feature_extract.extract_features reads for a
+        sender -> recipient transaction (avg_tx_value, avg_gas and the
+        interaction count under the recipient's address), or None when the
+        sender has no history. A zero mean value is left out, so the
+        extractor falls back to its default rather than dividing by zero.
+        """
+        index = self.index_of(sender)
+        if index is None or self.stats[index, COUNT] == 0:
+            return None
+        row = self.stats[index]
+        history = {recipient: self.interaction_count(sender, recipient)}
+        if row[VALUE_MEAN] > 0:
+            history["avg_tx_value"] = float(row[VALUE_MEAN])
+        if row[GAS_MEAN] > 0:
+            history["avg_gas"] = float(row[GAS_MEAN])
+        return history
+
+    def history_arrays(self, transactions):
+        """
+        Block counterpart of wallet_history followed by update, for a
+        time-ordered list of transactions: arrays of avg_tx_value, avg_gas
+        and interaction_frequency as of just before each transaction (with
+        extract_features' defaults for senders without history), after which
+        the whole list has been folded in.
+        """
+        n = len(transactions)
+        avg_tx_value, avg_gas, interaction_freq = np.ones(n), np.full(n, 21000.0), np.zeros(n)
+        for i, transaction in enumerate(transactions):
+            history = self.wallet_history(transaction["sender"], transaction["recipient"])
+            if history is not None:
+                avg_tx_value[i] = history.get("avg_tx_value", 1)
+                avg_gas[i] = history.get("avg_gas", 21000)
+                interaction_freq[i] = history[transaction["recipient"]]
+            self.update(transaction)
+        return avg_tx_value, avg_gas, interaction_freq
+
+    def save(self, path):
+        """Atomic .npz snapshot of the address table, statistics and pair counts."""
+        n = len(self.addresses)
+        keys = np.fromiter(self.pair_counts.keys(), dtype=np.int64, count=len(self.pair_counts))
+        counts = np.fromiter(self.pair_counts.values(), dtype=np.int64, count=len(self.pair_counts))
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path, addresses=np.array(self.addresses, dtype=str), stats=self.stats[:n],
+            first_seen=self.first_seen[:n], pair_keys=keys, pair_counts=counts,
+            config=json.dumps({"transactions_seen": self.transactions_seen})
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, snapshot_path=None, snapshot_every=None):
+        data = np.load(path)
+        addresses = data["addresses"].tolist()
+        model = cls(capacity=max(len(addresses), 1), snapshot_path=snapshot_path, snapshot_every=snapshot_every)
+        model.addresses = addresses
+        model._index = {address: index for index, address in enumerate(addresses)}
+        model.stats[:len(addresses)] = data["stats"]
+        model.first_seen[:len(addresses)] = data["first_seen"]
+        model.pair_counts = dict(zip(data["pair_keys"].tolist(), data["pair_counts"].tolist()))
+        model.transactions_seen = json.loads(str(data["config"]))["transactions_seen"]
+        return model